@@ -0,0 +1,39 @@
+"""Create submission table.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from bugbounty_gpt.db.models import ReportCategory, SubmissionState
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'submission',
+        sa.Column('submission_id', sa.String(length=100), nullable=False),
+        sa.Column('user_id', sa.String(length=100), nullable=True),
+        sa.Column('reasoning', sa.Text(), nullable=True),
+        sa.Column('classification', sa.Enum(*[category.name for category in ReportCategory], name='reportcategory'), nullable=True),
+        sa.Column('submission_state', sa.Enum(*[state.name for state in SubmissionState], name='submissionstate'), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('submission_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('submission')
+    sa.Enum(name='submissionstate').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='reportcategory').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,28 @@
+"""Index submission state and classification.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_submission_state_classification', 'submission', ['submission_state', 'classification'], unique=False)
+    op.create_index('ix_submission_new_classification', 'submission', ['classification'], unique=False, postgresql_where=sa.text("submission_state = 'NEW'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_submission_new_classification', table_name='submission')
+    op.drop_index('ix_submission_state_classification', table_name='submission')
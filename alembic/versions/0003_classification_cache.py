@@ -0,0 +1,36 @@
+"""Create classification cache table.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'classification_cache',
+        sa.Column('cache_key', sa.String(length=64), nullable=False),
+        sa.Column('classification', postgresql.ENUM(name='reportcategory', create_type=False), nullable=True),
+        sa.Column('reasoning', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('cache_key')
+    )
+    op.create_index('ix_classification_cache_created_at', 'classification_cache', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_classification_cache_created_at', table_name='classification_cache')
+    op.drop_table('classification_cache')
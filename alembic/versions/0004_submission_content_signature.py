@@ -0,0 +1,26 @@
+"""Add content signature to submission.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('submission', sa.Column('content_signature', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('submission', 'content_signature')
@@ -0,0 +1,53 @@
+"""Create outbox action table.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'outbox_action',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('idempotency_key', sa.String(length=200), nullable=False),
+        sa.Column('submission_id', sa.String(length=100), nullable=False),
+        sa.Column('action', sa.Enum('COMMENT', 'CLOSE', 'ASSIGN', name='outboxactiontype'), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('status', sa.Enum('PENDING', 'DONE', 'DEAD', name='outboxstatus'), server_default='PENDING', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('idempotency_key')
+    )
+    op.create_index('ix_outbox_action_submission_id', 'outbox_action', ['submission_id'], unique=False)
+    op.create_index(
+        'ix_outbox_action_pending',
+        'outbox_action',
+        ['submission_id', 'id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDING'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_action_pending', table_name='outbox_action')
+    op.drop_index('ix_outbox_action_submission_id', table_name='outbox_action')
+    op.drop_table('outbox_action')
+    sa.Enum(name='outboxstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='outboxactiontype').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,30 @@
+"""Add lease columns to submission and poll cursor tables.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table_name in ('submission', 'poll_cursor'):
+        op.add_column(table_name, sa.Column('leased_by', sa.String(length=100), nullable=True))
+        op.add_column(table_name, sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    for table_name in ('submission', 'poll_cursor'):
+        op.drop_column(table_name, 'lease_expires_at')
+        op.drop_column(table_name, 'leased_by')
@@ -0,0 +1,102 @@
+"""
+Measures the build and query throughput of the near-duplicate index and its accuracy on synthetic reports.
+
+Generates unique reports from a fixed vocabulary, indexes them, then queries edited copies of a sample of
+them and fresh reports. Recall is measured against the edited copies whose exact shingle Jaccard similarity
+to their original reaches the configured threshold; any match for a fresh report is a false positive. The
+index is configured from the 'near_duplicates' section of config.yaml.
+
+Usage:
+    python -m benchmarks.near_duplicate_index [--reports 100000] [--queries 2000]
+"""
+import argparse
+import random
+import time
+from bugbounty_gpt.env import NEAR_DUPLICATE_SETTINGS
+from bugbounty_gpt.near_duplicates import NearDuplicateIndex, _shingle_hashes
+
+WORDS_PER_REPORT = 120
+VOCABULARY = [f"word{i}" for i in range(5000)]
+
+def _report(rng):
+    """
+    Generates a random report.
+
+    :param rng: Random number generator.
+    :return: Report text.
+    """
+    return " ".join(rng.choices(VOCABULARY, k=WORDS_PER_REPORT))
+
+def _near_duplicate(rng, report):
+    """
+    Edits a report the way a resubmission would: up to three words changed and maybe a sentence appended.
+
+    :param rng: Random number generator.
+    :param report: Report text.
+    :return: Edited report text.
+    """
+    words = report.split(" ")
+    for position in rng.sample(range(len(words)), rng.randint(0, 3)):
+        words[position] = rng.choice(VOCABULARY)
+    suffix = " Thanks." if rng.random() < 0.5 else ""
+    return " ".join(words) + suffix
+
+def _jaccard(first, second):
+    """
+    Computes the exact Jaccard similarity of the shingles of two reports.
+
+    :param first: First report text.
+    :param second: Second report text.
+    :return: Jaccard similarity.
+    """
+    first, second = _shingle_hashes(first), _shingle_hashes(second)
+    return len(first & second) / len(first | second)
+
+def run(report_count, query_count):
+    """
+    Runs the benchmark and prints throughput and accuracy figures.
+
+    :param report_count: Number of reports to index.
+    :param query_count: Number of near-duplicate and of unrelated reports to query.
+    """
+    rng = random.Random(0)
+    reports = [_report(rng) for _ in range(report_count)]
+    index = NearDuplicateIndex(
+        NEAR_DUPLICATE_SETTINGS['threshold'],
+        NEAR_DUPLICATE_SETTINGS['num_perm'],
+        NEAR_DUPLICATE_SETTINGS['bands'],
+        report_count,
+    )
+
+    started_at = time.perf_counter()
+    signatures = [index.signature(report) for report in reports]
+    signature_seconds = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    for position, signature in enumerate(signatures):
+        index.add(f"submission{position}", signature, "OUT_OF_SCOPE", "reason")
+    build_seconds = time.perf_counter() - started_at
+
+    sample = rng.sample(range(report_count), query_count)
+    edited = [(position, _near_duplicate(rng, reports[position])) for position in sample]
+    near_duplicates = [(f"submission{position}", report) for position, report in edited if _jaccard(reports[position], report) >= index.threshold]
+    unrelated = [_report(rng) for _ in range(query_count)]
+    queries = [index.signature(report) for _, report in near_duplicates] + [index.signature(report) for report in unrelated]
+
+    started_at = time.perf_counter()
+    matches = [index.query(signature) for signature in queries]
+    query_seconds = time.perf_counter() - started_at
+
+    found = sum(match is not None and match[0] == expected_id for (expected_id, _), match in zip(near_duplicates, matches))
+    false_positives = sum(match is not None for match in matches[len(near_duplicates):])
+    print(f"computed {report_count} signatures in {signature_seconds:.2f}s ({report_count / signature_seconds:,.0f} reports/s)")
+    print(f"indexed {report_count} signatures in {build_seconds:.2f}s ({report_count / build_seconds:,.0f} reports/s)")
+    print(f"ran {len(queries)} queries in {query_seconds:.2f}s ({len(queries) / query_seconds:,.0f} queries/s)")
+    print(f"recall {found / len(near_duplicates):.1%} of {len(near_duplicates)} near-duplicates, false positives {false_positives / query_count:.1%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reports", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    arguments = parser.parse_args()
+    run(arguments.reports, arguments.queries)
@@ -0,0 +1,143 @@
+"""
+Measures the per-cycle cost of the in-scope submission leasing query as the submission table grows.
+
+Builds a copy of the submission table in a scratch schema, fills it to increasing sizes with processed
+submissions plus a constant number of NEW ones (the steady state of a long-running deployment), and times
+the statement run by lease_submissions with and without the state indexes. Each run is rolled back, so
+every run leases the same NEW submissions.
+
+Usage:
+    SQLALCHEMY_URL=postgresql+asyncpg://... python -m benchmarks.submission_state_query [--sizes 10000 100000 1000000]
+
+Only the 'bugbounty_benchmark' schema is created and dropped; the application tables are not touched.
+"""
+import argparse
+import time
+from sqlalchemy import MetaData, create_engine, event, text
+from bugbounty_gpt.db.db_handler import lease_submissions_statement
+from bugbounty_gpt.db.models import Submission, SubmissionState
+from bugbounty_gpt.env import LEASE_BATCH_SIZE, LEASE_SECONDS, RESPONSE_CATEGORIES, SQLALCHEMY_URL, VALID_CATEGORIES
+
+SCHEMA = "bugbounty_benchmark"
+NEW_SUBMISSIONS = 50
+QUERY_RUNS = 50
+
+def _build_table():
+    """
+    Copies the submission table definition, including its indexes, into the scratch schema.
+
+    :return: The copied Table object.
+    """
+    return Submission.__table__.to_metadata(MetaData(), schema=SCHEMA)
+
+def _grow_table(connection, table, current_size, target_size):
+    """
+    Inserts processed submissions until the table holds `target_size` rows.
+
+    :param connection: Open database connection.
+    :param table: Benchmark table.
+    :param current_size: Number of rows already in the table, including the NEW submissions.
+    :param target_size: Number of rows wanted in the table.
+    """
+    categories = ", ".join(f"'{category}'" for category in VALID_CATEGORIES)
+    connection.execute(text(f"""
+        INSERT INTO {SCHEMA}.{table.name} (submission_id, user_id, reasoning, classification, submission_state)
+        SELECT
+            'processed-' || g,
+            'researcher-' || (g % 1000),
+            'Benchmark reasoning.',
+            (ARRAY[{categories}])[1 + g % {len(VALID_CATEGORIES)}]::reportcategory,
+            (ARRAY['UPDATED', 'UPDATED_OUT_OF_BAND'])[1 + g % 2]::submissionstate
+        FROM generate_series(:start, :stop) AS g
+    """), {"start": current_size - NEW_SUBMISSIONS, "stop": target_size - NEW_SUBMISSIONS - 1})
+    connection.execute(text(f"ANALYZE {SCHEMA}.{table.name}"))
+
+def _time_query(connection, stmt):
+    """
+    Runs the query repeatedly, rolling back each run, and reports its cost.
+
+    :param connection: Open database connection, with the scratch schema translated in.
+    :param stmt: Query to run.
+    :return: Tuple of the median runtime in milliseconds and the plan node scanning the submission table.
+    """
+    timings = []
+    executed = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", listener)
+    for _ in range(QUERY_RUNS):
+        savepoint = connection.begin_nested()
+        started_at = time.perf_counter()
+        leased = connection.execute(stmt).fetchall()
+        timings.append((time.perf_counter() - started_at) * 1000)
+        savepoint.rollback()
+    event.remove(connection, "before_cursor_execute", listener)
+    assert len(leased) == min(NEW_SUBMISSIONS, LEASE_BATCH_SIZE), "The benchmark did not lease the NEW submissions"
+
+    # Explain the statement exactly as it was sent, with the schema and parameters already rendered
+    statement, parameters = next((statement, parameters) for statement, parameters in executed if statement.startswith("UPDATE"))
+    plan = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).scalars().all()
+    # The scan picking the candidates is the one that grows with the table
+    scan = next(line for line in plan if "Scan" in line and "Subquery Scan" not in line)
+    return sorted(timings)[len(timings) // 2], scan.strip().lstrip("-> ")
+
+def _set_indexes(connection, table, enabled):
+    """
+    Creates or drops the state indexes on the benchmark table.
+
+    :param connection: Open database connection.
+    :param table: Benchmark table.
+    :param enabled: True to create the indexes, False to drop them.
+    """
+    for index in table.indexes:
+        if enabled:
+            index.create(connection, checkfirst=True)
+        else:
+            index.drop(connection, checkfirst=True)
+    connection.execute(text(f"ANALYZE {SCHEMA}.{table.name}"))
+
+def run(sizes):
+    """
+    Runs the benchmark and prints one line per table size and index configuration.
+
+    :param sizes: Table sizes to measure, in increasing order.
+    """
+    engine = create_engine(SQLALCHEMY_URL.replace("+asyncpg", ""))
+    table = _build_table()
+    stmt = lease_submissions_statement([SubmissionState.NEW], RESPONSE_CATEGORIES, "benchmark", LEASE_SECONDS, LEASE_BATCH_SIZE)
+
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        table.metadata.create_all(connection)
+        connection.execute(text(f"""
+            INSERT INTO {SCHEMA}.{table.name} (submission_id, user_id, reasoning, classification, submission_state)
+            SELECT 'new-' || g, 'researcher', 'Benchmark reasoning.', '{RESPONSE_CATEGORIES[0]}'::reportcategory, 'NEW'::submissionstate
+            FROM generate_series(1, {NEW_SUBMISSIONS}) AS g
+        """))
+
+    try:
+        current_size = NEW_SUBMISSIONS
+        print(f"{'rows':>10}  {'indexes':>7}  {'median ms':>9}  plan")
+        for size in sizes:
+            with engine.begin() as connection:
+                _grow_table(connection, table, current_size, size)
+            current_size = size
+
+            for indexes_enabled in (False, True):
+                with engine.begin() as connection:
+                    _set_indexes(connection, table, indexes_enabled)
+                with engine.connect() as connection, connection.begin():
+                    connection = connection.execution_options(schema_translate_map={None: SCHEMA})
+                    median_ms, plan = _time_query(connection, stmt)
+                print(f"{size:>10}  {'yes' if indexes_enabled else 'no':>7}  {median_ms:>9.3f}  {plan}")
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 5_000_000])
+    run(parser.parse_args().sizes)
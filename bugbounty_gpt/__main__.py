@@ -1,12 +1,37 @@
+import argparse
 import logging
 import asyncio
+import httpx
 
 from bugbounty_gpt.db import db_handler
 from bugbounty_gpt.db.models import SubmissionState
-from bugbounty_gpt.handlers.openai_handler import OpenAIHandler
-from bugbounty_gpt.handlers.submission_handler import BugCrowdSubmission
+from bugbounty_gpt.handlers.openai_handler import OpenAIHandler, ClassificationError, CLASSIFICATION_ERROR_MESSAGE
+from bugbounty_gpt.handlers.classification_batcher import ClassificationBatcher
 from bugbounty_gpt.handlers.bugcrowd_api import BugCrowdAPI
-from bugbounty_gpt.env import USER_ID, FILTER_PROGRAM, RESPONSE_CATEGORIES, SQLALCHEMY_URL
+from bugbounty_gpt.env import FILTER_PROGRAM, RESPONSE_CATEGORIES, SQLALCHEMY_URL, CLASSIFICATION_CONCURRENCY
+from bugbounty_gpt.env import IN_SCOPE_CONCURRENCY, OUTBOX_SETTINGS, SUBMISSION_STATE_MAX_SUBMISSIONS, SUBMISSION_STATE_MAX_AGE_SECONDS
+from bugbounty_gpt.env import WORKER_ID, LEASE_SECONDS, LEASE_BATCH_SIZE, RATE_LIMITS
+from bugbounty_gpt.env import DEDUP_MAX_SUBMISSIONS, DEDUP_TTL_SECONDS, DB_WRITE_BATCH_SIZE, DB_WRITE_FLUSH_SECONDS
+from bugbounty_gpt.env import CLASSIFICATION_CACHE_MAX_ENTRIES, CLASSIFICATION_CACHE_TTL_SECONDS, NEAR_DUPLICATE_SETTINGS
+from bugbounty_gpt.env import CLASSIFICATION_BATCH_SIZE, CLASSIFICATION_BATCH_MAX_REPORT_CHARACTERS, CLASSIFICATION_BATCH_MAX_WAIT_SECONDS, RULES
+from bugbounty_gpt.env import CLASSIFICATION_BATCH_MAX_CONTEXT_TOKENS, CLASSIFICATION_MAX_REJECTIONS, DEFAULT_CATEGORY
+from bugbounty_gpt.env import MAX_DESCRIPTION_TOKENS, MIN_BLOB_CHARACTERS, FULL_SWEEP_SECONDS, PAGE_FETCH_CONCURRENCY
+from bugbounty_gpt.env import WEBHOOK_SETTINGS, BUGCROWD_WEBHOOK_SECRET, POLL_MIN_INTERVAL_SECONDS, POLL_MAX_INTERVAL_SECONDS, POLL_BACKOFF_FACTOR
+from bugbounty_gpt.classification_cache import ClassificationCache
+from bugbounty_gpt.near_duplicates import NearDuplicateIndex
+from bugbounty_gpt.rule_engine import RuleEngine
+from bugbounty_gpt.preprocessing import DescriptionPreprocessor
+from bugbounty_gpt.polling import AdaptivePollScheduler, IncrementalPoller
+from bugbounty_gpt.webhooks import WebhookReceiver
+from bugbounty_gpt.in_scope import InScopeExecutor
+from bugbounty_gpt.outbox import OutboxWorker
+from bugbounty_gpt.leases import LeaseHeartbeat
+from bugbounty_gpt.db.submission_writer import SubmissionWriter
+from bugbounty_gpt.dedup import SeenSubmissionIndex
+from bugbounty_gpt.submission_states import SubmissionStateCache
+from bugbounty_gpt.rejections import RejectionTracker
+from bugbounty_gpt.pipeline import bounded_map
+from bugbounty_gpt import backfill
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
@@ -24,11 +49,152 @@ SessionLocal = sessionmaker(
     expire_on_commit=False,
 )
 
-SEEN_SUBMISSIONS = []
+NEW_SUBMISSIONS_POLLER = IncrementalPoller('new_submissions', FULL_SWEEP_SECONDS)
+# Serializes polling cycles and webhook processing, so a submission is never commented on twice
+PROCESSING_LOCK = asyncio.Lock()
+SEEN_SUBMISSIONS = SeenSubmissionIndex(DEDUP_MAX_SUBMISSIONS, DEDUP_TTL_SECONDS)
+SUBMISSION_STATES = SubmissionStateCache(SUBMISSION_STATE_MAX_SUBMISSIONS, SUBMISSION_STATE_MAX_AGE_SECONDS)
+OUTBOX = OutboxWorker(
+    IN_SCOPE_CONCURRENCY,
+    OUTBOX_SETTINGS['max_attempts'],
+    OUTBOX_SETTINGS['base_delay_seconds'],
+    OUTBOX_SETTINGS['max_delay_seconds'],
+    OUTBOX_SETTINGS['batch_size'],
+    WORKER_ID,
+    LEASE_SECONDS,
+    RATE_LIMITS['bugcrowd']['requests_per_minute'],
+    SUBMISSION_STATES,
+)
+RULE_ENGINE = RuleEngine(RULES)
+REJECTIONS = RejectionTracker(CLASSIFICATION_MAX_REJECTIONS)
+PREPROCESSOR = DescriptionPreprocessor(MAX_DESCRIPTION_TOKENS, MIN_BLOB_CHARACTERS)
+CLASSIFICATION_CACHE = ClassificationCache(CLASSIFICATION_CACHE_MAX_ENTRIES, CLASSIFICATION_CACHE_TTL_SECONDS)
+CLASSIFICATION_BATCHER = ClassificationBatcher(
+    CLASSIFICATION_BATCH_SIZE,
+    CLASSIFICATION_BATCH_MAX_REPORT_CHARACTERS,
+    CLASSIFICATION_BATCH_MAX_WAIT_SECONDS,
+    CLASSIFICATION_BATCH_MAX_CONTEXT_TOKENS,
+)
+NEAR_DUPLICATES = NearDuplicateIndex(
+    NEAR_DUPLICATE_SETTINGS['threshold'],
+    NEAR_DUPLICATE_SETTINGS['num_perm'],
+    NEAR_DUPLICATE_SETTINGS['bands'],
+    NEAR_DUPLICATE_SETTINGS['max_entries'],
+) if NEAR_DUPLICATE_SETTINGS['enabled'] else None
+
+async def _classify_submission(submission):
+    """
+    Classifies a single BugCrowd submission.
+
+    Content matching a configured rule is classified by the rule. Otherwise, identical content reuses a cached
+    classification, and content that is a near-duplicate of an already classified submission reuses that
+    submission's classification, all without calling OpenAI.
 
-async def process_new_submissions():
+    :param submission: Submission data as returned by the BugCrowd API.
+    :return: Dictionary of submission data ready to be stored in the database, or None if the OpenAI request
+        failed and the submission is left for the next cycle. A submission whose request OpenAI keeps rejecting
+        is stored with the default category, so it is triaged by hand.
+    """
+    submission_id = submission['id']
+    user_id = submission['relationships']['researcher']['data']['id']
+    submission_content = submission['attributes']['description']
+    signature = NEAR_DUPLICATES.signature(submission_content) if NEAR_DUPLICATES is not None else None
+
+    async def classify(content):
+        if signature is not None and (match := NEAR_DUPLICATES.query(signature)) is not None:
+            matched_submission_id, classification, reasoning, similarity = match
+            NEAR_DUPLICATES.matches += 1
+            logger.info(f"Submission {submission_id} is a near-duplicate of {matched_submission_id} ({similarity:.0%} similar), reusing its classification.")
+            return classification, reasoning
+        return await CLASSIFICATION_BATCHER.classify(PREPROCESSOR.preprocess(content))
+
+    if (rule_classification := RULE_ENGINE.classify(submission_content)) is not None:
+        classification, reasoning = rule_classification
+    else:
+        try:
+            classification, reasoning = await CLASSIFICATION_CACHE.classify(submission_content, classify)
+        except ClassificationError as error:
+            if not error.rejected or not REJECTIONS.record(submission_id):
+                logger.error(f"Could not classify submission {submission_id}, leaving it for the next cycle: {error}")
+                return None
+            logger.error(f"OpenAI rejected submission {submission_id} {REJECTIONS.max_rejections} times, storing it with the default category: {error}")
+            classification, reasoning = DEFAULT_CATEGORY, CLASSIFICATION_ERROR_MESSAGE
+        if signature is not None and reasoning != CLASSIFICATION_ERROR_MESSAGE:
+            NEAR_DUPLICATES.add(submission_id, signature, classification, reasoning)
+
+    return {
+        'submission_id': submission_id,
+        'user_id': user_id,
+        'classification': classification,
+        'submission_state': SubmissionState.NEW,
+        'reasoning': reasoning,
+        'content_signature': signature.tobytes() if signature is not None else None
+    }
+
+async def _unknown_submissions(session, pages):
+    """
+    Filters out submissions that have already been processed, one page at a time.
+
+    Each page is checked against the in-memory index first, and the remaining IDs are resolved against the
+    database with a single query, so known submissions are skipped before any classification request.
+    The cached classifications of the remaining submissions are then loaded with one more query.
+
+    :param session: Database session object.
+    :param pages: Async iterator over pages of submissions.
+    :return: Async iterator over submissions that are neither seen nor stored.
+    """
+    async for submissions in pages:
+        SUBMISSION_STATES.record_listing(submissions)
+        unseen_submissions = [submission for submission in submissions if submission['id'] not in SEEN_SUBMISSIONS]
+        if not unseen_submissions:
+            continue
+
+        existing_ids = await db_handler.find_existing_submission_ids(session, [submission['id'] for submission in unseen_submissions])
+        SEEN_SUBMISSIONS.update(existing_ids)
+        unknown_submissions = [submission for submission in unseen_submissions if submission['id'] not in existing_ids]
+
+        await CLASSIFICATION_CACHE.flush(session)
+        await CLASSIFICATION_CACHE.prefetch(session, [submission['attributes']['description'] for submission in unknown_submissions])
+        for submission in unknown_submissions:
+            yield submission
+
+async def _store_new_submissions(session, pages):
+    """
+    Classifies the unknown submissions of a stream of pages and stores them in the database.
+
+    Submissions are classified concurrently, up to the configured classification concurrency, so
+    classification starts with the first page. Results are buffered and stored in batches as
+    classifications complete. Submissions are marked as seen once they are stored; those that could not be
+    classified or stored are not, so the next poll lists them again.
+
+    :param session: Database session object.
+    :param pages: Async iterator over pages of submissions.
+    :return: Tuple of (number of submissions stored, number of submissions that could not be classified).
+    """
+    failed = 0
+    def mark_seen(submissions_data):
+        SEEN_SUBMISSIONS.update(submission_data['submission_id'] for submission_data in submissions_data)
+
+    async with SubmissionWriter(session, DB_WRITE_BATCH_SIZE, DB_WRITE_FLUSH_SECONDS, mark_seen) as writer:
+        async for submission_data in bounded_map(_classify_submission, _unknown_submissions(session, pages), CLASSIFICATION_CONCURRENCY):
+            if submission_data is None:
+                failed += 1
+                continue
+            await writer.add(submission_data)
+    return writer.inserted, failed
+
+async def process_new_submissions(bugcrowd_api):
     """
     Fetch and process new submissions that are not duplicates and store them in the database.
+
+    Only the submissions submitted since the previous poll are listed, apart from periodic full sweeps.
+    Submissions are streamed from BugCrowd page by page and classified as the pages arrive. When several
+    replicas run, only the one holding the lease on the poll cursor polls; the others skip this step. The
+    lease is renewed while the poll runs, and if another replica takes it over anyway, e.g. after a database
+    outage, this poll stops and leaves the cursor alone.
+
+    :param bugcrowd_api: Shared BugCrowdAPI client.
+    :return: Number of new submissions stored.
     """
     params = {
         'filter[program]': FILTER_PROGRAM,
@@ -37,64 +203,252 @@ async def process_new_submissions():
     }
 
     async with SessionLocal() as session:
-        if (submissions := await BugCrowdAPI.fetch_submissions(params)) is not None:
-            for submission in submissions:
-                # Submission processing
-                submission_id = submission['id']
-                if submission_id in SEEN_SUBMISSIONS:
-                    continue
-
-                user_id = submission['relationships']['researcher']['data']['id']
-                submission_content = submission['attributes']['description']
-                classification, reasoning = await OpenAIHandler.classify_submission(submission_content)
-                submission_data = {
-                    'submission_id': submission_id,
-                    'user_id': user_id,
-                    'classification': classification,
-                    'submission_state': SubmissionState.NEW,
-                    'reasoning': reasoning
-                }
-                SEEN_SUBMISSIONS.append(submission_id)
-                await db_handler.insert_submission(session, submission_data)
-
-async def process_in_scope_submissions():
-    """
-    Process submissions that are in scope by generating comments, assigning users, closing submissions,
-    and updating their state in the database.
+        if not await db_handler.lease_poll_cursor(session, NEW_SUBMISSIONS_POLLER.name, WORKER_ID, LEASE_SECONDS):
+            logger.info("Another worker is polling new submissions, skipping.")
+            return 0
+
+        try:
+            async with SessionLocal() as heartbeat_session:
+                async def renew():
+                    return await db_handler.lease_poll_cursor(heartbeat_session, NEW_SUBMISSIONS_POLLER.name, WORKER_ID, LEASE_SECONDS)
+
+                async with LeaseHeartbeat("the poll cursor", renew, LEASE_SECONDS / 3) as heartbeat:
+                    pages = heartbeat.guard(NEW_SUBMISSIONS_POLLER.pages(session, bugcrowd_api, params))
+                    stored, failed = await _store_new_submissions(session, pages)
+
+            if heartbeat.lost:
+                logger.warning("Another worker took over the poll cursor, not saving it.")
+            else:
+                if failed:
+                    # Keep the cursor where it was, so the next poll lists the failed submissions again
+                    logger.warning(f"Could not classify {failed} submissions, not moving the poll cursor.")
+                await NEW_SUBMISSIONS_POLLER.save(session, advance=not failed)
+        finally:
+            await db_handler.release_poll_cursor_lease(session, NEW_SUBMISSIONS_POLLER.name, WORKER_ID)
+
+        await CLASSIFICATION_CACHE.flush(session)
+        await CLASSIFICATION_CACHE.prune(session)
+        logger.info(f"Classification cache: {CLASSIFICATION_CACHE.hits} hits, {CLASSIFICATION_CACHE.misses} misses since startup.")
+        logger.info(f"Made {CLASSIFICATION_BATCHER.requests} OpenAI classification requests since startup.")
+        logger.info(f"Rule matches since startup: {dict(RULE_ENGINE.matches)}.")
+        if REJECTIONS.given_up:
+            logger.warning(f"Stored {REJECTIONS.given_up} submissions rejected by OpenAI with the default category since startup.")
+        logger.info(f"Preprocessing saved {PREPROCESSOR.tokens_saved} of {PREPROCESSOR.tokens_in} description tokens since startup, truncating {PREPROCESSOR.truncated} of {PREPROCESSOR.descriptions} descriptions.")
+    return stored
+
+async def process_in_scope_submissions(bugcrowd_api):
+    """
+    Process submissions that are in scope by queuing comments and closures in the outbox, updating their
+    state in the database, then performing the queued actions that are due.
+
+    Submissions are checked concurrently, up to the configured in-scope concurrency, and a failure only
+    affects its own submission. The states of the submissions are taken from recent listings where possible,
+    so most submissions are not fetched again before being closed. State changes are collected while the
+    batch is processed and written with one statement per state at the end of the batch. Failed actions are
+    retried by later cycles with backoff, without holding up the other submissions. Submissions are leased
+    while they are processed, so replicas processing at the same time never act on the same submission.
+
+    :param bugcrowd_api: Shared BugCrowdAPI client.
     """
     async with SessionLocal() as session:
         states = [SubmissionState.NEW]
         classifications = RESPONSE_CATEGORIES # Using the RESPONSE_CATEGORIES from config
-        in_scope_submissions = await db_handler.fetch_submission_by_state_and_classification(session, states, classifications)
+        in_scope_submissions = await db_handler.lease_submissions(session, states, classifications, WORKER_ID, LEASE_SECONDS, LEASE_BATCH_SIZE)
+        leased_ids = [submission.submission_id for submission in in_scope_submissions]
+        params = {
+            'filter[program]': FILTER_PROGRAM,
+            'filter[state]': 'new'
+        }
+        executor = InScopeExecutor(bugcrowd_api, IN_SCOPE_CONCURRENCY, SUBMISSION_STATES)
 
-        for submission_data in in_scope_submissions:
-            submission = BugCrowdSubmission(submission_data.submission_id, submission_data.classification, submission_data.reasoning)
-            user_id = USER_ID # From config
+        try:
+            async with SessionLocal() as heartbeat_session:
+                async def renew():
+                    return bool(await db_handler.renew_submission_leases(heartbeat_session, WORKER_ID, leased_ids, LEASE_SECONDS))
 
-            if await submission.is_submission_new():
-                comment_body = submission.generate_comment_text()
+                async with LeaseHeartbeat(f"{len(leased_ids)} in-scope submissions", renew, LEASE_SECONDS / 3):
+                    await SUBMISSION_STATES.refresh(bugcrowd_api, params, leased_ids)
+                    await executor.run(in_scope_submissions)
+        finally:
+            try:
+                # Actions are queued before the states are recorded; if this is interrupted in between, the next
+                # cycle queues them again and their idempotency keys drop the duplicates
+                await db_handler.enqueue_outbox_actions(session, executor.actions)
+                for new_state, submission_ids in executor.state_updates.items():
+                    await db_handler.update_submission_states(session, submission_ids, new_state)
+            finally:
+                await db_handler.release_submission_leases(session, WORKER_ID, leased_ids)
+        if executor.failed:
+            logger.warning(f"Failed to act on {len(executor.failed)} of {len(in_scope_submissions)} in-scope submissions.")
+        logger.info(f"Submission states: {SUBMISSION_STATES.hits} reused, {SUBMISSION_STATES.misses} fetched since startup.")
 
-                if comment_body:
-                    await submission.create_comment(comment_body)
-                    await submission.close_submission()
-                    await db_handler.update_submission_state(session, submission.submission_id, SubmissionState.UPDATED)
-            else:
-                await db_handler.update_submission_state(session, submission.submission_id, SubmissionState.UPDATED_OUT_OF_BAND)
+        await OUTBOX.drain(session, bugcrowd_api)
+        logger.info(f"Outbox: {OUTBOX.done} actions done, {OUTBOX.retried} retried, {OUTBOX.dead} dead-lettered, {OUTBOX.superseded} dropped as already triaged since startup.")
+
+async def _webhook_submission_pages(bugcrowd_api, submission_ids):
+    """
+    Fetches the submissions announced by webhooks, keeping those that are still new and not duplicates.
+
+    :param bugcrowd_api: Shared BugCrowdAPI client.
+    :param submission_ids: IDs of the submissions to fetch.
+    :return: Async iterator over a single page of submissions.
+    """
+    submissions = []
+    async for submission_document in bounded_map(bugcrowd_api.fetch_submission, submission_ids, PAGE_FETCH_CONCURRENCY):
+        submission = (submission_document or {}).get('data')
+        if submission and submission['attributes'].get('state') == 'new' and not submission['attributes'].get('duplicate'):
+            submissions.append(submission)
+    if submissions:
+        yield submissions
+
+async def process_webhook_submissions(bugcrowd_api, submission_ids):
+    """
+    Classifies and stores the submissions announced by webhooks, then acts on the in-scope submissions.
+
+    :param bugcrowd_api: Shared BugCrowdAPI client.
+    :param submission_ids: IDs of the submissions announced by webhooks.
+    """
+    async with SessionLocal() as session:
+        await _store_new_submissions(session, _webhook_submission_pages(bugcrowd_api, submission_ids))
+        await CLASSIFICATION_CACHE.flush(session)
+    await process_in_scope_submissions(bugcrowd_api)
+
+async def consume_webhooks(bugcrowd_api, queue):
+    """
+    Processes the submissions announced by webhooks as they arrive, batching those that arrive together.
+
+    Failures are logged and left to the next polling cycle.
+
+    :param bugcrowd_api: Shared BugCrowdAPI client.
+    :param queue: asyncio.Queue of submission IDs filled by the webhook receiver.
+    """
+    while True:
+        submission_ids = {await queue.get()}
+        while not queue.empty():
+            submission_ids.add(queue.get_nowait())
+
+        async with PROCESSING_LOCK:
+            try:
+                await process_webhook_submissions(bugcrowd_api, sorted(submission_ids))
+            except Exception as error:
+                logger.error(f"Failed to process webhook submissions {sorted(submission_ids)}: {error}")
+
+async def _poll(bugcrowd_api, scheduler):
+    """
+    Repeatedly fetches and processes new submissions and in-scope submissions.
+
+    A step that fails with a transport error, including one refused by an open circuit breaker, is logged and
+    left to the next cycle, and the wait before that cycle backs off as if the cycle was idle.
+
+    :param bugcrowd_api: Shared BugCrowdAPI client.
+    :param scheduler: AdaptivePollScheduler choosing the wait between two cycles.
+    """
+    while True:
+        new_submissions = 0
+        failed = False
+        async with PROCESSING_LOCK:
+            logger.info("Fetching and processing new submissions...")
+            try:
+                new_submissions = await process_new_submissions(bugcrowd_api)
+            except httpx.TransportError as error:
+                failed = True
+                logger.error(f"Failed to process new submissions, backing off: {error!r}")
+
+            logger.info("Processing in-scope submissions...")
+            try:
+                await process_in_scope_submissions(bugcrowd_api)
+            except httpx.TransportError as error:
+                failed = True
+                logger.error(f"Failed to process in-scope submissions, backing off: {error!r}")
+
+        seconds_waited = scheduler.next_interval(0 if failed else new_submissions, bugcrowd_api.pop_retry_after())
+        logger.info(f"Doing nothing for {seconds_waited:.0f} seconds ({scheduler.summary()})....")
+        await asyncio.sleep(seconds_waited)
 
 async def main():
     """
     Main loop that repeatedly fetches and processes new submissions and in-scope submissions.
+
+    In webhook mode, submissions announced by BugCrowd webhooks are processed as soon as they arrive, and
+    polling only runs as a slower safety net.
     """
-    while True:
-        logger.info("Fetching and processing new submissions...")
-        await process_new_submissions()
+    async with SessionLocal() as session:
+        await SEEN_SUBMISSIONS.warm(session)
+        if NEAR_DUPLICATES is not None:
+            # Error and rule classifications are never indexed by _classify_submission, so leave them out here too
+            await NEAR_DUPLICATES.warm(session, [CLASSIFICATION_ERROR_MESSAGE, *RULE_ENGINE.reasonings])
+
+    try:
+        async with BugCrowdAPI() as bugcrowd_api:
+            if not WEBHOOK_SETTINGS['enabled']:
+                await _poll(bugcrowd_api, AdaptivePollScheduler(POLL_MIN_INTERVAL_SECONDS, POLL_MAX_INTERVAL_SECONDS, POLL_BACKOFF_FACTOR))
+                return
+
+            queue = asyncio.Queue()
+            receiver = WebhookReceiver(
+                BUGCROWD_WEBHOOK_SECRET,
+                queue,
+                WEBHOOK_SETTINGS['host'],
+                WEBHOOK_SETTINGS['port'],
+                WEBHOOK_SETTINGS['path'],
+                WEBHOOK_SETTINGS['signature_header'],
+                WEBHOOK_SETTINGS['max_body_bytes'],
+            )
+            async with receiver:
+                consumer = asyncio.create_task(consume_webhooks(bugcrowd_api, queue))
+                try:
+                    safety_net_seconds = WEBHOOK_SETTINGS['safety_net_poll_minutes'] * 60
+                    await _poll(bugcrowd_api, AdaptivePollScheduler(safety_net_seconds, safety_net_seconds, POLL_BACKOFF_FACTOR))
+                finally:
+                    consumer.cancel()
+    finally:
+        await OpenAIHandler.aclose()
+
+async def run_backfill(arguments):
+    """
+    Exports unclassified submissions to a batch request file, or imports the classifications of a batch result file.
+
+    :param arguments: Parsed command line arguments of the backfill command.
+    """
+    submission_state = SubmissionState.NEW if arguments.new else SubmissionState.UPDATED_OUT_OF_BAND
+    async with SessionLocal() as session:
+        if arguments.action == 'export':
+            params = {
+                'filter[program]': FILTER_PROGRAM,
+                'filter[duplicate]': 'false'
+            }
+            if arguments.state:
+                params['filter[state]'] = arguments.state
+            async with BugCrowdAPI() as bugcrowd_api:
+                await backfill.export_batch_file(bugcrowd_api, session, arguments.path, params, RULE_ENGINE, PREPROCESSOR, submission_state)
+        else:
+            await backfill.import_result_file(session, arguments.path, submission_state)
+
+def parse_arguments(argv=None):
+    """
+    Parses the command line arguments. Without a command, the classifier runs its polling loop.
+
+    :param argv: Arguments to parse, defaults to sys.argv.
+    :return: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(prog="python -m bugbounty_gpt", description="Classifies BugCrowd submissions with OpenAI.")
+    commands = parser.add_subparsers(dest='command')
+    backfill_parser = commands.add_parser('backfill', help="Classify historical submissions offline with a batch file.")
+    actions = backfill_parser.add_subparsers(dest='action', required=True)
 
-        logger.info("Processing in-scope submissions...")
-        await process_in_scope_submissions()
+    export_parser = actions.add_parser('export', help="Write a batch request file for the submissions not stored yet.")
+    export_parser.add_argument('path', help="JSONL batch request file to write.")
+    export_parser.add_argument('--state', help="Only export submissions in this BugCrowd state. Defaults to every state.")
 
-        minutes_waited = 1
-        logger.info(f"Doing nothing for {minutes_waited} minutes....")
-        await asyncio.sleep(60 * minutes_waited)
+    import_parser = actions.add_parser('import', help="Store the classifications of a batch result file.")
+    import_parser.add_argument('path', help="JSONL batch result file to read.")
+    for action_parser in (export_parser, import_parser):
+        action_parser.add_argument('--new', action='store_true', help="Store the submissions as NEW so the in-scope loop acts on them.")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    arguments = parse_arguments()
+    if arguments.command == 'backfill':
+        asyncio.run(run_backfill(arguments))
+    else:
+        asyncio.run(main())
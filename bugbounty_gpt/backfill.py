@@ -0,0 +1,153 @@
+import json
+import logging
+from bugbounty_gpt.db import db_handler
+from bugbounty_gpt.db.submission_writer import SubmissionWriter
+from bugbounty_gpt.env import DB_WRITE_BATCH_SIZE, DB_WRITE_FLUSH_SECONDS
+from bugbounty_gpt.handlers.openai_handler import OpenAIHandler, CLASSIFICATION_ERROR_MESSAGE
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+def _custom_id(submission_id, user_id):
+    """
+    Builds the custom ID of a batch request, which the batch result echoes back.
+
+    :param submission_id: ID of the submission.
+    :param user_id: ID of the researcher who created the submission.
+    :return: Custom ID carrying both IDs.
+    """
+    return f"{submission_id}:{user_id}"
+
+def _parse_custom_id(custom_id):
+    """
+    Recovers the submission and researcher IDs from the custom ID of a batch result.
+
+    :param custom_id: Custom ID built by _custom_id.
+    :return: Tuple of (submission ID, user ID).
+    """
+    submission_id, user_id = custom_id.split(":", 1)
+    return submission_id, user_id
+
+def build_batch_request(submission, preprocessor):
+    """
+    Builds the batch request line classifying one BugCrowd submission.
+
+    :param submission: Submission data as returned by the BugCrowd API.
+    :param preprocessor: DescriptionPreprocessor condensing the description, as for the live classifier.
+    :return: Dictionary in the chat completions batch request format.
+    """
+    user_id = submission['relationships']['researcher']['data']['id']
+    return {
+        "custom_id": _custom_id(submission['id'], user_id),
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": OpenAIHandler._build_request_data(preprocessor.preprocess(submission['attributes']['description']))
+    }
+
+def _rule_classification(submission, rule_engine, submission_state):
+    """
+    Classifies a submission with the configured rules, as the live classifier does before calling OpenAI.
+
+    :param submission: Submission data as returned by the BugCrowd API.
+    :param rule_engine: RuleEngine holding the configured rules.
+    :param submission_state: State stored with the submission.
+    :return: Dictionary of submission data ready to be stored in the database, or None if no rule matches.
+    """
+    rule_classification = rule_engine.classify(submission['attributes']['description'])
+    if rule_classification is None:
+        return None
+    classification, reasoning = rule_classification
+    return {
+        'submission_id': submission['id'],
+        'user_id': submission['relationships']['researcher']['data']['id'],
+        'classification': classification,
+        'submission_state': submission_state,
+        'reasoning': reasoning,
+        'content_signature': None
+    }
+
+def parse_batch_result(result, submission_state):
+    """
+    Converts one batch result line into submission data ready to be stored in the database.
+
+    :param result: Decoded batch result line.
+    :param submission_state: State stored with the submission.
+    :return: Dictionary of submission data, or None if the request failed or its answer could not be parsed.
+    """
+    submission_id, user_id = _parse_custom_id(result['custom_id'])
+    response = result.get('response') or {}
+    if result.get('error') or response.get('status_code') != 200:
+        logger.error(f"Batch request for submission {submission_id} failed: {result.get('error') or response.get('status_code')}")
+        return None
+
+    classification, reasoning = OpenAIHandler._handle_response(response['body'])
+    if reasoning == CLASSIFICATION_ERROR_MESSAGE:
+        return None
+    return {
+        'submission_id': submission_id,
+        'user_id': user_id,
+        'classification': classification,
+        'submission_state': submission_state,
+        'reasoning': reasoning,
+        'content_signature': None
+    }
+
+async def export_batch_file(bugcrowd_api, session, path, params, rule_engine, preprocessor, submission_state):
+    """
+    Writes a batch request file classifying every listed submission that is not stored in the database yet.
+
+    Submissions go through the same steps as in the live classifier: those matching a configured rule are
+    classified by the rule and stored right away, and the description of the others is preprocessed before
+    it is written to the batch file.
+
+    :param bugcrowd_api: BugCrowdAPI client.
+    :param session: Database session object.
+    :param path: Path of the JSONL file to write.
+    :param params: Query parameters selecting the submissions to export.
+    :param rule_engine: RuleEngine holding the configured rules.
+    :param preprocessor: DescriptionPreprocessor condensing the descriptions.
+    :param submission_state: State stored with the submissions classified by a rule.
+    :return: Tuple of the number of requests written and the number of submissions classified by a rule.
+    """
+    exported = 0
+    async with SubmissionWriter(session, DB_WRITE_BATCH_SIZE, DB_WRITE_FLUSH_SECONDS) as writer:
+        with open(path, "w", encoding="utf-8") as batch_file:
+            async for page in bugcrowd_api.iter_submission_pages(params):
+                existing_ids = await db_handler.find_existing_submission_ids(session, [submission['id'] for submission in page])
+                for submission in page:
+                    if submission['id'] in existing_ids:
+                        continue
+                    if (submission_data := _rule_classification(submission, rule_engine, submission_state)) is not None:
+                        await writer.add(submission_data)
+                        continue
+                    batch_file.write(json.dumps(build_batch_request(submission, preprocessor), ensure_ascii=False) + "\n")
+                    exported += 1
+    logger.info(f"Exported {exported} submissions to {path}, stored {writer.inserted} classified by a rule.")
+    return exported, writer.inserted
+
+async def import_result_file(session, path, submission_state):
+    """
+    Stores the classifications of a batch result file in the database.
+
+    Failed requests and unparseable answers are skipped, so the submissions they belong to are exported again
+    by the next backfill. Submissions already stored are left untouched.
+
+    :param session: Database session object.
+    :param path: Path of the JSONL result file to read.
+    :param submission_state: State stored with the submissions.
+    :return: Tuple of the number of submissions stored and the number of results skipped.
+    """
+    skipped = 0
+    async with SubmissionWriter(session, DB_WRITE_BATCH_SIZE, DB_WRITE_FLUSH_SECONDS) as writer:
+        with open(path, encoding="utf-8") as result_file:
+            for line in result_file:
+                if not line.strip():
+                    continue
+                submission_data = parse_batch_result(json.loads(line), submission_state)
+                if submission_data is None:
+                    skipped += 1
+                else:
+                    await writer.add(submission_data)
+    logger.info(f"Imported {writer.inserted} submissions from {path}, skipped {skipped} results.")
+    return writer.inserted, skipped
@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import logging
+import re
+import time
+import unicodedata
+from datetime import timedelta
+from bugbounty_gpt.db import db_handler
+from bugbounty_gpt.ttl_map import TTLMap
+from bugbounty_gpt.env import OPENAI_MODEL, OPENAI_PROMPT
+from bugbounty_gpt.handlers.openai_handler import CLASSIFICATION_ERROR_MESSAGE
+
+logger = logging.getLogger(__name__)
+
+PROMPT_VERSION = hashlib.sha256(OPENAI_PROMPT.encode()).hexdigest()[:16]
+
+def normalize_content(content):
+    """
+    Normalizes submission content so trivially different copies of the same text hash identically.
+
+    :param content: The content of the submission.
+    :return: Content with Unicode compatibility forms folded, lower-cased, and whitespace collapsed.
+    """
+    content = unicodedata.normalize('NFKC', content or '')
+    return re.sub(r'\s+', ' ', content).strip().lower()
+
+def cache_key(content, model=OPENAI_MODEL, prompt_version=PROMPT_VERSION):
+    """
+    Computes the cache key of submission content.
+
+    :param content: The content of the submission.
+    :param model: Model used to classify the content.
+    :param prompt_version: Version of the prompt used to classify the content.
+    :return: Hex SHA-256 digest of the normalized content, model and prompt version.
+    """
+    key_material = '\x00'.join([model, prompt_version, normalize_content(content)])
+    return hashlib.sha256(key_material.encode()).hexdigest()
+
+class ClassificationCache:
+    def __init__(self, max_entries, ttl_seconds, clock=time.monotonic):
+        """
+        Initializes a ClassificationCache object.
+
+        Classifications are kept in a bounded in-memory LRU in front of the 'classification_cache' table.
+        Database reads and writes are batched: prefetch loads a page of keys with one query, and flush writes
+        every new entry with one statement. Concurrent requests for the same content share one classification.
+
+        :param max_entries: Maximum number of classifications kept in memory.
+        :param ttl_seconds: Number of seconds a classification stays valid.
+        :param clock: Monotonic clock function used to expire in-memory entries.
+        """
+        self.max_entries = max_entries
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self._entries = TTLMap(max_entries, ttl_seconds, clock)
+        self._in_flight = {}
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key):
+        """
+        Returns a classification from memory, marking it as recently used.
+
+        :param key: Cache key.
+        :return: Tuple of (classification, reasoning), or None if not cached.
+        """
+        return self._entries.get(key, touch=True)
+
+    def _put(self, key, entry):
+        """
+        Stores a classification in memory, evicting the least recently used entry if full.
+
+        :param key: Cache key.
+        :param entry: Tuple of (classification, reasoning).
+        """
+        self._entries.set(key, entry)
+
+    async def prefetch(self, session, contents):
+        """
+        Loads the cached classifications of several contents from the database into memory, in one query.
+
+        :param session: Database session object.
+        :param contents: Contents of the submissions about to be classified.
+        """
+        missing_keys = {key for key in map(cache_key, contents) if key not in self._entries}
+        cached = await db_handler.fetch_cached_classifications(session, missing_keys, self.ttl)
+        for key, entry in cached.items():
+            self._put(key, entry)
+
+    async def classify(self, content, classify):
+        """
+        Returns the cached classification of the content, classifying it on a cache miss.
+
+        Results carrying the classification error message are returned but never cached.
+
+        :param content: The content of the submission.
+        :param classify: Coroutine function classifying the content on a cache miss.
+        :return: Tuple of (classification, reasoning).
+        """
+        key = cache_key(content)
+        if (entry := self._get(key)) is not None:
+            self.hits += 1
+            return entry
+        if key in self._in_flight:
+            self.hits += 1
+            return await asyncio.shield(self._in_flight[key])
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            entry = await classify(content)
+            future.set_result(entry)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            future.exception()  # Mark as retrieved in case no other caller was waiting
+            raise
+        finally:
+            del self._in_flight[key]
+
+        if entry[1] != CLASSIFICATION_ERROR_MESSAGE:
+            self._put(key, entry)
+            self._pending[key] = {'cache_key': key, 'classification': entry[0], 'reasoning': entry[1]}
+        return entry
+
+    async def flush(self, session):
+        """
+        Writes the classifications made since the last flush to the database, in one statement.
+
+        :param session: Database session object.
+        """
+        if not self._pending:
+            return
+        entries, self._pending = list(self._pending.values()), {}
+        await db_handler.insert_cached_classifications(session, entries)
+
+    async def prune(self, session):
+        """
+        Deletes expired classifications from the database.
+
+        :param session: Database session object.
+        """
+        await db_handler.delete_expired_cached_classifications(session, self.ttl)
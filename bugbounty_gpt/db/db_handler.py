@@ -1,5 +1,8 @@
-from bugbounty_gpt.db.models import Submission
-from sqlalchemy import select
+from bugbounty_gpt.db.models import ClassificationCache, OutboxAction, OutboxStatus, PollCursor, Submission
+from sqlalchemy import String, any_, bindparam, delete, exists, func, or_, select, update
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from datetime import timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,25 +20,117 @@ async def _find_submission_by_id(session, submission_id):
     result = await session.execute(stmt)
     return result.scalar_one_or_none()
 
+async def find_existing_submission_ids(session, submission_ids):
+    """
+    Resolves which of the given submissions are already stored in the database, in a single query.
+
+    :param session: Database session object.
+    :param submission_ids: IDs of the submissions to look up.
+    :return: Set of the IDs that already exist.
+    """
+    submission_ids = list(submission_ids)
+    if not submission_ids:
+        return set()
+
+    logger.info(f"Checking {len(submission_ids)} submissions against the database.")
+    stmt = select(Submission.submission_id).filter(Submission.submission_id.in_(submission_ids))
+    result = await session.execute(stmt)
+    return set(result.scalars().all())
+
+async def insert_submissions(session, submissions_data):
+    """
+    Inserts several submissions in a single statement, skipping any that already exist.
+
+    :param session: Database session object.
+    :param submissions_data: List of dictionaries containing the submission data.
+    :return: Number of submissions actually inserted.
+    """
+    if not submissions_data:
+        return 0
+
+    logger.info(f"Inserting {len(submissions_data)} submissions.")
+    stmt = (
+        insert(Submission)
+        .values(submissions_data)
+        .on_conflict_do_nothing(index_elements=[Submission.submission_id])
+        .returning(Submission.submission_id)
+    )
+    result = await session.execute(stmt)
+    inserted_ids = result.scalars().all()
+    await session.commit()
+    if len(inserted_ids) < len(submissions_data):
+        logger.info(f"Skipped {len(submissions_data) - len(inserted_ids)} submissions that already exist.")
+    return len(inserted_ids)
+
 async def insert_submission(session, submission_data):
     """
     Inserts a new submission into the database if it does not exist.
 
     :param session: Database session object.
     :param submission_data: Dictionary containing the submission data.
+    :return: True if the submission was inserted, False if it already existed.
+    """
+    return await insert_submissions(session, [submission_data]) == 1
+
+async def fetch_recent_submission_ids(session, limit):
     """
-    submission_id = submission_data['submission_id']
-    logger.info(f"Checking if submission {submission_id} already exists.")
-    existing_submission = await _find_submission_by_id(session, submission_id)
+    Fetches the IDs of the most recently stored submissions.
 
-    if existing_submission:
-        logger.info(f"Submission {submission_id} already exists, skipping insert.")
-    else:
-        logger.info(f"Inserting submission {submission_id}.")
-        async with session:
-            submission = Submission(**submission_data)
-            session.add(submission)
-            await session.commit()
+    :param session: Database session object.
+    :param limit: Maximum number of IDs to fetch.
+    :return: List of submission IDs, most recent first.
+    """
+    logger.info(f"Fetching up to {limit} recent submission IDs from database.")
+    stmt = select(Submission.submission_id).order_by(Submission.created_at.desc()).limit(limit)
+    result = await session.execute(stmt)
+    return result.scalars().all()
+
+async def fetch_submission_signatures(session, limit, excluded_reasonings=()):
+    """
+    Fetches the content signatures and classifications of the most recently stored submissions.
+
+    :param session: Database session object.
+    :param limit: Maximum number of submissions to fetch.
+    :param excluded_reasonings: Reasonings of the submissions to leave out.
+    :return: List of (submission ID, signature bytes, classification name, reasoning) tuples, most recent first.
+    """
+    logger.info(f"Fetching up to {limit} submission signatures from database.")
+    stmt = (
+        select(Submission.submission_id, Submission.content_signature, Submission.classification, Submission.reasoning)
+        .filter(
+            Submission.content_signature.is_not(None),
+            Submission.classification.is_not(None),
+            or_(Submission.reasoning.is_(None), Submission.reasoning.not_in(list(excluded_reasonings)))
+        )
+        .order_by(Submission.created_at.desc())
+        .limit(limit)
+    )
+    result = await session.execute(stmt)
+    return [(submission_id, signature, classification.name, reasoning) for submission_id, signature, classification, reasoning in result.all()]
+
+async def update_submission_states(session, submission_ids, new_state):
+    """
+    Updates the state of several submissions in the database with a single statement.
+
+    :param session: Database session object.
+    :param submission_ids: IDs of the submissions to be updated.
+    :param new_state: New state to be assigned to the submissions.
+    :return: Number of submissions updated.
+    """
+    submission_ids = list(submission_ids)
+    if not submission_ids:
+        return 0
+
+    logger.info(f"Updating {len(submission_ids)} submissions to {new_state.name}.")
+    stmt = (
+        update(Submission)
+        .where(Submission.submission_id == any_(bindparam('submission_ids', submission_ids, type_=ARRAY(String))))
+        .values(submission_state=new_state)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(stmt)
+    await session.commit()
+    return result.rowcount
 
 async def update_submission_state(session, submission_id, new_state):
     """
@@ -46,42 +141,395 @@ async def update_submission_state(session, submission_id, new_state):
     :param new_state: New state to be assigned to the submission.
     :return: True if the update was successful, False otherwise.
     """
-    logger.info(f"Updating submission {submission_id}.")
+    return await update_submission_states(session, [submission_id], new_state) == 1
+
+async def fetch_submission_by_id(session, submission_id):
+    """
+    Fetches a submission from the database by its ID.
+
+    :param session: Database session object.
+    :param submission_id: ID of the submission to be fetched.
+    :return: Submission object if found, None otherwise.
+    """
+    logger.info(f"Fetching submission {submission_id} from database.")
     async with session:
-        submission = await _find_submission_by_id(session, submission_id)
-        if submission:
-            submission.submission_state = new_state
-            await session.commit()
-            return True
-        else:
-            return False
+        return session.query(Submission).filter(Submission.submission_id == submission_id).first()
+
+async def fetch_cached_classifications(session, cache_keys, ttl):
+    """
+    Fetches cached classifications for several content hashes in a single query.
+
+    :param session: Database session object.
+    :param cache_keys: Content hashes to look up.
+    :param ttl: Maximum age of an entry, as a timedelta. Older entries are treated as expired and ignored.
+    :return: Dictionary mapping each cached key to a (classification name, reasoning) tuple.
+    """
+    cache_keys = list(cache_keys)
+    if not cache_keys:
+        return {}
+
+    stmt = select(ClassificationCache).filter(
+        ClassificationCache.cache_key.in_(cache_keys),
+        ClassificationCache.created_at > func.now() - ttl
+    )
+    result = await session.execute(stmt)
+    return {entry.cache_key: (entry.classification.name, entry.reasoning) for entry in result.scalars().all()}
+
+async def insert_cached_classifications(session, entries):
+    """
+    Stores several cached classifications in a single statement, replacing existing entries for the same key.
+
+    :param session: Database session object.
+    :param entries: List of dictionaries with 'cache_key', 'classification' and 'reasoning' keys.
+    """
+    if not entries:
+        return
+
+    logger.info(f"Caching {len(entries)} classifications.")
+    stmt = insert(ClassificationCache).values(entries)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ClassificationCache.cache_key],
+        set_={
+            'classification': stmt.excluded.classification,
+            'reasoning': stmt.excluded.reasoning,
+            'created_at': func.now(),
+        }
+    )
+    await session.execute(stmt)
+    await session.commit()
+
+async def delete_expired_cached_classifications(session, ttl):
+    """
+    Deletes cached classifications older than the given age.
+
+    :param session: Database session object.
+    :param ttl: Maximum age of an entry, as a timedelta.
+    :return: Number of entries deleted.
+    """
+    stmt = delete(ClassificationCache).where(ClassificationCache.created_at <= func.now() - ttl)
+    result = await session.execute(stmt)
+    await session.commit()
+    if result.rowcount:
+        logger.info(f"Deleted {result.rowcount} expired cached classifications.")
+    return result.rowcount
+
+async def fetch_poll_cursor(session, name):
+    """
+    Fetches a poll cursor by its name.
+
+    :param session: Database session object.
+    :param name: Name of the cursor.
+    :return: PollCursor object or None if the cursor does not exist yet.
+    """
+    result = await session.execute(select(PollCursor).filter(PollCursor.name == name))
+    return result.scalars().first()
+
+async def save_poll_cursor(session, name, submitted_at, submission_id, last_full_sweep_at):
+    """
+    Creates or moves a poll cursor.
+
+    :param session: Database session object.
+    :param name: Name of the cursor.
+    :param submitted_at: Submission time of the newest submission seen.
+    :param submission_id: ID of the newest submission seen.
+    :param last_full_sweep_at: Timestamp of the last full sweep of the listing.
+    """
+    logger.info(f"Moving poll cursor '{name}' to submission {submission_id} submitted at {submitted_at}.")
+    values = {'submitted_at': submitted_at, 'submission_id': submission_id, 'last_full_sweep_at': last_full_sweep_at}
+    stmt = insert(PollCursor).values(name=name, **values)
+    stmt = stmt.on_conflict_do_update(index_elements=[PollCursor.name], set_={**values, 'updated_at': func.now()})
+    await session.execute(stmt)
+    await session.commit()
+
+async def enqueue_outbox_actions(session, actions):
+    """
+    Queues several outbox actions in a single statement, skipping any whose idempotency key is already queued.
+
+    :param session: Database session object.
+    :param actions: List of dictionaries with 'idempotency_key', 'submission_id', 'action' and 'payload' keys.
+    :return: Number of actions actually queued.
+    """
+    if not actions:
+        return 0
 
-async def fetch_submission_by_state_and_classification(session, states, classifications):
+    stmt = (
+        insert(OutboxAction)
+        .values(actions)
+        .on_conflict_do_nothing(index_elements=[OutboxAction.idempotency_key])
+        .returning(OutboxAction.id)
+    )
+    result = await session.execute(stmt)
+    queued_ids = result.scalars().all()
+    await session.commit()
+    logger.info(f"Queued {len(queued_ids)} outbox actions, skipping {len(actions) - len(queued_ids)} already queued.")
+    return len(queued_ids)
+
+def _is_blocked_outbox_action():
+    """
+    Builds the condition matching outbox actions queued after a dead-lettered action of the same submission.
+
+    :return: SQL expression on OutboxAction.
+    """
+    earlier = aliased(OutboxAction)
+    return exists().where(
+        earlier.submission_id == OutboxAction.submission_id,
+        earlier.id < OutboxAction.id,
+        earlier.status == OutboxStatus.DEAD
+    )
+
+async def fetch_pending_outbox_actions(session, submission_ids):
+    """
+    Fetches the pending outbox actions of several submissions in the order they were queued.
+
+    Actions of a submission with a dead-lettered earlier action are left out, since they must not run before it.
+
+    :param session: Database session object.
+    :param submission_ids: IDs of the submissions whose actions to fetch.
+    :return: List of OutboxAction objects.
     """
-    Fetches submissions that meet certain state and classification criteria.
+    submission_ids = list(submission_ids)
+    if not submission_ids:
+        return []
+
+    stmt = (
+        select(OutboxAction)
+        .filter(
+            OutboxAction.submission_id.in_(submission_ids),
+            OutboxAction.status == OutboxStatus.PENDING,
+            ~_is_blocked_outbox_action()
+        )
+        .order_by(OutboxAction.id)
+    )
+    result = await session.execute(stmt)
+    return result.scalars().all()
+
+async def record_outbox_attempt(session, action_id, status, attempts, next_attempt_at=None, last_error=None):
+    """
+    Records the outcome of an attempt to perform an outbox action.
 
     :param session: Database session object.
+    :param action_id: ID of the action.
+    :param status: New status of the action.
+    :param attempts: Number of attempts made so far.
+    :param next_attempt_at: Earliest time of the next attempt, for actions that are still pending.
+    :param last_error: Error of the attempt, if it failed.
+    """
+    values = {'status': status, 'attempts': attempts, 'last_error': last_error}
+    if next_attempt_at is not None:
+        values['next_attempt_at'] = next_attempt_at
+    await session.execute(update(OutboxAction).where(OutboxAction.id == action_id).values(**values))
+    await session.commit()
+
+def _lease_statement(condition, worker_id, lease_seconds, limit):
+    """
+    Builds the statement leasing the submissions matching a condition that no other worker holds a lease on.
+
+    Candidate rows are locked with FOR UPDATE SKIP LOCKED, so workers leasing at the same time skip each
+    other's rows instead of waiting for them, and each submission is leased by a single worker.
+
+    :param condition: SQL expression selecting the submissions to lease.
+    :param worker_id: ID of the worker taking the leases.
+    :param lease_seconds: Number of seconds before the leases lapse.
+    :param limit: Maximum number of submissions to lease.
+    :return: UPDATE statement returning the leased submissions.
+    """
+    candidates = (
+        select(Submission.submission_id)
+        .filter(condition, or_(Submission.lease_expires_at.is_(None), Submission.lease_expires_at < func.now()))
+        .order_by(Submission.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(Submission)
+        .where(Submission.submission_id.in_(candidates.scalar_subquery()))
+        .values(leased_by=worker_id, lease_expires_at=func.now() + timedelta(seconds=lease_seconds))
+        .returning(Submission)
+        .execution_options(synchronize_session=False)
+    )
+
+async def _lease_submissions(session, stmt, lease_seconds):
+    """
+    Runs a lease statement built by _lease_statement.
+
+    :param session: Database session object.
+    :param stmt: Lease statement.
+    :param lease_seconds: Number of seconds before the leases lapse.
+    :return: List of the leased Submission objects, oldest first.
+    """
+    result = await session.execute(stmt)
+    submissions = sorted(result.scalars().all(), key=lambda submission: submission.created_at)
+    await session.commit()
+    if submissions:
+        logger.info(f"Leased {len(submissions)} submissions for {lease_seconds} seconds.")
+    return submissions
+
+def lease_submissions_statement(states, classifications, worker_id, lease_seconds, limit):
+    """
+    Builds the statement run by lease_submissions, so it can be inspected and benchmarked on its own.
+
     :param states: List of states to filter the submissions.
     :param classifications: List of classifications to filter the submissions.
-    :return: List of submissions that meet the criteria.
+    :param worker_id: ID of the worker taking the leases.
+    :param lease_seconds: Number of seconds before the leases lapse.
+    :param limit: Maximum number of submissions to lease.
+    :return: UPDATE statement returning the leased submissions.
     """
-    logger.info("Fetching submissions meeting states & classification criteria.")
-    async with session:
-        stmt = select(Submission).filter(
-            Submission.submission_state.in_(states),
-            Submission.classification.in_(classifications)
+    condition = Submission.submission_state.in_(states) & Submission.classification.in_(classifications)
+    return _lease_statement(condition, worker_id, lease_seconds, limit)
+
+async def lease_submissions(session, states, classifications, worker_id, lease_seconds, limit):
+    """
+    Leases submissions that meet certain state and classification criteria, skipping those leased by other workers.
+
+    :param session: Database session object.
+    :param states: List of states to filter the submissions.
+    :param classifications: List of classifications to filter the submissions.
+    :param worker_id: ID of the worker taking the leases.
+    :param lease_seconds: Number of seconds before the leases lapse.
+    :param limit: Maximum number of submissions to lease.
+    :return: List of the leased Submission objects.
+    """
+    stmt = lease_submissions_statement(states, classifications, worker_id, lease_seconds, limit)
+    return await _lease_submissions(session, stmt, lease_seconds)
+
+async def lease_submissions_with_pending_actions(session, worker_id, lease_seconds, limit):
+    """
+    Leases submissions that have pending outbox actions due, skipping those leased by other workers.
+
+    :param session: Database session object.
+    :param worker_id: ID of the worker taking the leases.
+    :param lease_seconds: Number of seconds before the leases lapse.
+    :param limit: Maximum number of submissions to lease.
+    :return: List of the leased Submission objects.
+    """
+    condition = exists().where(
+        OutboxAction.submission_id == Submission.submission_id,
+        OutboxAction.status == OutboxStatus.PENDING,
+        OutboxAction.next_attempt_at <= func.now(),
+        ~_is_blocked_outbox_action()
+    )
+    stmt = _lease_statement(condition, worker_id, lease_seconds, limit)
+    return await _lease_submissions(session, stmt, lease_seconds)
+
+async def renew_submission_leases(session, worker_id, submission_ids, lease_seconds):
+    """
+    Extends the leases a worker still holds on several submissions.
+
+    Leases that lapsed and were taken over by another worker are left alone.
+
+    :param session: Database session object.
+    :param worker_id: ID of the worker holding the leases.
+    :param submission_ids: IDs of the leased submissions.
+    :param lease_seconds: Number of seconds from now before the leases lapse.
+    :return: Set of the IDs of the submissions whose lease the worker still holds.
+    """
+    submission_ids = list(submission_ids)
+    if not submission_ids:
+        return set()
+
+    stmt = (
+        update(Submission)
+        .where(Submission.submission_id.in_(submission_ids), Submission.leased_by == worker_id)
+        .values(lease_expires_at=func.now() + timedelta(seconds=lease_seconds))
+        .returning(Submission.submission_id)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(stmt)
+    renewed = set(result.scalars().all())
+    await session.commit()
+    return renewed
+
+async def claim_outbox_action(session, action_id, submission_id, worker_id, lease_seconds):
+    """
+    Checks, right before an outbox action is performed, that the worker still holds the lease on its
+    submission and that the action is still pending, extending the lease if so.
+
+    :param session: Database session object.
+    :param action_id: ID of the action about to be performed.
+    :param submission_id: ID of the submission the action applies to.
+    :param worker_id: ID of the worker holding the lease.
+    :param lease_seconds: Number of seconds from now before the lease lapses.
+    :return: True if the worker may perform the action, False if another worker may have performed it.
+    """
+    stmt = (
+        update(Submission)
+        .where(
+            Submission.submission_id == submission_id,
+            Submission.leased_by == worker_id,
+            Submission.lease_expires_at > func.now(),
+            exists().where(OutboxAction.id == action_id, OutboxAction.status == OutboxStatus.PENDING)
         )
-        result = await session.execute(stmt)
-        return result.scalars().all()
+        .values(lease_expires_at=func.now() + timedelta(seconds=lease_seconds))
+        .returning(Submission.submission_id)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(stmt)
+    claimed = result.scalar_one_or_none() is not None
+    await session.commit()
+    return claimed
 
-async def fetch_submission_by_id(session, submission_id):
+async def release_submission_leases(session, worker_id, submission_ids):
     """
-    Fetches a submission from the database by its ID.
+    Releases the leases a worker holds on several submissions.
 
     :param session: Database session object.
-    :param submission_id: ID of the submission to be fetched.
-    :return: Submission object if found, None otherwise.
+    :param worker_id: ID of the worker holding the leases.
+    :param submission_ids: IDs of the leased submissions.
     """
-    logger.info(f"Fetching submission {submission_id} from database.")
-    async with session:
-        return session.query(Submission).filter(Submission.submission_id == submission_id).first()
+    submission_ids = list(submission_ids)
+    if not submission_ids:
+        return
+
+    stmt = (
+        update(Submission)
+        .where(Submission.submission_id.in_(submission_ids), Submission.leased_by == worker_id)
+        .values(leased_by=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(stmt)
+    await session.commit()
+
+async def lease_poll_cursor(session, name, worker_id, lease_seconds):
+    """
+    Leases a poll cursor, so a single worker polls its listing at a time.
+
+    The cursor is created if it does not exist yet. A worker can renew a lease it already holds.
+
+    :param session: Database session object.
+    :param name: Name of the cursor.
+    :param worker_id: ID of the worker taking the lease.
+    :param lease_seconds: Number of seconds before the lease lapses.
+    :return: True if the lease was taken, False if another worker holds it.
+    """
+    lease_expires_at = func.now() + timedelta(seconds=lease_seconds)
+    stmt = insert(PollCursor).values(name=name, leased_by=worker_id, lease_expires_at=lease_expires_at)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PollCursor.name],
+        set_={'leased_by': worker_id, 'lease_expires_at': lease_expires_at},
+        where=or_(
+            PollCursor.lease_expires_at.is_(None),
+            PollCursor.lease_expires_at < func.now(),
+            PollCursor.leased_by == worker_id
+        )
+    ).returning(PollCursor.name)
+    result = await session.execute(stmt)
+    leased = result.scalar_one_or_none() is not None
+    await session.commit()
+    return leased
+
+async def release_poll_cursor_lease(session, name, worker_id):
+    """
+    Releases the lease a worker holds on a poll cursor.
+
+    :param session: Database session object.
+    :param name: Name of the cursor.
+    :param worker_id: ID of the worker holding the lease.
+    """
+    stmt = (
+        update(PollCursor)
+        .where(PollCursor.name == name, PollCursor.leased_by == worker_id)
+        .values(leased_by=None, lease_expires_at=None)
+    )
+    await session.execute(stmt)
+    await session.commit()
@@ -1,6 +1,9 @@
 from alembic.config import Config
 from alembic import command
-from sqlalchemy import create_engine, inspect
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from alembic.util.exc import CommandError
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.exc import OperationalError
 from bugbounty_gpt.env import SQLALCHEMY_URL
 import time
@@ -19,18 +22,54 @@ MAX_ATTEMPTS = 5
 # Time (in seconds) to wait between each attempt
 WAIT_TIME = 5
 
+# Revision matching the schema that was auto-generated before migrations were tracked in the repository
+BASELINE_REVISION = "0001"
+# Key of the advisory lock held while migrating, so replicas starting together do not migrate at the same time
+MIGRATION_LOCK_KEY = 7262010
+
+def _has_known_revision(connection, alembic_cfg):
+    """
+    Checks whether the database is stamped with a revision that exists in the migration scripts.
+
+    :param connection: Open database connection.
+    :param alembic_cfg: Alembic configuration.
+    :return: True if the current revision is known, False if the database is unstamped or stamped with an unknown revision.
+    """
+    current_revision = MigrationContext.configure(connection).get_current_revision()
+    if current_revision is None:
+        return False
+    try:
+        return ScriptDirectory.from_config(alembic_cfg).get_revision(current_revision) is not None
+    except CommandError:
+        return False
+
 def check_and_init_submission_table(engine):
     """
-    Checks if the 'submission' table exists, and if not, runs an alembic migration to create it.
+    Brings the database schema up to date by running the alembic migrations.
+
+    Databases whose 'submission' table was created by the former auto-generated migration are stamped with
+    the baseline revision first, so only the migrations added since then are applied. Migrations run under
+    an advisory lock, so several replicas can start at the same time.
 
     :param engine: The SQLAlchemy engine to use for inspecting the database and running migrations.
     """
-    inspector = inspect(engine)
-    if "submission" not in inspector.get_table_names():
-        logger.info("Submission table not found - attempting alembic auto-generate & init.")
-        alembic_cfg = Config("/usr/src/app/alembic.ini")
-        command.revision(alembic_cfg, autogenerate=True, message="Auto-generated migration for 'submission' table.")
-        command.upgrade(alembic_cfg, "head")
+    alembic_cfg = Config("/usr/src/app/alembic.ini")
+    with engine.connect() as lock_connection:
+        lock_connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        try:
+            inspector = inspect(engine)
+            if "submission" in inspector.get_table_names():
+                with engine.connect() as connection:
+                    has_known_revision = _has_known_revision(connection, alembic_cfg)
+                if not has_known_revision:
+                    logger.info("Submission table found without a tracked migration - stamping baseline revision.")
+                    command.stamp(alembic_cfg, BASELINE_REVISION, purge=True)
+            else:
+                logger.info("Submission table not found - creating schema from migrations.")
+
+            command.upgrade(alembic_cfg, "head")
+        finally:
+            lock_connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
 
 def attempt_database_connection(engine):
     """
@@ -1,6 +1,6 @@
 from enum import Enum
 from bugbounty_gpt.env import VALID_CATEGORIES
-from sqlalchemy import Column, DateTime, Integer, String, Text, func, Enum as SqlEnum
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, LargeBinary, String, Text, func, text, Enum as SqlEnum
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -30,6 +30,16 @@ class SubmissionState(Enum):
     UPDATED_OUT_OF_BAND = 2
     UPDATED = 3
 
+class OutboxActionType(Enum):
+    COMMENT = 1
+    CLOSE = 2
+    ASSIGN = 3
+
+class OutboxStatus(Enum):
+    PENDING = 1
+    DONE = 2
+    DEAD = 3
+
 class Submission(Base):
     """
     Defines the Submission database table.
@@ -40,15 +50,103 @@ class Submission(Base):
         reasoning: Reasoning text for the submission.
         classification: Classification of the report using the ReportCategory enum.
         submission_state: State of the submission using the SubmissionState enum.
+        content_signature: MinHash signature of the submission description, used to find near-duplicates.
+        leased_by: ID of the worker currently acting on the submission.
+        lease_expires_at: Time after which the lease lapses and another worker may act on the submission.
         created_at: Timestamp of submission creation.
         updated_at: Timestamp of the last update to the submission.
     """
     __tablename__ = "submission"
+    __table_args__ = (
+        # Serves the candidate lookup of lease_submissions, run every cycle, without scanning the whole table
+        # (see benchmarks/submission_state_query.py)
+        Index("ix_submission_state_classification", "submission_state", "classification"),
+        # Covers the same NEW-state lookup; stays small as processed submissions accumulate
+        Index("ix_submission_new_classification", "classification", postgresql_where=text("submission_state = 'NEW'")),
+    )
 
     submission_id = Column(String(100), primary_key=True)
     user_id = Column(String(100))
     reasoning = Column(Text)
     classification = Column(SqlEnum(ReportCategory))
     submission_state = Column(SqlEnum(SubmissionState))
+    content_signature = Column(LargeBinary)
+    leased_by = Column(String(100))
+    lease_expires_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class ClassificationCache(Base):
+    """
+    Defines the ClassificationCache database table.
+
+    Attributes:
+        cache_key: Hash of the normalized submission content, model and prompt version.
+        classification: Classification of the content using the ReportCategory enum.
+        reasoning: Reasoning text for the classification.
+        created_at: Timestamp of the classification, used to expire the entry.
+    """
+    __tablename__ = "classification_cache"
+
+    cache_key = Column(String(64), primary_key=True)
+    classification = Column(SqlEnum(ReportCategory))
+    reasoning = Column(Text)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
+
+class PollCursor(Base):
+    """
+    Defines the PollCursor database table.
+
+    Attributes:
+        name: Name of the submission listing the cursor tracks.
+        submitted_at: Submission time of the newest submission seen in the listing.
+        submission_id: ID of the newest submission seen in the listing.
+        last_full_sweep_at: Timestamp of the last time the whole listing was fetched.
+        leased_by: ID of the worker currently polling the listing.
+        lease_expires_at: Time after which the lease lapses and another worker may poll the listing.
+        updated_at: Timestamp of the last update to the cursor.
+    """
+    __tablename__ = "poll_cursor"
+
+    name = Column(String(50), primary_key=True)
+    submitted_at = Column(DateTime(timezone=True))
+    submission_id = Column(String(100))
+    last_full_sweep_at = Column(DateTime(timezone=True))
+    leased_by = Column(String(100))
+    lease_expires_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class OutboxAction(Base):
+    """
+    Defines the OutboxAction database table.
+
+    Attributes:
+        id: Sequential ID of the action. The actions of a submission are performed in ID order.
+        idempotency_key: Unique key of the action, so the same action is never queued twice.
+        submission_id: ID of the submission the action applies to.
+        action: Type of the action using the OutboxActionType enum.
+        payload: Parameters of the action, such as the comment body.
+        status: Status of the action using the OutboxStatus enum.
+        attempts: Number of times the action has been attempted.
+        next_attempt_at: Earliest time of the next attempt.
+        last_error: Error of the last failed attempt.
+        created_at: Timestamp of the action being queued.
+        updated_at: Timestamp of the last update to the action.
+    """
+    __tablename__ = "outbox_action"
+    __table_args__ = (
+        # Keeps the drain query on the pending actions as done and dead-lettered actions accumulate
+        Index("ix_outbox_action_pending", "submission_id", "id", postgresql_where=text("status = 'PENDING'")),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    idempotency_key = Column(String(200), nullable=False, unique=True)
+    submission_id = Column(String(100), nullable=False, index=True)
+    action = Column(SqlEnum(OutboxActionType), nullable=False)
+    payload = Column(JSON)
+    status = Column(SqlEnum(OutboxStatus), nullable=False, default=OutboxStatus.PENDING, server_default=OutboxStatus.PENDING.name)
+    attempts = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,64 @@
+import time
+import logging
+from bugbounty_gpt.db import db_handler
+
+logger = logging.getLogger(__name__)
+
+class SubmissionWriter:
+    def __init__(self, session, flush_size, flush_interval, on_flush=None, clock=time.monotonic):
+        """
+        Initializes a SubmissionWriter object.
+
+        Buffers classified submissions and writes them with one multi-row insert once `flush_size` rows are
+        buffered or the oldest buffered row has waited `flush_interval` seconds. Anything still buffered is
+        written when the writer is closed.
+
+        :param session: Database session object.
+        :param flush_size: Number of buffered submissions that triggers a write.
+        :param flush_interval: Maximum number of seconds a submission is buffered before the next write.
+        :param on_flush: Optional function called with the submissions of each write, once it succeeded.
+        :param clock: Monotonic clock function used to age the buffer.
+        """
+        self.session = session
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._on_flush = on_flush
+        self._clock = clock
+        self._buffer = []
+        self._buffered_since = None
+        self.inserted = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.flush()
+
+    def __len__(self):
+        return len(self._buffer)
+
+    async def add(self, submission_data):
+        """
+        Buffers a submission for writing, flushing the buffer if it is full or old enough.
+
+        :param submission_data: Dictionary containing the submission data.
+        """
+        if not self._buffer:
+            self._buffered_since = self._clock()
+        self._buffer.append(submission_data)
+
+        if len(self._buffer) >= self.flush_size or self._clock() - self._buffered_since >= self.flush_interval:
+            await self.flush()
+
+    async def flush(self):
+        """
+        Writes every buffered submission in a single statement.
+        """
+        if not self._buffer:
+            return
+
+        submissions_data, self._buffer = self._buffer, []
+        self._buffered_since = None
+        self.inserted += await db_handler.insert_submissions(self.session, submissions_data)
+        if self._on_flush is not None:
+            self._on_flush(submissions_data)
@@ -0,0 +1,55 @@
+import time
+import logging
+from bugbounty_gpt.db import db_handler
+from bugbounty_gpt.ttl_map import TTLMap
+
+logger = logging.getLogger(__name__)
+
+class SeenSubmissionIndex:
+    def __init__(self, max_size, ttl_seconds=None, clock=time.monotonic):
+        """
+        Initializes a SeenSubmissionIndex object.
+
+        Tracks the IDs of submissions that have already been processed with O(1) lookups. The index holds at
+        most `max_size` IDs, evicting the least recently seen first, and forgets IDs after `ttl_seconds`.
+
+        :param max_size: Maximum number of submission IDs to remember.
+        :param ttl_seconds: Number of seconds an ID is remembered for, or None to only evict by size.
+        :param clock: Monotonic clock function used to expire entries.
+        """
+        self.max_size = max_size
+        self._entries = TTLMap(max_size, ttl_seconds, clock)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, submission_id):
+        return submission_id in self._entries
+
+    def add(self, submission_id):
+        """
+        Marks a submission as seen, evicting the least recently seen submission if the index is full.
+
+        :param submission_id: ID of the submission.
+        """
+        self._entries.set(submission_id, True)
+
+    def update(self, submission_ids):
+        """
+        Marks several submissions as seen.
+
+        :param submission_ids: Iterable of submission IDs.
+        """
+        for submission_id in submission_ids:
+            self.add(submission_id)
+
+    async def warm(self, session):
+        """
+        Loads the most recently stored submissions from the database into the index.
+
+        :param session: Database session object.
+        """
+        submission_ids = await db_handler.fetch_recent_submission_ids(session, self.max_size)
+        # Oldest first, so the most recent submissions are the last to be evicted
+        self.update(reversed(submission_ids))
+        logger.info(f"Warmed seen submission index with {len(submission_ids)} submissions.")
@@ -1,4 +1,6 @@
+import importlib.util
 import os
+import socket
 import yaml
 import re
 import logging
@@ -37,11 +39,86 @@ def validate_response_pairs(config: dict):
         if 'name' not in item or 'response' not in item:
             raise ValueError("Each response category must contain 'name' and 'response' keys.")
 
+QUANTIFIER = re.compile(r'([*+?]|\{\d*(,\d*)?\})([?+]?)')
+
+def _unbounded_quantifier_at(pattern: str, index: int):
+    """Returns the end of the quantifier at an index, and whether it repeats without bound and may backtrack."""
+    match = QUANTIFIER.match(pattern, index)
+    if match is None:
+        return index, False
+    repeat, upper_bound, mode = match.groups()
+    unbounded = repeat in ('*', '+') or upper_bound == ','
+    return match.end(), unbounded and mode != '+'
+
+def has_nested_quantifiers(pattern: str) -> bool:
+    """
+    Tells whether a pattern repeats, without bound, a group that itself contains an unbounded quantifier, such
+    as '(?:a+)+'. Such patterns can backtrack exponentially on crafted input. Possessive quantifiers, atomic
+    groups and lookarounds do not backtrack into what they matched, so they are not counted.
+    """
+    groups = []  # For each open group: [whether it is atomic, whether it contains an unbounded quantifier]
+    index = 0
+    in_class = False
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            index += 2
+            continue
+        if in_class:
+            in_class = char != ']'
+            index += 1
+        elif char == '[':
+            in_class = True
+            # A ']' right after the opening bracket is a literal
+            index += 3 if pattern.startswith('[^]', index) else 2 if pattern.startswith('[]', index) else 1
+        elif char == '(':
+            groups.append([pattern.startswith(('(?>', '(?=', '(?!', '(?<=', '(?<!'), index), False])
+            index += 1
+        elif char == ')' and groups:
+            atomic, contains_unbounded = groups.pop()
+            index, unbounded = _unbounded_quantifier_at(pattern, index + 1)
+            contains_unbounded = contains_unbounded and not atomic
+            if unbounded and contains_unbounded:
+                return True
+            if groups and (unbounded or contains_unbounded):
+                groups[-1][1] = True
+        else:
+            end, unbounded = _unbounded_quantifier_at(pattern, index)
+            if end > index:
+                if unbounded and groups:
+                    groups[-1][1] = True
+                index = end
+            else:
+                index += 1
+    return False
+
+def validate_rules(config: dict):
+    """Ensures that each rule is complete and classifies into one of the valid categories."""
+    valid_categories = set(config['categories']['valid'])
+    for rule in config['rules']:
+        if not {'name', 'category', 'reasoning'} <= rule.keys():
+            raise ValueError("Each rule must contain 'name', 'category' and 'reasoning' keys.")
+        if not rule.get('patterns') and not rule.get('keywords'):
+            raise ValueError(f"Rule '{rule['name']}' must contain 'patterns' or 'keywords'.")
+        if rule['category'] not in valid_categories:
+            raise ValueError(f"Rule '{rule['name']}' must classify into one of the valid categories.")
+        for pattern in rule.get('patterns', []):
+            if has_nested_quantifiers(pattern):
+                logger.warning(f"Pattern {pattern!r} in rule '{rule['name']}' repeats a group containing an unbounded quantifier, so crafted reports can make it backtrack for hours. Use possessive quantifiers or atomic groups instead.")
+
+def validate_http_settings(config: dict):
+    """Ensures that HTTP/2 is only enabled when the 'h2' package it needs is installed."""
+    for name, http_settings in config['http'].items():
+        if http_settings['http2'] and importlib.util.find_spec('h2') is None:
+            raise ValueError(f"HTTP/2 is enabled for '{name}' but the 'h2' package is not installed. Install httpx[http2] or set 'http2' to false.")
+
 def validate_config(config: dict):
     """Validates the entire configuration."""
     validate_valid_categories(config)
     validate_response_categories_subset(config)
     validate_response_pairs(config)
+    validate_rules(config)
+    validate_http_settings(config)
 
 CONFIG = load_config()
 
@@ -50,9 +127,71 @@ API_BASE_URL = CONFIG['api']['base_url']
 BUGCROWD_API_KEY = os.getenv('BUGCROWD_API_KEY')
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = CONFIG['api']['openai_model']
+OPENAI_BASE_URL = CONFIG['api']['openai_base_url']
+OPENAI_BACKEND = CONFIG['api']['openai_backend']
+
+# HTTP connection pool settings
+BUGCROWD_HTTP_SETTINGS = CONFIG['http']['bugcrowd']
+OPENAI_HTTP_SETTINGS = CONFIG['http']['openai']
+
+# Rate limits, per API endpoint
+RATE_LIMITS = CONFIG['rate_limits']
+
+# Concurrency settings
+CLASSIFICATION_CONCURRENCY = CONFIG['concurrency']['classification']
+PAGE_FETCH_CONCURRENCY = CONFIG['concurrency']['page_fetch']
+IN_SCOPE_CONCURRENCY = CONFIG['concurrency']['in_scope']
+
+# Description preprocessing settings
+MAX_DESCRIPTION_TOKENS = CONFIG['preprocessing']['max_description_tokens']
+MIN_BLOB_CHARACTERS = CONFIG['preprocessing']['min_blob_characters']
+
+# Batched classification settings
+CLASSIFICATION_BATCH_SIZE = CONFIG['classification_batch']['batch_size']
+CLASSIFICATION_BATCH_MAX_REPORT_CHARACTERS = CONFIG['classification_batch']['max_report_characters']
+CLASSIFICATION_BATCH_MAX_WAIT_SECONDS = CONFIG['classification_batch']['max_wait_seconds']
+CLASSIFICATION_BATCH_MAX_CONTEXT_TOKENS = CONFIG['classification_batch']['max_context_tokens']
+
+# Classification failure settings
+CLASSIFICATION_MAX_REJECTIONS = CONFIG['classification_failures']['max_rejections']
+
+# Polling settings
+POLL_MIN_INTERVAL_SECONDS = CONFIG['polling']['min_interval_seconds']
+POLL_MAX_INTERVAL_SECONDS = CONFIG['polling']['max_interval_seconds']
+POLL_BACKOFF_FACTOR = CONFIG['polling']['backoff_factor']
+FULL_SWEEP_SECONDS = CONFIG['polling']['full_sweep_minutes'] * 60
+
+# Webhook settings
+WEBHOOK_SETTINGS = CONFIG['webhooks']
+BUGCROWD_WEBHOOK_SECRET = os.getenv('BUGCROWD_WEBHOOK_SECRET')
+
+# Seen submission index settings
+DEDUP_MAX_SUBMISSIONS = CONFIG['dedup']['max_submissions']
+DEDUP_TTL_SECONDS = CONFIG['dedup']['ttl_hours'] * 3600
+
+# Submission state cache settings
+SUBMISSION_STATE_MAX_SUBMISSIONS = CONFIG['submission_states']['max_submissions']
+SUBMISSION_STATE_MAX_AGE_SECONDS = CONFIG['submission_states']['max_age_seconds']
+
+# Outbox settings
+OUTBOX_SETTINGS = CONFIG['outbox']
+
+# Leasing settings, so several replicas share the work
+WORKER_ID = os.getenv('WORKER_ID') or f"{socket.gethostname()}-{os.getpid()}"
+LEASE_SECONDS = CONFIG['leasing']['lease_seconds']
+LEASE_BATCH_SIZE = CONFIG['leasing']['batch_size']
+
+# Classification cache settings
+CLASSIFICATION_CACHE_MAX_ENTRIES = CONFIG['classification_cache']['max_entries']
+CLASSIFICATION_CACHE_TTL_SECONDS = CONFIG['classification_cache']['ttl_days'] * 86400
+
+# Near-duplicate detection settings
+NEAR_DUPLICATE_SETTINGS = CONFIG['near_duplicates']
 
 # Database settings
 SQLALCHEMY_URL = os.getenv("SQLALCHEMY_URL")
+DB_WRITE_BATCH_SIZE = CONFIG['database']['write_batch_size']
+DB_WRITE_FLUSH_SECONDS = CONFIG['database']['write_flush_seconds']
 
 # Other user-specific settings
 USER_ID = CONFIG['user']['user_id']
@@ -61,6 +200,9 @@ FILTER_PROGRAM = CONFIG['user']['filter_program']
 # OpenAI Prompt
 OPENAI_PROMPT = CONFIG['openai_prompt']
 
+# Pre-classification rules
+RULES = CONFIG['rules']
+
 # Categories & Responses
 VALID_CATEGORIES = sanitize_categories(CONFIG['categories']['valid'])
 RESPONSE_CATEGORIES = sanitize_categories([item['name'] for item in CONFIG['categories']['response']])
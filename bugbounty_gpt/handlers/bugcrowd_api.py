@@ -1,12 +1,88 @@
 import json
-import httpx
 import logging
-import time
-from bugbounty_gpt.env import API_BASE_URL, BUGCROWD_API_KEY
+from datetime import datetime, timezone
+from bugbounty_gpt.env import API_BASE_URL, BUGCROWD_API_KEY, BUGCROWD_HTTP_SETTINGS, PAGE_FETCH_CONCURRENCY
+from bugbounty_gpt.handlers.http_client import build_async_client, parse_retry_after
+from bugbounty_gpt.handlers.rate_limiter import get_rate_limiter
+from bugbounty_gpt.pipeline import bounded_map
 
 logger = logging.getLogger(__name__)
 
 class BugCrowdAPI:
+    def __init__(self, client=None, http_settings=None, rate_limiter=None):
+        """
+        Initializes a BugCrowdAPI object.
+
+        The underlying connection pool is created lazily on first use and shared by every request made
+        through this instance, so connections to the BugCrowd API are kept alive between calls.
+
+        :param client: Optional pre-configured httpx.AsyncClient to use instead of building one.
+        :param http_settings: Connection pool settings. Default is the 'http.bugcrowd' section of the configuration.
+        :param rate_limiter: RateLimiter applied to every request. Default is the shared 'bugcrowd' limiter.
+        """
+        self._client = client
+        self._http_settings = http_settings if http_settings is not None else BUGCROWD_HTTP_SETTINGS
+        self._rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter('bugcrowd')
+        self._retry_after = None
+
+    async def __aenter__(self):
+        self._get_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def _get_client(self):
+        """
+        Returns the shared HTTP client, creating it on first use.
+
+        :return: The pooled httpx.AsyncClient for this instance.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = build_async_client(self._http_settings, 'BugCrowd')
+        return self._client
+
+    async def _request(self, method, url, **kwargs):
+        """
+        Sends a request through the shared client once the rate limiter allows it.
+
+        :param method: HTTP method of the request.
+        :param url: URL of the request.
+        :param kwargs: Additional arguments passed to httpx.AsyncClient.
+        :return: Response object.
+        """
+        await self._rate_limiter.acquire()
+        response = await getattr(self._get_client(), method)(url, **kwargs)
+        if response.status_code in (429, 503):
+            self._record_retry_after(response)
+        return response
+
+    def _record_retry_after(self, response):
+        """
+        Records that BugCrowd asked to slow down, keeping the longest wait requested.
+
+        :param response: The 429 or 503 response.
+        """
+        retry_after = parse_retry_after(response.headers.get('retry-after')) or 0.0
+        logger.warning(f"BugCrowd responded with status {response.status_code}, asking to retry after {retry_after:.0f} seconds.")
+        self._retry_after = max(self._retry_after or 0.0, retry_after)
+
+    def pop_retry_after(self):
+        """
+        Returns and clears the throttling requested by BugCrowd since the last call.
+
+        :return: Longest Retry-After in seconds (0 if throttled without a Retry-After header), or None if BugCrowd did not throttle.
+        """
+        retry_after, self._retry_after = self._retry_after, None
+        return retry_after
+
+    async def aclose(self):
+        """
+        Closes the underlying connection pool.
+        """
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+
     @staticmethod
     def _get_headers(content_type='application/vnd.bugcrowd+json'):
         """
@@ -20,16 +96,15 @@ class BugCrowdAPI:
             'Authorization': f'Token {BUGCROWD_API_KEY}'
         }
 
-    @staticmethod
-    async def _fetch_page(url, params, page_limit, page_offset):
+    async def _fetch_page_document(self, url, params, page_limit, page_offset):
         """
-        Fetches a page of data from the specified URL with pagination.
+        Fetches a page of data from the specified URL with pagination, including the response metadata.
 
         :param url: URL to fetch data from.
         :param params: Parameters to include in the request.
         :param page_limit: Limit of items per page.
         :param page_offset: Offset for pagination.
-        :return: List of data fetched from the page or an empty list if there is an error.
+        :return: Decoded response document, with an empty 'data' list if there is an error.
         """
         pagination_params = {
             'page[limit]': page_limit,
@@ -37,18 +112,141 @@ class BugCrowdAPI:
         }
         complete_params = {**params, **pagination_params}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=BugCrowdAPI._get_headers(), params=complete_params)
-            try:
-                data = response.json()
-            except json.JSONDecodeError as e:
-                logger.error(f"Error: Unable to decode JSON. {e}")
-                return []
+        response = await self._request('get', url, headers=BugCrowdAPI._get_headers(), params=complete_params)
+        try:
+            document = response.json()
+        except json.JSONDecodeError as e:
+            logger.error(f"Error: Unable to decode JSON. {e}")
+            return {'data': []}
+
+        document['data'] = document.get('data') or []
+        return document
+
+    async def _fetch_page(self, url, params, page_limit, page_offset):
+        """
+        Fetches a page of data from the specified URL with pagination.
+
+        :param url: URL to fetch data from.
+        :param params: Parameters to include in the request.
+        :param page_limit: Limit of items per page.
+        :param page_offset: Offset for pagination.
+        :return: List of data fetched from the page or an empty list if there is an error.
+        """
+        document = await self._fetch_page_document(url, params, page_limit, page_offset)
+        return document['data']
+
+    @staticmethod
+    def _total_hits(document):
+        """
+        Reads the total number of matching items from a page's metadata.
+
+        :param document: Decoded response document.
+        :return: Total number of items across all pages, or None if the response does not report it.
+        """
+        meta = document.get('meta') or {}
+        return meta.get('total_hits')
+
+    async def _iter_pages(self, params, page_limit=100):
+        """
+        Fetches the pages of submissions matching the parameters, yielding each page as soon as it arrives.
+
+        The first page reports the total number of matching submissions, so the remaining pages are fetched
+        concurrently and yielded in completion order. If the total is not reported, pages are walked in order
+        until a short page is returned.
+
+        :param params: Parameters to include in the request.
+        :param page_limit: Limit of items per page.
+        :return: Async iterator over (page offset, list of submissions) tuples.
+        """
+        url = f'{API_BASE_URL}/submissions'
+
+        first_page = await self._fetch_page_document(url, params, page_limit, 0)
+        yield 0, first_page['data']
 
-        return data['data'] if data['data'] else []
+        if (total_hits := BugCrowdAPI._total_hits(first_page)) is not None:
+            async def fetch_offset(page_offset):
+                return page_offset, await self._fetch_page(url, params, page_limit, page_offset)
+
+            offsets = range(page_limit, total_hits, page_limit)
+            async for page in bounded_map(fetch_offset, offsets, PAGE_FETCH_CONCURRENCY):
+                yield page
+        else:
+            submissions = first_page['data']
+            page_offset = page_limit
+            while len(submissions) == page_limit:
+                submissions = await self._fetch_page(url, params, page_limit, page_offset)
+                yield page_offset, submissions
+                page_offset += page_limit
+
+    async def iter_submission_pages(self, params):
+        """
+        Streams pages of submissions from BugCrowd as they are fetched.
+
+        :param params: Parameters to include in the request.
+        :return: Async iterator over non-empty lists of submissions, in the order the pages arrive.
+        """
+        logger.info("Streaming submissions from BugCrowd.")
+        async for _, submissions in self._iter_pages(params):
+            if submissions:
+                yield submissions
 
     @staticmethod
-    async def fetch_submissions(params):
+    def submitted_at(submission):
+        """
+        Parses the submission time of a submission.
+
+        :param submission: Submission data as returned by the BugCrowd API.
+        :return: Timezone-aware datetime, or None if the submission has no valid submission time.
+        """
+        try:
+            submitted_at = datetime.fromisoformat(submission['attributes']['submitted_at'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return submitted_at if submitted_at.tzinfo else submitted_at.replace(tzinfo=timezone.utc)
+
+    async def iter_submission_pages_since(self, params, submitted_since, page_limit=100):
+        """
+        Streams the pages of submissions submitted at or after a given time, newest first.
+
+        Pages are requested sorted by submission time and fetched one at a time, so the listing stops at the
+        first page reaching older submissions instead of walking the whole backlog.
+
+        :param params: Parameters to include in the request.
+        :param submitted_since: Timezone-aware datetime of the oldest submission time to return.
+        :param page_limit: Limit of items per page.
+        :return: Async iterator over non-empty lists of submissions.
+        """
+        logger.info(f"Streaming submissions submitted since {submitted_since.isoformat()} from BugCrowd.")
+        url = f'{API_BASE_URL}/submissions'
+        params = {**params, 'sort': 'submitted-desc'}
+        page_offset = 0
+        while True:
+            submissions = await self._fetch_page(url, params, page_limit, page_offset)
+            recent_submissions = []
+            for submission in submissions:
+                submitted_at = BugCrowdAPI.submitted_at(submission)
+                if submitted_at is not None and submitted_at < submitted_since:
+                    break
+                recent_submissions.append(submission)
+            if recent_submissions:
+                yield recent_submissions
+            if len(recent_submissions) < page_limit:
+                return
+            page_offset += page_limit
+
+    async def iter_submissions(self, params):
+        """
+        Streams submissions from BugCrowd page by page, so callers can start processing before the
+        whole listing has been downloaded.
+
+        :param params: Parameters to include in the request.
+        :return: Async iterator over submissions.
+        """
+        async for submissions in self.iter_submission_pages(params):
+            for submission in submissions:
+                yield submission
+
+    async def fetch_submissions(self, params):
         """
         Fetches all submissions from BugCrowd.
 
@@ -56,26 +254,41 @@ class BugCrowdAPI:
         :return: List of all submissions or None if no submissions found.
         """
         logger.info("Fetching submissions from BugCrowd.")
-        url = f'{API_BASE_URL}/submissions'
-        page_limit = 100
-        page_offset = 0
+        pages = [page async for page in self._iter_pages(params)]
         all_submissions = []
-        delay = 2  # Delay in seconds
+        for _, submissions in sorted(pages, key=lambda page: page[0]):
+            all_submissions.extend(submissions)
 
-        while True:
-            submissions = await BugCrowdAPI._fetch_page(url, params, page_limit, page_offset)
-            if not submissions:
-                break
+        return all_submissions if all_submissions else None
 
-            all_submissions.extend(submissions)
-            page_offset += page_limit
+    async def fetch_submissions_within(self, params, max_pages, page_limit=100):
+        """
+        Fetches the submissions matching the parameters, unless the listing is longer than `max_pages` pages.
 
-            time.sleep(delay)  # Add a delay between API calls
+        The first page is always fetched. The remaining pages are only fetched, concurrently, when the first
+        page reports a total that fits within `max_pages` pages.
 
-        return all_submissions if all_submissions else None
+        :param params: Parameters to include in the request.
+        :param max_pages: Maximum number of pages worth fetching.
+        :param page_limit: Limit of items per page.
+        :return: List of the submissions fetched, which is only the first page if the listing is too long.
+        """
+        url = f'{API_BASE_URL}/submissions'
+        first_page = await self._fetch_page_document(url, params, page_limit, 0)
+        submissions = list(first_page['data'])
 
-    @staticmethod
-    async def fetch_submission(submission_id):
+        total_hits = BugCrowdAPI._total_hits(first_page)
+        if total_hits is None or -(-total_hits // page_limit) > max_pages:
+            return submissions
+
+        async def fetch_offset(page_offset):
+            return await self._fetch_page(url, params, page_limit, page_offset)
+
+        async for page in bounded_map(fetch_offset, range(page_limit, total_hits, page_limit), PAGE_FETCH_CONCURRENCY):
+            submissions.extend(page)
+        return submissions
+
+    async def fetch_submission(self, submission_id):
         """
         Fetches a specific submission from BugCrowd.
 
@@ -85,16 +298,14 @@ class BugCrowdAPI:
         logger.info(f"Fetching submission {submission_id} from BugCrowd.")
         url = f'{API_BASE_URL}/submissions/{submission_id}'
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=BugCrowdAPI._get_headers())
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logger.error(f"Failed to fetch submission {submission_id}. Status code: {response.status_code}")
-                return None
+        response = await self._request('get', url, headers=BugCrowdAPI._get_headers())
+        if response.status_code == 200:
+            return response.json()
+        else:
+            logger.error(f"Failed to fetch submission {submission_id}. Status code: {response.status_code}")
+            return None
 
-    @staticmethod
-    async def create_comment(comment_data):
+    async def create_comment(self, comment_data):
         """
         Creates a comment using the provided data.
 
@@ -104,33 +315,28 @@ class BugCrowdAPI:
         url = f'{API_BASE_URL}/comments'
         headers = BugCrowdAPI._get_headers('application/json')
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=comment_data)
-            if response.status_code == 201:
-                logger.info("Comment created successfully.")
-            else:
-                logger.error(f"Failed to create comment. Status code: {response.status_code}")
-            return response
+        response = await self._request('post', url, headers=headers, json=comment_data)
+        if response.status_code == 201:
+            logger.info("Comment created successfully.")
+        else:
+            logger.error(f"Failed to create comment. Status code: {response.status_code}")
+        return response
 
-    @staticmethod
-    async def patch_submission(submission_id, data):
+    async def patch_submission(self, submission_id, data):
         """
         Patches a specific submission on BugCrowd.
 
         :param submission_id: ID of the submission to patch.
         :param data: Data to be patched.
-        :return: Response object from the patch operation or None if an error occurred.
+        :return: Response object from the patch operation.
         """
         logger.info(f"Patching submission {submission_id} on BugCrowd.")
         url = f'{API_BASE_URL}/submissions/{submission_id}'
         headers = BugCrowdAPI._get_headers()
         headers['Content-Type'] = 'application/vnd.bugcrowd.v4+json'
 
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(url, headers=headers, data=json.dumps(data))
-
-            if response.status_code != 200:
-                logger.error(f"Failed to patch submission {submission_id}. Status code: {response.status_code}")
-                return None
+        response = await self._request('patch', url, headers=headers, data=json.dumps(data))
 
+        if response.status_code != 200:
+            logger.error(f"Failed to patch submission {submission_id}. Status code: {response.status_code}")
         return response
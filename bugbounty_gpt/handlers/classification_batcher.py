@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from bugbounty_gpt.handlers.openai_handler import OpenAIHandler, ClassificationError
+
+logger = logging.getLogger(__name__)
+
+class ClassificationBatcher:
+    def __init__(self, batch_size, max_report_characters, max_wait_seconds, max_context_tokens):
+        """
+        Initializes a ClassificationBatcher object.
+
+        Collects the short submissions classified concurrently into batches sent as a single OpenAI request,
+        so the system prompt is paid for once per batch instead of once per submission. A batch is sent as
+        soon as it is full, or `max_wait_seconds` after its first submission arrived. A batch is also sent early
+        when the next submission would take its estimated tokens, completion budget included, past
+        `max_context_tokens`. If a batch request fails, its submissions are classified again one at a time, so a
+        batch the model rejects does not fail every submission in it.
+
+        :param batch_size: Maximum number of submissions per request. 1 disables batching.
+        :param max_report_characters: Submissions longer than this are always classified on their own.
+        :param max_wait_seconds: Maximum number of seconds a submission waits for its batch to fill up.
+        :param max_context_tokens: Maximum number of tokens of a batch request, the model's context window.
+        """
+        if batch_size < 1:
+            raise ValueError("The batch size must be at least 1.")
+        self.batch_size = batch_size
+        self.max_report_characters = max_report_characters
+        self.max_wait_seconds = max_wait_seconds
+        self.max_context_tokens = max_context_tokens
+        self._queue = []
+        self._timer = None
+        self._tasks = set()
+        self.requests = 0
+
+    async def classify(self, submission_content):
+        """
+        Classifies the submission content, batching it with other short submissions.
+
+        :param submission_content: The content of the submission to be classified.
+        :return: A tuple containing the judgment category and explanation.
+        """
+        if self.batch_size == 1 or len(submission_content or '') > self.max_report_characters:
+            self.requests += 1
+            return await OpenAIHandler.classify_submission(submission_content)
+
+        if self._queue and OpenAIHandler.estimate_batch_tokens([content for content, _ in self._queue] + [submission_content]) > self.max_context_tokens:
+            self._dispatch()
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((submission_content, future))
+        if len(self._queue) >= self.batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self._dispatch)
+        return await future
+
+    def _dispatch(self):
+        """
+        Sends the queued submissions as one batch.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._queue = self._queue, []
+        if batch:
+            task = asyncio.create_task(self._classify_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _classify_batch(self, batch):
+        """
+        Classifies a batch and resolves the futures of its submissions.
+
+        :param batch: List of (submission content, future) tuples.
+        """
+        batch = [(content, future) for content, future in batch if not future.done()]
+        if not batch:
+            return
+        self.requests += 1
+        try:
+            results = await OpenAIHandler.classify_submissions([content for content, _ in batch])
+        except ClassificationError as error:
+            if len(batch) == 1:
+                batch[0][1].set_exception(error)
+                return
+            logger.warning(f"Batch request for {len(batch)} submissions failed, classifying them individually: {error}")
+            self.requests += len(batch)
+            results = await asyncio.gather(*(OpenAIHandler.classify_submission(content) for content, _ in batch), return_exceptions=True)
+        except Exception as error:
+            results = [error] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,244 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import httpx
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Methods that can be sent again without risking a duplicate side effect
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+# Responses telling the client the request was not processed and should be sent again later
+THROTTLING_STATUS_CODES = frozenset({429, 503})
+# Responses to a request that may or may not have been processed
+SERVER_ERROR_STATUS_CODES = frozenset({500, 502, 504})
+
+class CircuitOpenError(httpx.TransportError):
+    """
+    Raised instead of sending a request while the circuit breaker is open.
+    """
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header value.
+
+    :param value: Header value, either a number of seconds or an HTTP date.
+    :return: Number of seconds to wait, or None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold, reset_timeout_seconds, clock=time.monotonic):
+        """
+        Initializes a CircuitBreaker object.
+
+        Opens after `failure_threshold` consecutive failures, failing requests fast instead of sending them to
+        an API that is down. After `reset_timeout_seconds`, a single trial request is let through: the circuit
+        closes if it succeeds, and opens again if it fails.
+
+        :param name: Name of the API, for logging.
+        :param failure_threshold: Number of consecutive failures that open the circuit.
+        :param reset_timeout_seconds: Number of seconds the circuit stays open before a trial request.
+        :param clock: Monotonic clock function.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow_request(self):
+        """
+        Tells whether a request may be sent, letting a single trial request through once the timeout elapsed.
+
+        :return: True if the request may be sent.
+        """
+        if self.opened_at is None:
+            return True
+        if self._trial_in_flight or self._clock() - self.opened_at < self.reset_timeout_seconds:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        """
+        Records a successful request, closing the circuit.
+        """
+        if self.opened_at is not None:
+            logger.info(f"Circuit breaker for {self.name} closed.")
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_abandoned(self):
+        """
+        Records a request that ended without an outcome, e.g. because it was cancelled, so that another trial
+        request can be let through instead of the circuit staying open forever.
+        """
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        """
+        Records a failed request, opening the circuit once too many failures happened in a row.
+        """
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.error(f"Circuit breaker for {self.name} opened after {self.failures} consecutive failures.")
+            self.opened_at = self._clock()
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport, max_retries, base_delay_seconds, max_delay_seconds, circuit_breaker=None, retry_all_methods=False, sleep=asyncio.sleep):
+        """
+        Initializes a RetryTransport object.
+
+        Wraps another transport, sending requests again after throttling, server errors and connection
+        failures, with exponential backoff and full jitter. A Retry-After header replaces the backoff delay.
+        Throttled requests and requests that never reached the server are retried whatever their method;
+        other failures are only retried for idempotent methods, unless `retry_all_methods` is set.
+
+        :param transport: Transport sending the requests.
+        :param max_retries: Maximum number of times a request is sent again.
+        :param base_delay_seconds: Upper bound of the first delay, doubled after every retry.
+        :param max_delay_seconds: Longest delay between two attempts. A longer Retry-After is not waited for.
+        :param circuit_breaker: Optional CircuitBreaker shared by the requests to the same API.
+        :param retry_all_methods: Whether requests that are not idempotent are retried after any failure.
+        :param sleep: Coroutine function used to wait between attempts.
+        """
+        self._transport = transport
+        self.max_retries = max_retries
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.circuit_breaker = circuit_breaker
+        self.retry_all_methods = retry_all_methods
+        self._sleep = sleep
+        self.retries = 0
+
+    def _backoff(self, attempt):
+        """
+        Computes a jittered delay before the next attempt.
+
+        :param attempt: Number of retries made so far.
+        :return: Number of seconds to wait.
+        """
+        return random.uniform(0, min(self.max_delay_seconds, self.base_delay_seconds * 2 ** attempt))
+
+    def _may_retry(self, request, status_code=None, error=None):
+        """
+        Tells whether a failed attempt may be retried.
+
+        :param request: The request sent.
+        :param status_code: Status code of the response, if the server responded.
+        :param error: Transport error raised by the attempt, if any.
+        :return: True if sending the request again is safe and may succeed.
+        """
+        if status_code in THROTTLING_STATUS_CODES or isinstance(error, httpx.ConnectError):
+            return True
+        if status_code in SERVER_ERROR_STATUS_CODES or error is not None:
+            return self.retry_all_methods or request.method in IDEMPOTENT_METHODS
+        return False
+
+    async def handle_async_request(self, request):
+        """
+        Sends a request, retrying it as long as it fails with a retryable error.
+
+        :param request: httpx.Request to send.
+        :return: The first successful response, or the last response once retries are exhausted.
+        :raises CircuitOpenError: If the circuit breaker is open.
+        """
+        attempt = 0
+        while True:
+            if self.circuit_breaker is not None and not self.circuit_breaker.allow_request():
+                raise CircuitOpenError(f"Circuit breaker for {self.circuit_breaker.name} is open, not sending {request.method} {request.url}.")
+
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError as error:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_failure()
+                if attempt >= self.max_retries or not self._may_retry(request, error=error):
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"{request.method} {request.url} failed ({error!r}), retrying in {delay:.1f} seconds.")
+            except BaseException:
+                # Cancellations and unexpected errors say nothing about the API, but must not hold the trial slot
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_abandoned()
+                raise
+            else:
+                if self.circuit_breaker is not None:
+                    if response.status_code >= 500:
+                        self.circuit_breaker.record_failure()
+                    else:
+                        self.circuit_breaker.record_success()
+                if attempt >= self.max_retries or not self._may_retry(request, status_code=response.status_code):
+                    return response
+
+                retry_after = parse_retry_after(response.headers.get('retry-after'))
+                if retry_after is not None and retry_after > self.max_delay_seconds:
+                    return response
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                await response.aclose()
+                logger.warning(f"{request.method} {request.url} responded with status {response.status_code}, retrying in {delay:.1f} seconds.")
+
+            attempt += 1
+            self.retries += 1
+            await self._sleep(delay)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+def build_async_client(http_settings, name='HTTP', **kwargs):
+    """
+    Builds a pooled HTTP client from a connection pool settings section of the configuration.
+
+    If the section has a 'retry' subsection, requests are sent through a RetryTransport with its own
+    circuit breaker.
+
+    :param http_settings: Dictionary of connection pool settings.
+    :param name: Name of the API the client talks to, for logging.
+    :param kwargs: Additional arguments passed to httpx.AsyncClient.
+    :return: Configured httpx.AsyncClient.
+    """
+    limits = httpx.Limits(
+        max_connections=http_settings['max_connections'],
+        max_keepalive_connections=http_settings['max_keepalive_connections'],
+        keepalive_expiry=http_settings['keepalive_expiry'],
+    )
+    timeout = httpx.Timeout(http_settings['timeout'], connect=http_settings['connect_timeout'])
+    if (retry_settings := http_settings.get('retry')) is not None and 'transport' not in kwargs:
+        circuit_breaker = CircuitBreaker(
+            name,
+            retry_settings['failure_threshold'],
+            retry_settings['reset_timeout_seconds'],
+        )
+        kwargs['transport'] = RetryTransport(
+            httpx.AsyncHTTPTransport(http2=http_settings['http2'], limits=limits),
+            retry_settings['max_retries'],
+            retry_settings['base_delay_seconds'],
+            retry_settings['max_delay_seconds'],
+            circuit_breaker,
+            retry_settings['retry_all_methods'],
+        )
+    return httpx.AsyncClient(http2=http_settings['http2'], limits=limits, timeout=timeout, **kwargs)
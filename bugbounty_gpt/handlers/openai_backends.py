@@ -0,0 +1,88 @@
+import openai
+import asyncio
+import logging
+from bugbounty_gpt.env import OPENAI_API_KEY, OPENAI_BASE_URL, OPENAI_HTTP_SETTINGS
+from bugbounty_gpt.handlers.http_client import build_async_client
+
+logger = logging.getLogger(__name__)
+
+class HTTPXChatBackend:
+    def __init__(self, base_url=None, api_key=None, client=None, http_settings=None):
+        """
+        Initializes an HTTPXChatBackend object.
+
+        Sends chat completion requests directly over a pooled async HTTP client, so any number of requests
+        can be in flight without holding a thread each.
+
+        :param base_url: Base URL of the OpenAI API. Default is 'api.openai_base_url' from the configuration.
+        :param api_key: OpenAI API key. Default is the OPENAI_API_KEY environment variable.
+        :param client: Optional pre-configured httpx.AsyncClient to use instead of building one.
+        :param http_settings: Connection pool settings. Default is the 'http.openai' section of the configuration.
+        """
+        self.base_url = (base_url if base_url is not None else OPENAI_BASE_URL).rstrip('/')
+        self._api_key = api_key if api_key is not None else OPENAI_API_KEY
+        self._client = client
+        self._http_settings = http_settings if http_settings is not None else OPENAI_HTTP_SETTINGS
+
+    def _get_client(self):
+        """
+        Returns the shared HTTP client, creating it on first use.
+
+        :return: The pooled httpx.AsyncClient for this backend.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = build_async_client(self._http_settings, 'OpenAI')
+        return self._client
+
+    async def create_chat_completion(self, request_data):
+        """
+        Sends a chat completion request.
+
+        :param request_data: The request data built by OpenAIHandler._build_request_data.
+        :return: Decoded JSON response.
+        :raises httpx.HTTPStatusError: If the API responds with an error status.
+        """
+        headers = {'Authorization': f'Bearer {self._api_key}'}
+        response = await self._get_client().post(f'{self.base_url}/chat/completions', headers=headers, json=request_data)
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self):
+        """
+        Closes the underlying connection pool.
+        """
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+
+class OpenAILibraryBackend:
+    async def create_chat_completion(self, request_data):
+        """
+        Sends a chat completion request through the synchronous openai library on the default thread pool.
+
+        :param request_data: The request data built by OpenAIHandler._build_request_data.
+        :return: Response object from the openai library.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: openai.ChatCompletion.create(**request_data))
+
+    async def aclose(self):
+        """
+        Nothing to release; the openai library manages its own sessions.
+        """
+
+BACKENDS = {
+    'httpx': HTTPXChatBackend,
+    'openai': OpenAILibraryBackend,
+}
+
+def create_backend(name):
+    """
+    Creates a chat completion backend by name.
+
+    :param name: Name of the backend, one of the keys of BACKENDS.
+    :return: Backend instance.
+    """
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown OpenAI backend '{name}'. Expected one of: {', '.join(BACKENDS)}.")
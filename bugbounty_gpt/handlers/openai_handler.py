@@ -1,12 +1,66 @@
-import openai
-import time
-import logging
 import asyncio
-from bugbounty_gpt.env import VALID_CATEGORIES, OPENAI_PROMPT, OPENAI_MODEL, DEFAULT_CATEGORY
+import json
+import logging
+from bugbounty_gpt.env import VALID_CATEGORIES, OPENAI_PROMPT, OPENAI_MODEL, OPENAI_BACKEND, DEFAULT_CATEGORY
+from bugbounty_gpt.handlers.openai_backends import create_backend
+from bugbounty_gpt.handlers.rate_limiter import get_rate_limiter
+from bugbounty_gpt.preprocessing import count_tokens
 
 logger = logging.getLogger(__name__)
 
+CLASSIFICATION_ERROR_MESSAGE = "An error occurred during classification. Please check application logs."
+COMPLETION_TOKENS_PER_REPORT = 512
+# Statuses OpenAI answers when it rejects the request itself, e.g. a prompt too long for the model or refused
+# content; sending the same request again fails the same way. Authentication and rate limit errors are not
+# included, since they affect every request and go away once fixed.
+REJECTION_STATUS_CODES = (400, 413, 422)
+
+BATCH_INSTRUCTIONS = """
+##Batches
+
+The user message is a JSON array of reports, each an object with an "id" and the "report" text.
+Classify every report independently of the others. Respond with one JSON object per line, in the same order,
+and nothing else: {"id": <id of the report>, "category": "<report category>", "explanation": "<one-sentence explanation>"}
+"""
+
+class ClassificationError(Exception):
+    """
+    Raised when submissions could not be classified because the OpenAI request failed.
+    """
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def rejected(self):
+        """
+        Whether OpenAI rejected the request itself, so sending it again will fail the same way.
+        """
+        return self.status_code in REJECTION_STATUS_CODES
+
 class OpenAIHandler:
+    backend = None
+
+    @staticmethod
+    def _get_backend():
+        """
+        Returns the chat completion backend, creating the configured one on first use.
+
+        :return: Backend used to send classification requests.
+        """
+        if OpenAIHandler.backend is None:
+            OpenAIHandler.backend = create_backend(OPENAI_BACKEND)
+        return OpenAIHandler.backend
+
+    @staticmethod
+    async def aclose():
+        """
+        Releases the resources held by the chat completion backend.
+        """
+        if OpenAIHandler.backend is not None:
+            await OpenAIHandler.backend.aclose()
+            OpenAIHandler.backend = None
+
     @staticmethod
     def _classifications_sanitization(input_string):
         """
@@ -28,23 +82,101 @@ class OpenAIHandler:
         return {
             "model": OPENAI_MODEL,
             "temperature": 0,
-            "max_tokens": 512,
+            "max_tokens": COMPLETION_TOKENS_PER_REPORT,
             "messages": [
                 {"role": "system", "content": OPENAI_PROMPT},
                 {"role": "user", "content": submission_content}
             ]
         }
 
+    @staticmethod
+    def _build_batch_request_data(submission_contents):
+        """
+        Builds the request data for classifying several submissions with a single OpenAI request.
+
+        The system prompt is sent once for the whole batch. The reports are JSON-encoded so their text cannot
+        be mistaken for the boundary between two reports.
+
+        :param submission_contents: The contents of the submissions to be classified.
+        :return: Dictionary containing the request data.
+        """
+        reports = [{"id": report_id, "report": content} for report_id, content in enumerate(submission_contents, start=1)]
+        return {
+            "model": OPENAI_MODEL,
+            "temperature": 0,
+            "max_tokens": COMPLETION_TOKENS_PER_REPORT * len(submission_contents),
+            "messages": [
+                {"role": "system", "content": OPENAI_PROMPT + BATCH_INSTRUCTIONS},
+                {"role": "user", "content": json.dumps(reports, ensure_ascii=False)}
+            ]
+        }
+
+    @staticmethod
+    def _estimate_tokens(request_data):
+        """
+        Estimates the number of tokens a request will consume, for rate limiting purposes.
+
+        Counts the prompt tokens locally, plus the completion budget.
+
+        :param request_data: The request data built by _build_request_data.
+        :return: Estimated number of tokens.
+        """
+        return sum(count_tokens(message["content"]) for message in request_data["messages"]) + request_data["max_tokens"]
+
+    @staticmethod
+    def estimate_batch_tokens(submission_contents):
+        """
+        Estimates the number of tokens of a batch request, prompt and completion budget included.
+
+        :param submission_contents: The contents of the submissions to be classified together.
+        :return: Estimated number of tokens, to be kept within the model's context window.
+        """
+        return OpenAIHandler._estimate_tokens(OpenAIHandler._build_batch_request_data(submission_contents))
+
     @staticmethod
     def _handle_response_error(error):
         """
-        Handles errors that occurred during the OpenAI request.
+        Handles errors that occurred while reading the answer of the OpenAI request.
 
         :param error: The error that occurred.
         :return: A tuple containing the default category and an error message.
         """
         logger.error(f"An error occurred during the OpenAI request: {error}")
-        return DEFAULT_CATEGORY, "An error occurred during classification. Please check application logs."
+        return DEFAULT_CATEGORY, CLASSIFICATION_ERROR_MESSAGE
+
+    @staticmethod
+    async def _send(request_data):
+        """
+        Sends a chat completion request once the rate limiter allows it.
+
+        Transient failures are already retried by the HTTP client, so a failure here is final for this cycle.
+        It is raised rather than turned into a default classification, so the submission is not mislabeled
+        and is classified again later.
+
+        :param request_data: The request data built by _build_request_data or _build_batch_request_data.
+        :return: The response from the OpenAI API.
+        :raises ClassificationError: If the request failed.
+        """
+        try:
+            await get_rate_limiter('openai').acquire(OpenAIHandler._estimate_tokens(request_data))
+            return await OpenAIHandler._get_backend().create_chat_completion(request_data)
+        except Exception as error:
+            logger.error(f"The OpenAI request failed: {error}")
+            # httpx and openai>=1 errors carry the response, openai<1 errors the status code itself
+            status_code = getattr(getattr(error, 'response', None), 'status_code', None) or getattr(error, 'http_status', None)
+            raise ClassificationError(f"The OpenAI request failed: {error}", status_code) from error
+
+    @staticmethod
+    def _response_text(response):
+        """
+        Extracts the message content from a chat completion response.
+
+        :param response: Decoded JSON response or openai library response object.
+        :return: The content of the first choice's message.
+        """
+        if isinstance(response, dict):
+            return response['choices'][0]['message']['content']
+        return response.choices[0].message.content
 
     @staticmethod
     def _handle_response(response):
@@ -55,30 +187,93 @@ class OpenAIHandler:
         :return: A tuple containing the judgment category and explanation, or an error response if something goes wrong.
         """
         try:
-            response_text = response.choices[0].message.content
+            response_text = OpenAIHandler._response_text(response)
             judgement, explanation = response_text.rsplit('\n', 1)
-            sanitized_judgement = OpenAIHandler._classifications_sanitization(judgement)
-            if sanitized_judgement in VALID_CATEGORIES:
-                return sanitized_judgement, explanation.strip()
-            else:
-                return DEFAULT_CATEGORY, explanation.strip()
+            return OpenAIHandler._classification_from_answer(judgement, explanation)
         except Exception as error:
             return OpenAIHandler._handle_response_error(error)
 
+    @staticmethod
+    def _classification_from_answer(category, explanation):
+        """
+        Maps a category and explanation answered by the model to a classification.
+
+        :param category: The category answered by the model.
+        :param explanation: The explanation answered by the model.
+        :return: A tuple containing the judgment category and explanation.
+        """
+        sanitized_judgement = OpenAIHandler._classifications_sanitization(category)
+        if sanitized_judgement in VALID_CATEGORIES:
+            return sanitized_judgement, explanation.strip()
+        return DEFAULT_CATEGORY, explanation.strip()
+
+    @staticmethod
+    def _handle_batch_response(response, count):
+        """
+        Handles the response to a batch request, parsing each answer line independently.
+
+        Lines that are not valid JSON answers, and answers for unknown or repeated IDs, are skipped, so one
+        malformed answer does not discard the others. A response without readable content, e.g. one cut by
+        the content filter, leaves every answer unparsed.
+
+        :param response: The response object from the OpenAI API.
+        :param count: Number of submissions in the batch.
+        :return: List of one (judgment category, explanation) tuple per submission, or None where no answer was parsed.
+        """
+        results = [None] * count
+        try:
+            lines = OpenAIHandler._response_text(response).splitlines()
+        except Exception as error:
+            logger.error(f"Could not read the batch response: {error}")
+            return results
+
+        for line in lines:
+            try:
+                answer = json.loads(line)
+                index = int(answer["id"]) - 1
+                if 0 <= index < count and results[index] is None:
+                    results[index] = OpenAIHandler._classification_from_answer(answer["category"], answer["explanation"])
+            except (ValueError, TypeError, KeyError, AttributeError):
+                continue
+        return results
+
+    @staticmethod
+    async def classify_submissions(submission_contents):
+        """
+        Classifies several submissions with a single OpenAI request.
+
+        Submissions whose answer cannot be parsed from the batch response are classified again one at a time.
+
+        :param submission_contents: The contents of the submissions to be classified.
+        :return: List of one (judgment category, explanation) tuple per submission, in the same order.
+        :raises ClassificationError: If the OpenAI request failed.
+        """
+        if len(submission_contents) == 1:
+            return [await OpenAIHandler.classify_submission(submission_contents[0])]
+
+        logger.info(f"Classifying {len(submission_contents)} submissions in one request.")
+        request_data = OpenAIHandler._build_batch_request_data(submission_contents)
+        response = await OpenAIHandler._send(request_data)
+        results = OpenAIHandler._handle_batch_response(response, len(submission_contents))
+
+        unparsed = [index for index, result in enumerate(results) if result is None]
+        if unparsed:
+            logger.warning(f"Could not parse {len(unparsed)} of {len(submission_contents)} batched classifications, classifying them individually.")
+            fallbacks = await asyncio.gather(*(OpenAIHandler.classify_submission(submission_contents[index]) for index in unparsed))
+            for index, result in zip(unparsed, fallbacks):
+                results[index] = result
+        return results
+
     @staticmethod
     async def classify_submission(submission_content):
         """
         Classifies the submission content using the OpenAI API.
 
         :param submission_content: The content of the submission to be classified.
-        :return: A tuple containing the judgment category and explanation, or an error response if something goes wrong.
+        :return: A tuple containing the judgment category and explanation, or an error response if the answer cannot be read.
+        :raises ClassificationError: If the OpenAI request failed.
         """
         logger.info("Classifying submission's content.")
-        time.sleep(5)  # Consider replacing with a more robust rate-limiting strategy
-        try:
-            request_data = OpenAIHandler._build_request_data(submission_content)
-            loop = asyncio.get_running_loop()
-            response = await loop.run_in_executor(None, lambda: openai.ChatCompletion.create(**request_data))
-            return OpenAIHandler._handle_response(response)
-        except Exception as error:
-            return OpenAIHandler._handle_response_error(error)
+        request_data = OpenAIHandler._build_request_data(submission_content)
+        response = await OpenAIHandler._send(request_data)
+        return OpenAIHandler._handle_response(response)
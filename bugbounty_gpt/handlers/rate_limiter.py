@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from bugbounty_gpt.env import RATE_LIMITS
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    def __init__(self, rate_per_minute, capacity=None, clock=time.monotonic):
+        """
+        Initializes a TokenBucket object.
+
+        The bucket refills continuously at `rate_per_minute` and never holds more than `capacity` tokens.
+        Callers reserve tokens up front and sleep off any deficit, so waiting never blocks the event loop
+        and concurrent callers are served in the order they arrived.
+
+        :param rate_per_minute: Number of tokens added to the bucket per minute.
+        :param capacity: Maximum number of tokens the bucket can hold. Default is one minute's worth.
+        :param clock: Monotonic clock function used to measure refills.
+        """
+        if rate_per_minute <= 0:
+            raise ValueError("Token bucket rate must be positive.")
+        self.rate_per_second = rate_per_minute / 60
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated_at = clock()
+
+    def _refill(self):
+        """
+        Adds the tokens accrued since the last refill.
+        """
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_second)
+        self._updated_at = now
+
+    def reserve(self, amount=1):
+        """
+        Reserves tokens from the bucket.
+
+        :param amount: Number of tokens to reserve. Requests larger than the capacity are capped to it.
+        :return: Number of seconds the caller must wait before the reservation is honoured.
+        """
+        self._refill()
+        self._tokens -= min(amount, self.capacity)
+        return max(0.0, -self._tokens / self.rate_per_second)
+
+    async def acquire(self, amount=1):
+        """
+        Waits until the requested number of tokens is available.
+
+        :param amount: Number of tokens to acquire.
+        """
+        delay = self.reserve(amount)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class RateLimiter:
+    def __init__(self, name, requests_per_minute=None, tokens_per_minute=None):
+        """
+        Initializes a RateLimiter object for a single API endpoint.
+
+        :param name: Name of the endpoint, used in log messages.
+        :param requests_per_minute: Maximum number of requests per minute, or None for no request limit.
+        :param tokens_per_minute: Maximum number of model tokens per minute, or None for no token limit.
+        """
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    async def acquire(self, tokens=0):
+        """
+        Waits until a request carrying the given number of tokens is allowed through.
+
+        :param tokens: Estimated number of model tokens consumed by the request.
+        """
+        delay = 0.0
+        if self.requests is not None:
+            delay = max(delay, self.requests.reserve())
+        if self.tokens is not None and tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        if delay > 0:
+            logger.debug(f"Rate limit reached for {self.name}, waiting {delay:.2f} seconds.")
+            await asyncio.sleep(delay)
+
+_RATE_LIMITERS = {}
+
+def get_rate_limiter(name):
+    """
+    Returns the shared rate limiter for an endpoint, creating it from the configuration on first use.
+
+    :param name: Name of the endpoint as listed under 'rate_limits' in the configuration.
+    :return: RateLimiter shared by every caller of that endpoint.
+    """
+    if name not in _RATE_LIMITERS:
+        limits = RATE_LIMITS.get(name, {})
+        _RATE_LIMITERS[name] = RateLimiter(
+            name,
+            requests_per_minute=limits.get('requests_per_minute'),
+            tokens_per_minute=limits.get('tokens_per_minute'),
+        )
+    return _RATE_LIMITERS[name]
@@ -5,18 +5,31 @@ import json
 
 logger = logging.getLogger(__name__)
 
+class SubmissionActionError(Exception):
+    def __init__(self, message, status_code=None):
+        """
+        Raised when BugCrowd rejects an action on a submission.
+
+        :param message: Description of the failure.
+        :param status_code: HTTP status code of the response, if BugCrowd responded.
+        """
+        super().__init__(message)
+        self.status_code = status_code
+
 class BugCrowdSubmission:
-    def __init__(self, submission_id, classification, reasoning):
+    def __init__(self, submission_id, classification, reasoning, api=None):
         """
         Initializes a BugCrowdSubmission object.
 
         :param submission_id: ID of the submission.
         :param classification: Classification information for the submission.
         :param reasoning: Reasoning information for the submission.
+        :param api: BugCrowdAPI client whose connection pool should be used. Default creates a new client.
         """
         self.submission_id = submission_id
         self.classification = classification
         self.reasoning = reasoning
+        self.api = api if api is not None else BugCrowdAPI()
 
     def _prepare_assign_data(self, user_id):
         """
@@ -56,10 +69,12 @@ class BugCrowdSubmission:
         Assigns a user to the submission.
 
         :param user_id: ID of the user to be assigned.
+        :return: Response object from the assignment operation.
         """
         data = self._prepare_assign_data(user_id)
-        response = await BugCrowdAPI.patch_submission(self.submission_id, data)
+        response = await self.api.patch_submission(self.submission_id, data)
         self._handle_assign_response(response, user_id)
+        return response
 
     async def is_submission_new(self):
         """
@@ -67,7 +82,7 @@ class BugCrowdSubmission:
 
         :return: True if the submission is new, False otherwise.
         """
-        submission_data = await BugCrowdAPI.fetch_submission(self.submission_id)
+        submission_data = await self.api.fetch_submission(self.submission_id)
         submission_state = submission_data['data']['attributes']['state']
         return submission_state.lower() == 'new'
 
@@ -84,9 +99,9 @@ class BugCrowdSubmission:
                 }
             }
         }
-        response = await BugCrowdAPI.patch_submission(self.submission_id, data)
+        response = await self.api.patch_submission(self.submission_id, data)
         if response.status_code != 200:
-            raise Exception(f"Failed to close submission {self.submission_id}. Status code: {response.status_code}, Content: {response.content}")
+            raise SubmissionActionError(f"Failed to close submission {self.submission_id}. Status code: {response.status_code}, Content: {response.content}", response.status_code)
 
     def _prepare_comment_data(self, comment_body, visibility_scope='everyone'):
         """
@@ -132,14 +147,16 @@ class BugCrowdSubmission:
 
         :param comment_body: Text of the comment.
         :param visibility_scope: Visibility scope of the comment. Default is 'everyone'.
+        :return: Response object from the comment creation operation.
         """
         logger.info(f"Creating comment for submission {self.submission_id} on BugCrowd.")
         comment_data = self._prepare_comment_data(comment_body, visibility_scope)
-        response = await BugCrowdAPI.create_comment(comment_data)
+        response = await self.api.create_comment(comment_data)
         if response.status_code in [400, 404, 409]:
             self._handle_comment_response_error(response)
         elif response.status_code != 201:
             logger.error("An unexpected error occurred.")
+        return response
 
     def generate_comment_text(self):
         """
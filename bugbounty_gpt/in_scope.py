@@ -0,0 +1,70 @@
+import logging
+from bugbounty_gpt.db.models import SubmissionState
+from bugbounty_gpt.handlers.submission_handler import BugCrowdSubmission
+from bugbounty_gpt.outbox import close_action, comment_action
+from bugbounty_gpt.pipeline import bounded_map
+
+logger = logging.getLogger(__name__)
+
+class InScopeExecutor:
+    def __init__(self, bugcrowd_api, concurrency, state_cache=None):
+        """
+        Initializes an InScopeExecutor object.
+
+        Decides what to do with in-scope submissions, checking up to `concurrency` submissions at once. A
+        submission that is still new on BugCrowd gets a comment and is then closed; these actions are collected
+        in `actions` for the outbox, which performs them in order. A submission whose check fails is logged and
+        left in its current state, so it is retried by the next cycle without affecting the others.
+
+        :param bugcrowd_api: Shared BugCrowdAPI client.
+        :param concurrency: Maximum number of submissions checked at the same time.
+        :param state_cache: Optional SubmissionStateCache of recently observed states. Submissions whose state
+            is cached are not fetched again before they are acted on.
+        """
+        self.bugcrowd_api = bugcrowd_api
+        self.concurrency = concurrency
+        self.state_cache = state_cache
+        self.state_updates = {SubmissionState.UPDATED: [], SubmissionState.UPDATED_OUT_OF_BAND: []}
+        self.actions = []
+        self.failed = []
+
+    async def _act(self, submission_data):
+        """
+        Decides the actions for a single submission if it is still new on BugCrowd.
+
+        :param submission_data: Stored submission whose classification is in scope.
+        :return: Tuple of (submission ID, new state, outbox actions), the new state being None if the submission is left unchanged.
+        """
+        submission = BugCrowdSubmission(submission_data.submission_id, submission_data.classification, submission_data.reasoning, self.bugcrowd_api)
+        try:
+            is_new = self.state_cache.is_new(submission.submission_id) if self.state_cache is not None else None
+            if is_new is None:
+                is_new = await submission.is_submission_new()
+            if not is_new:
+                return submission.submission_id, SubmissionState.UPDATED_OUT_OF_BAND, []
+
+            comment_body = submission.generate_comment_text()
+            if not comment_body:
+                return submission.submission_id, None, []
+
+            actions = [comment_action(submission.submission_id, comment_body), close_action(submission.submission_id)]
+            return submission.submission_id, SubmissionState.UPDATED, actions
+        except Exception as error:
+            logger.error(f"Failed to act on submission {submission.submission_id}, leaving it for the next cycle: {error}")
+            self.failed.append(submission.submission_id)
+            return submission.submission_id, None, []
+
+    async def run(self, in_scope_submissions):
+        """
+        Checks in-scope submissions concurrently, collecting their new states in `state_updates` and the
+        actions to perform in `actions`.
+
+        Results are collected as each submission completes, so they are available for the database update
+        even if the run is interrupted.
+
+        :param in_scope_submissions: Stored submissions whose classification is in scope.
+        """
+        async for submission_id, new_state, actions in bounded_map(self._act, in_scope_submissions, self.concurrency):
+            if new_state is not None:
+                self.state_updates[new_state].append(submission_id)
+                self.actions.extend(actions)
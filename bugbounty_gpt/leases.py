@@ -0,0 +1,65 @@
+import asyncio
+import logging
+from contextlib import suppress
+
+logger = logging.getLogger(__name__)
+
+class LeaseHeartbeat:
+    def __init__(self, name, renew, interval_seconds):
+        """
+        Initializes a LeaseHeartbeat object.
+
+        Renews a lease in the background every `interval_seconds` while the work it protects is in flight, so
+        the lease does not lapse and let another worker take the same work. Used as an async context manager
+        around the work. Once a renewal reports the lease lost, `lost` is set and renewals stop; the work
+        should then stop before its next side effect.
+
+        :param name: Name of the leased work, for logging.
+        :param renew: Coroutine function renewing the lease, returning False once the lease is lost.
+        :param interval_seconds: Number of seconds between two renewals, well below the lease duration.
+        """
+        self.name = name
+        self._renew = renew
+        self.interval_seconds = interval_seconds
+        self._task = None
+        self.renewals = 0
+        self.lost = False
+
+    async def _run(self):
+        """
+        Renews the lease until it is lost or the heartbeat is stopped.
+        """
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                renewed = await self._renew()
+            except Exception as error:
+                # Keep trying: the lease is only lost once it lapses and someone else takes it
+                logger.error(f"Failed to renew the lease on {self.name}: {error}")
+                continue
+            if not renewed:
+                logger.warning(f"Lost the lease on {self.name}, another worker took it over.")
+                self.lost = True
+                return
+            self.renewals += 1
+
+    async def guard(self, items):
+        """
+        Passes items through until the lease is lost.
+
+        :param items: Async iterator over the work to do.
+        :return: Async iterator over the same items, ending early if the lease is lost.
+        """
+        async for item in items:
+            if self.lost:
+                return
+            yield item
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
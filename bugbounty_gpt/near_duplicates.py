@@ -0,0 +1,171 @@
+import hashlib
+import logging
+from array import array
+from collections import OrderedDict
+from bugbounty_gpt.classification_cache import normalize_content
+from bugbounty_gpt.db import db_handler
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 3
+EMPTY_BIN = 0xFFFFFFFF
+
+def _shingle_hashes(content):
+    """
+    Hashes the overlapping word n-grams of the normalized content.
+
+    :param content: The content of the submission.
+    :return: Set of 64-bit shingle hashes.
+    """
+    words = normalize_content(content).split(' ')
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))}
+    return {int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'little') for shingle in shingles}
+
+def minhash_signature(content, num_perm):
+    """
+    Computes a one-permutation MinHash signature of the content.
+
+    Each shingle is hashed once: the low bits of the hash pick one of `num_perm` bins and the high bits
+    are the value kept if it is the bin's minimum. Empty bins are filled from the next non-empty bin, so
+    the fraction of equal bins between two signatures estimates the Jaccard similarity of their shingles.
+
+    :param content: The content of the submission.
+    :param num_perm: Number of bins in the signature.
+    :return: Signature as an array of unsigned 32-bit integers.
+    """
+    signature = array('I', [EMPTY_BIN]) * num_perm
+    for shingle_hash in _shingle_hashes(content):
+        bin_index = shingle_hash % num_perm
+        value = (shingle_hash >> 32) & 0xFFFFFFFE
+        if value < signature[bin_index]:
+            signature[bin_index] = value
+
+    filled = [i for i in range(num_perm) if signature[i] != EMPTY_BIN]
+    if filled and len(filled) < num_perm:
+        for i in range(num_perm):
+            if signature[i] == EMPTY_BIN:
+                # Densify by rotation: borrow the next filled bin to the right, offset by the distance walked
+                j = next((k for k in filled if k > i), filled[0])
+                signature[i] = (signature[j] + (j - i) % num_perm) & 0xFFFFFFFE
+    return signature
+
+def signature_similarity(first, second):
+    """
+    Estimates the Jaccard similarity of two signatures.
+
+    :param first: First signature.
+    :param second: Second signature.
+    :return: Fraction of bins on which the signatures agree.
+    """
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+class NearDuplicateIndex:
+    def __init__(self, threshold, num_perm, bands, max_entries):
+        """
+        Initializes a NearDuplicateIndex object.
+
+        Indexes the signatures of classified submissions with locality-sensitive hashing: each signature is
+        split into `bands` bands, and submissions sharing any band are compared on their full signature.
+
+        :param threshold: Minimum estimated similarity for a submission to count as a near-duplicate.
+        :param num_perm: Number of bins in each signature. Must be a multiple of `bands`.
+        :param bands: Number of LSH bands.
+        :param max_entries: Maximum number of submissions indexed. The oldest are evicted first.
+        """
+        if num_perm % bands:
+            raise ValueError("The signature size must be a multiple of the number of bands.")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._buckets = [{} for _ in range(bands)]
+        self.matches = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def signature(self, content):
+        """
+        Computes the signature of submission content for this index.
+
+        :param content: The content of the submission.
+        :return: Signature as an array of unsigned 32-bit integers.
+        """
+        return minhash_signature(content, self.num_perm)
+
+    def _band_keys(self, signature):
+        """
+        Splits a signature into its band keys.
+
+        :param signature: Signature to split.
+        :return: List of one hashable key per band.
+        """
+        return [hash(signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def add(self, submission_id, signature, classification, reasoning):
+        """
+        Adds a classified submission to the index, evicting the oldest submission if the index is full.
+
+        :param submission_id: ID of the submission.
+        :param signature: Signature of the submission's content.
+        :param classification: Classification name of the submission.
+        :param reasoning: Reasoning for the classification.
+        """
+        if submission_id in self._entries:
+            self._remove(submission_id)
+        self._entries[submission_id] = (signature, classification, reasoning)
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(key, []).append(submission_id)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, submission_id):
+        """
+        Removes a submission from the index.
+
+        :param submission_id: ID of the submission.
+        """
+        signature, _, _ = self._entries.pop(submission_id)
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            bucket = buckets[key]
+            bucket.remove(submission_id)
+            if not bucket:
+                del buckets[key]
+
+    def query(self, signature):
+        """
+        Finds the most similar indexed submission above the similarity threshold.
+
+        :param signature: Signature of the content to look up.
+        :return: Tuple of (submission ID, classification, reasoning, similarity), or None if there is no near-duplicate.
+        """
+        candidates = set()
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(key, ()))
+
+        best_match = None
+        for submission_id in candidates:
+            candidate_signature, classification, reasoning = self._entries[submission_id]
+            similarity = signature_similarity(signature, candidate_signature)
+            if similarity >= self.threshold and (best_match is None or similarity > best_match[3]):
+                best_match = (submission_id, classification, reasoning, similarity)
+        return best_match
+
+    async def warm(self, session, excluded_reasonings=()):
+        """
+        Builds the index from the signatures of the most recently stored submissions.
+
+        :param session: Database session object.
+        :param excluded_reasonings: Reasonings of the classifications that are never indexed as they are made,
+            e.g. classification errors and rule matches, so they are not indexed after a restart either.
+        """
+        rows = await db_handler.fetch_submission_signatures(session, self.max_entries, excluded_reasonings)
+        # Oldest first, so the most recent submissions are the last to be evicted
+        for submission_id, signature_bytes, classification, reasoning in reversed(rows):
+            signature = array('I')
+            signature.frombytes(signature_bytes)
+            if len(signature) == self.num_perm:
+                self.add(submission_id, signature, classification, reasoning)
+        logger.info(f"Built near-duplicate index from {len(self)} submissions.")
@@ -0,0 +1,251 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from bugbounty_gpt.db import db_handler
+from bugbounty_gpt.db.models import OutboxActionType, OutboxStatus
+from bugbounty_gpt.handlers.submission_handler import BugCrowdSubmission, SubmissionActionError
+from bugbounty_gpt.leases import LeaseHeartbeat
+from bugbounty_gpt.pipeline import bounded_map
+
+logger = logging.getLogger(__name__)
+
+# Client errors that may succeed when retried; any other 4xx will fail again the same way
+RETRYABLE_CLIENT_ERRORS = (408, 425, 429)
+# Actions only meant for submissions nobody has triaged yet
+NEW_SUBMISSION_ACTIONS = (OutboxActionType.COMMENT, OutboxActionType.CLOSE)
+SUPERSEDED_ERROR = "The submission is no longer new on BugCrowd."
+# Most BugCrowd requests the actions of a submission take: a comment, a closure and a state check before a retry
+REQUESTS_PER_SUBMISSION = 3
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+def comment_action(submission_id, comment_body):
+    """
+    Builds an outbox action commenting on a submission.
+
+    :param submission_id: ID of the submission.
+    :param comment_body: Text of the comment.
+    :return: Dictionary of outbox action data ready to be queued.
+    """
+    return {
+        'idempotency_key': f"comment:{submission_id}",
+        'submission_id': submission_id,
+        'action': OutboxActionType.COMMENT,
+        'payload': {'body': comment_body},
+    }
+
+def close_action(submission_id):
+    """
+    Builds an outbox action closing a submission.
+
+    :param submission_id: ID of the submission.
+    :return: Dictionary of outbox action data ready to be queued.
+    """
+    return {
+        'idempotency_key': f"close:{submission_id}",
+        'submission_id': submission_id,
+        'action': OutboxActionType.CLOSE,
+        'payload': {},
+    }
+
+def assign_action(submission_id, user_id):
+    """
+    Builds an outbox action assigning a submission to a user.
+
+    :param submission_id: ID of the submission.
+    :param user_id: ID of the user to assign.
+    :return: Dictionary of outbox action data ready to be queued.
+    """
+    return {
+        'idempotency_key': f"assign:{submission_id}:{user_id}",
+        'submission_id': submission_id,
+        'action': OutboxActionType.ASSIGN,
+        'payload': {'user_id': user_id},
+    }
+
+def is_retryable(error):
+    """
+    Tells whether a failed action may succeed if it is attempted again.
+
+    :param error: Exception raised by the attempt.
+    :return: False if BugCrowd rejected the action with a client error, True otherwise.
+    """
+    if isinstance(error, SubmissionActionError) and error.status_code is not None:
+        return not 400 <= error.status_code < 500 or error.status_code in RETRYABLE_CLIENT_ERRORS
+    return True
+
+class OutboxWorker:
+    def __init__(self, concurrency, max_attempts, base_delay_seconds, max_delay_seconds, batch_size, worker_id, lease_seconds, requests_per_minute, state_cache=None, clock=_utcnow):
+        """
+        Initializes an OutboxWorker object.
+
+        Performs the BugCrowd actions queued in the 'outbox_action' table. The actions of one submission are
+        performed in the order they were queued, and a submission stops at its first failed action, while up to
+        `concurrency` submissions proceed at the same time. A failed action is retried with exponential backoff;
+        after `max_attempts` attempts, or straight away if BugCrowd rejects it as invalid, it is dead-lettered
+        and the remaining actions of its submission are held back. Before a comment or closure is retried, the
+        submission is checked to still be new on BugCrowd; if someone has triaged it since, the action is
+        dead-lettered instead of being performed. Submissions are leased before their actions are
+        performed, so several workers draining the same outbox never perform an action twice: the leases are
+        renewed while the drain runs, the batch is sized so its requests fit in half a lease at the BugCrowd
+        rate limit, and every action checks that the lease is still held and the action still pending first.
+
+        :param concurrency: Maximum number of submissions whose actions are performed at the same time.
+        :param max_attempts: Number of attempts before an action is dead-lettered.
+        :param base_delay_seconds: Wait before the first retry, doubled after every further failure.
+        :param max_delay_seconds: Longest wait between two attempts.
+        :param batch_size: Maximum number of submissions leased per drain, lowered to fit in the lease.
+        :param worker_id: ID of the worker, recorded on the leases it takes.
+        :param lease_seconds: Number of seconds before a lease lapses if the worker does not renew it.
+        :param requests_per_minute: BugCrowd rate limit, which bounds how many actions a drain can perform.
+        :param state_cache: Optional SubmissionStateCache of recently observed states, checked before fetching
+            the state of a submission whose action is retried.
+        :param clock: Function returning the current timezone-aware datetime.
+        """
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        # Leave half the lease as a margin for retries and slow responses
+        self.batch_size = max(1, min(batch_size, int(lease_seconds * requests_per_minute / 60 / REQUESTS_PER_SUBMISSION / 2)))
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.state_cache = state_cache
+        self._clock = clock
+        self._session_lock = asyncio.Lock()
+        self.done = 0
+        self.retried = 0
+        self.dead = 0
+        self.superseded = 0
+        self.lost_leases = 0
+
+    def _backoff(self, attempts):
+        """
+        Computes the wait before the next attempt of an action.
+
+        :param attempts: Number of attempts made so far.
+        :return: timedelta to wait.
+        """
+        return timedelta(seconds=min(self.max_delay_seconds, self.base_delay_seconds * 2 ** (attempts - 1)))
+
+    async def _perform(self, bugcrowd_api, action):
+        """
+        Performs a single action on BugCrowd.
+
+        :param bugcrowd_api: Shared BugCrowdAPI client.
+        :param action: OutboxAction to perform.
+        """
+        submission = BugCrowdSubmission(action.submission_id, None, None, bugcrowd_api)
+        if action.action == OutboxActionType.CLOSE:
+            await submission.close_submission()
+            return
+
+        if action.action == OutboxActionType.COMMENT:
+            response, expected_status = await submission.create_comment(action.payload['body']), 201
+        else:
+            response, expected_status = await submission.assign_to_user(action.payload['user_id']), 200
+        if response.status_code != expected_status:
+            raise SubmissionActionError(f"Failed to {action.action.name.lower()} submission {action.submission_id}. Status code: {response.status_code}", response.status_code)
+
+    async def _is_still_new(self, bugcrowd_api, action):
+        """
+        Checks whether the submission of an action is still new on BugCrowd.
+
+        :param bugcrowd_api: Shared BugCrowdAPI client.
+        :param action: OutboxAction about to be retried.
+        :return: True if the submission is still new.
+        """
+        is_new = self.state_cache.is_new(action.submission_id) if self.state_cache is not None else None
+        if is_new is None:
+            is_new = await BugCrowdSubmission(action.submission_id, None, None, bugcrowd_api).is_submission_new()
+            if self.state_cache is not None:
+                self.state_cache.record(action.submission_id, is_new)
+        return is_new
+
+    async def _record(self, session, action, status, next_attempt_at=None, last_error=None):
+        """
+        Records the outcome of an attempt, one statement at a time on the shared session.
+
+        :param session: Database session object.
+        :param action: OutboxAction that was attempted.
+        :param status: New status of the action.
+        :param next_attempt_at: Earliest time of the next attempt, for actions that are still pending.
+        :param last_error: Error of the attempt, if it failed.
+        """
+        async with self._session_lock:
+            await db_handler.record_outbox_attempt(session, action.id, status, action.attempts + 1, next_attempt_at, last_error)
+
+    async def _drain_submission(self, session, bugcrowd_api, actions):
+        """
+        Performs the due actions of one submission in order, stopping at the first failure.
+
+        :param session: Database session object.
+        :param bugcrowd_api: Shared BugCrowdAPI client.
+        :param actions: Pending OutboxAction objects of the submission, in the order they were queued.
+        """
+        for action in actions:
+            if action.next_attempt_at > self._clock():
+                return
+            async with self._session_lock:
+                claimed = await db_handler.claim_outbox_action(session, action.id, action.submission_id, self.worker_id, self.lease_seconds)
+            if not claimed:
+                logger.warning(f"Lost the lease on submission {action.submission_id}, leaving its actions to the worker that took it over.")
+                self.lost_leases += 1
+                return
+            try:
+                # A retry may come long after the submission was checked, so make sure nobody triaged it since
+                superseded = action.attempts > 0 and action.action in NEW_SUBMISSION_ACTIONS and not await self._is_still_new(bugcrowd_api, action)
+                if not superseded:
+                    await self._perform(bugcrowd_api, action)
+            except Exception as error:
+                attempts = action.attempts + 1
+                if attempts >= self.max_attempts or not is_retryable(error):
+                    logger.error(f"Dead-lettering {action.action.name} action for submission {action.submission_id} after {attempts} attempts: {error}")
+                    await self._record(session, action, OutboxStatus.DEAD, last_error=str(error))
+                    self.dead += 1
+                else:
+                    delay = self._backoff(attempts)
+                    logger.warning(f"{action.action.name} action for submission {action.submission_id} failed, retrying in {delay.total_seconds():.0f} seconds: {error}")
+                    await self._record(session, action, OutboxStatus.PENDING, self._clock() + delay, str(error))
+                    self.retried += 1
+                return
+
+            if superseded:
+                logger.info(f"Submission {action.submission_id} is no longer new, dropping its {action.action.name} action.")
+                await self._record(session, action, OutboxStatus.DEAD, last_error=SUPERSEDED_ERROR)
+                self.superseded += 1
+                return
+
+            await self._record(session, action, OutboxStatus.DONE)
+            self.done += 1
+
+    async def drain(self, session, bugcrowd_api):
+        """
+        Leases submissions with pending actions that are due and performs their actions, submission by submission.
+
+        :param session: Database session object.
+        :param bugcrowd_api: Shared BugCrowdAPI client.
+        :return: Number of pending actions fetched.
+        """
+        submissions = await db_handler.lease_submissions_with_pending_actions(session, self.worker_id, self.lease_seconds, self.batch_size)
+        submission_ids = [submission.submission_id for submission in submissions]
+        try:
+            actions = await db_handler.fetch_pending_outbox_actions(session, submission_ids)
+            actions_by_submission = {}
+            for action in actions:
+                actions_by_submission.setdefault(action.submission_id, []).append(action)
+
+            async def drain_submission(submission_actions):
+                await self._drain_submission(session, bugcrowd_api, submission_actions)
+
+            async def renew():
+                async with self._session_lock:
+                    return bool(await db_handler.renew_submission_leases(session, self.worker_id, submission_ids, self.lease_seconds))
+
+            async with LeaseHeartbeat(f"{len(submission_ids)} outbox submissions", renew, self.lease_seconds / 3):
+                async for _ in bounded_map(drain_submission, actions_by_submission.values(), self.concurrency):
+                    pass
+        finally:
+            await db_handler.release_submission_leases(session, self.worker_id, submission_ids)
+        return len(actions)
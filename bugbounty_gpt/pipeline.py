@@ -0,0 +1,52 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def _iterate(items):
+    """
+    Iterates over a regular or asynchronous iterable.
+
+    :param items: Iterable or async iterable.
+    :return: Async iterator over the items.
+    """
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+async def bounded_map(worker, items, concurrency):
+    """
+    Runs a coroutine function over items with at most `concurrency` calls in flight at once.
+
+    Results are yielded as soon as each call completes, not in input order. Items are only pulled from
+    `items` when a slot is free, so a slow consumer or a large backlog never buffers more than
+    `concurrency` pending calls.
+
+    :param worker: Coroutine function called with each item.
+    :param items: Iterable or async iterable of items to process.
+    :param concurrency: Maximum number of worker calls running at the same time.
+    :return: Async iterator over the worker results.
+    """
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1.")
+
+    pending = set()
+    try:
+        async for item in _iterate(items):
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.create_task(worker(item)))
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,142 @@
+import logging
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from bugbounty_gpt.db import db_handler
+from bugbounty_gpt.handlers.bugcrowd_api import BugCrowdAPI
+
+logger = logging.getLogger(__name__)
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+class IncrementalPoller:
+    def __init__(self, name, full_sweep_interval_seconds, clock=_utcnow):
+        """
+        Initializes an IncrementalPoller object.
+
+        Lists only the submissions submitted since the newest one seen by the previous poll, using a cursor
+        persisted in the 'poll_cursor' table. Submissions that enter the listing with an older submission
+        time, such as reopened reports, are picked up by a full sweep of the listing every
+        `full_sweep_interval_seconds`, and whenever there is no cursor yet.
+
+        :param name: Name of the cursor, one per listing.
+        :param full_sweep_interval_seconds: Number of seconds between two full sweeps of the listing.
+        :param clock: Function returning the current timezone-aware datetime.
+        """
+        self.name = name
+        self.full_sweep_interval = timedelta(seconds=full_sweep_interval_seconds)
+        self._clock = clock
+        self._newest = None
+        self._previous = None
+        self._last_full_sweep_at = None
+        self.full_sweep = False
+
+    def _observe(self, submission):
+        """
+        Records a listed submission, keeping track of the newest one.
+
+        :param submission: Submission data as returned by the BugCrowd API.
+        """
+        submitted_at = BugCrowdAPI.submitted_at(submission)
+        if submitted_at is not None and (self._newest is None or submitted_at > self._newest[0]):
+            self._newest = (submitted_at, submission['id'])
+
+    async def pages(self, session, bugcrowd_api, params):
+        """
+        Streams the pages of submissions listed by this poll: the whole listing on a full sweep, otherwise
+        only the submissions submitted since the cursor.
+
+        :param session: Database session object.
+        :param bugcrowd_api: BugCrowdAPI client.
+        :param params: Parameters selecting the listing.
+        :return: Async iterator over non-empty lists of submissions.
+        """
+        cursor = await db_handler.fetch_poll_cursor(session, self.name)
+        now = self._clock()
+        self.full_sweep = (
+            cursor is None or cursor.submitted_at is None or cursor.last_full_sweep_at is None
+            or now - cursor.last_full_sweep_at >= self.full_sweep_interval
+        )
+        self._newest = (cursor.submitted_at, cursor.submission_id) if cursor is not None and cursor.submitted_at is not None else None
+        self._previous = self._newest
+        self._last_full_sweep_at = now if self.full_sweep else cursor.last_full_sweep_at
+
+        if self.full_sweep:
+            logger.info(f"Running a full sweep of the '{self.name}' listing.")
+            pages = bugcrowd_api.iter_submission_pages(params)
+        else:
+            pages = bugcrowd_api.iter_submission_pages_since(params, cursor.submitted_at)
+
+        async for submissions in pages:
+            for submission in submissions:
+                self._observe(submission)
+            yield submissions
+
+    async def save(self, session, advance=True):
+        """
+        Persists the cursor after the listed submissions have been processed.
+
+        :param session: Database session object.
+        :param advance: Whether to move the cursor past the listed submissions. When some of them still have to
+            be processed again, the cursor is kept where it was, but the time of the full sweep is still recorded
+            so the next polls do not sweep the whole listing again.
+        """
+        if self._last_full_sweep_at is None:
+            return
+        submitted_at, submission_id = (self._newest if advance else self._previous) or (None, None)
+        await db_handler.save_poll_cursor(session, self.name, submitted_at, submission_id, self._last_full_sweep_at)
+
+class AdaptivePollScheduler:
+    def __init__(self, min_interval_seconds, max_interval_seconds, backoff_factor, history_size=100):
+        """
+        Initializes an AdaptivePollScheduler object.
+
+        Chooses the wait before the next poll from what the last poll found: the minimum interval right after
+        new submissions arrived, growing by `backoff_factor` after every idle poll up to the maximum interval.
+        When BugCrowd throttles the poller, the interval backs off as if idle and is never shorter than the
+        requested Retry-After.
+
+        :param min_interval_seconds: Shortest wait between two polls.
+        :param max_interval_seconds: Longest wait between two polls, unless BugCrowd asks for a longer one.
+        :param backoff_factor: Factor the interval grows by after an idle poll.
+        :param history_size: Number of recent intervals kept for metrics.
+        """
+        if not 0 < min_interval_seconds <= max_interval_seconds:
+            raise ValueError("The poll intervals must be positive, and the minimum must not exceed the maximum.")
+        if backoff_factor < 1:
+            raise ValueError("The backoff factor must be at least 1.")
+        self.min_interval = min_interval_seconds
+        self.max_interval = max_interval_seconds
+        self.backoff_factor = backoff_factor
+        self.interval = min_interval_seconds
+        self.history = deque(maxlen=history_size)
+
+    def next_interval(self, new_submissions, retry_after=None):
+        """
+        Chooses the wait before the next poll.
+
+        :param new_submissions: Number of new submissions found by the last poll.
+        :param retry_after: Seconds BugCrowd asked to wait, 0 if it throttled without saying, or None if it did not throttle.
+        :return: Number of seconds to wait.
+        """
+        if retry_after is None and new_submissions:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff_factor)
+
+        interval = max(self.interval, retry_after or 0)
+        self.history.append(interval)
+        return interval
+
+    def summary(self):
+        """
+        Summarizes the recently chosen intervals.
+
+        :return: Human-readable summary of the minimum, average and maximum recent intervals.
+        """
+        if not self.history:
+            return "no polls yet"
+        return (
+            f"min {min(self.history):.0f}s, avg {sum(self.history) / len(self.history):.0f}s, "
+            f"max {max(self.history):.0f}s over the last {len(self.history)} polls"
+        )
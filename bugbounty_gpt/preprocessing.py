@@ -0,0 +1,127 @@
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PIECE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+REPEATED_LINES = re.compile(r"^([^\n]+)\n(?:\1\n)+", re.MULTILINE)
+
+def count_tokens(text):
+    """
+    Counts the tokens of a text locally, approximating the model's byte-pair tokenizer.
+
+    Short words count as one token and longer ones as one token per four letters, digits are grouped by three,
+    and every other non-space character counts as one token. This tends to overestimate slightly, which keeps
+    budgets and rate limit reservations on the safe side, and unlike counting characters it charges encoded
+    data and punctuation-heavy logs at their real, much higher, rate.
+
+    :param text: Text to count.
+    :return: Approximate number of tokens.
+    """
+    tokens = 0
+    for piece in TOKEN_PIECE.findall(text):
+        if piece[0].isalpha():
+            tokens += 1 if len(piece) <= 6 else -(-len(piece) // 4)
+        elif piece[0].isdigit():
+            tokens += -(-len(piece) // 3)
+        else:
+            tokens += 1
+    return tokens
+
+class DescriptionPreprocessor:
+    def __init__(self, max_tokens, min_blob_characters):
+        """
+        Initializes a DescriptionPreprocessor object.
+
+        Condenses submission descriptions before they are sent to OpenAI: encoded blobs are replaced with a short
+        placeholder, runs of identical lines are collapsed, and what remains is truncated to a token budget,
+        keeping the beginning and the end of the description.
+
+        :param max_tokens: Maximum number of tokens of a preprocessed description.
+        :param min_blob_characters: Minimum length of a base64 or hexadecimal run to be replaced.
+        """
+        self.max_tokens = max_tokens
+        self._base64_blob = re.compile(rf"(?<![\w+/])(?:[A-Za-z0-9+/]{{{min_blob_characters},}}|(?:[A-Za-z0-9+/]{{40,}}[ \t]*\r?\n){{2,}}[A-Za-z0-9+/]*)={{0,2}}(?![\w+/])")
+        self._hex_blob = re.compile(rf"\b(?:0x)?(?:[0-9a-fA-F]{{2}}[ :]?){{{min_blob_characters // 2},}}\b")
+        self.descriptions = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.truncated = 0
+
+    @property
+    def tokens_saved(self):
+        return self.tokens_in - self.tokens_out
+
+    @staticmethod
+    def _blob_placeholder(kind):
+        """
+        Builds a replacement function for blobs of one kind.
+
+        :param kind: Kind of data replaced, as shown in the placeholder.
+        :return: Function replacing a blob match with a placeholder.
+        """
+        def replace(match):
+            # Keep any line break the blob absorbed, so surrounding lines are not merged
+            line_break = "\n" if match.group(0).endswith("\n") else ""
+            return f"[{kind} data, {len(match.group(0).strip())} characters removed]{line_break}"
+        return replace
+
+    @staticmethod
+    def _collapse_repeated_lines(text):
+        """
+        Collapses runs of identical lines into one line and a note of how many times it repeated.
+
+        :param text: Text to condense.
+        :return: Condensed text.
+        """
+        def replace(match):
+            repeats = match.group(0).count("\n") - 1
+            return f"{match.group(1)}\n[previous line repeated {repeats} more times]\n"
+        return REPEATED_LINES.sub(replace, text if text.endswith("\n") else text + "\n").rstrip("\n")
+
+    def _truncate(self, text, tokens):
+        """
+        Truncates text to the token budget, keeping its beginning and end.
+
+        :param text: Text to truncate.
+        :param tokens: Number of tokens of the text.
+        :return: Truncated text.
+        """
+        # Cut by characters in proportion to the token overshoot, then shrink until the budget is met
+        keep_characters = len(text) * self.max_tokens // tokens
+        while True:
+            head_characters = keep_characters * 2 // 3
+            tail_characters = keep_characters - head_characters
+            truncated = (
+                f"{text[:head_characters]}\n[... {len(text) - keep_characters} characters truncated ...]\n"
+                f"{text[len(text) - tail_characters:] if tail_characters else ''}"
+            )
+            if count_tokens(truncated) <= self.max_tokens or keep_characters == 0:
+                return truncated
+            keep_characters = keep_characters * 9 // 10
+
+    def preprocess(self, description):
+        """
+        Condenses a submission description to what is useful for classification, within the token budget.
+
+        :param description: The content of the submission.
+        :return: Preprocessed content.
+        """
+        description = description or ''
+        tokens_in = count_tokens(description)
+        # Hexadecimal digits are also base64 characters, so hexadecimal blobs are replaced first
+        text = self._hex_blob.sub(self._blob_placeholder("hexadecimal"), description)
+        text = self._base64_blob.sub(self._blob_placeholder("base64"), text)
+        text = self._collapse_repeated_lines(text)
+        tokens_out = count_tokens(text)
+        if tokens_out > self.max_tokens:
+            text = self._truncate(text, tokens_out)
+            tokens_out = count_tokens(text)
+            self.truncated += 1
+
+        self.descriptions += 1
+        self.tokens_in += tokens_in
+        self.tokens_out += tokens_out
+        if tokens_out < tokens_in:
+            logger.info(f"Condensed submission content from {tokens_in} to {tokens_out} tokens.")
+        return text
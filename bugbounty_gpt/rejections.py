@@ -0,0 +1,39 @@
+import logging
+from bugbounty_gpt.ttl_map import TTLMap
+
+logger = logging.getLogger(__name__)
+
+class RejectionTracker:
+    def __init__(self, max_rejections, max_size=10000):
+        """
+        Initializes a RejectionTracker object.
+
+        Counts how many times OpenAI rejected the classification request of each submission, so a report that
+        can never be classified, e.g. because the model refuses its content, is given up on after
+        `max_rejections` cycles instead of being sent again, and holding back the poll cursor, forever.
+
+        :param max_rejections: Number of rejections after which a submission is no longer sent to OpenAI.
+        :param max_size: Maximum number of submissions tracked, evicting the least recently rejected first.
+        """
+        if max_rejections < 1:
+            raise ValueError("The maximum number of rejections must be at least 1.")
+        self.max_rejections = max_rejections
+        self._rejections = TTLMap(max_size)
+        self.given_up = 0
+
+    def __len__(self):
+        return len(self._rejections)
+
+    def record(self, submission_id):
+        """
+        Records a rejected classification request.
+
+        :param submission_id: ID of the submission whose request was rejected.
+        :return: True if the submission has been rejected `max_rejections` times and should be given up on.
+        """
+        rejections = self._rejections.pop(submission_id, 0) + 1
+        if rejections >= self.max_rejections:
+            self.given_up += 1
+            return True
+        self._rejections.set(submission_id, rejections)
+        return False
@@ -0,0 +1,60 @@
+import logging
+import re
+from collections import Counter
+from bugbounty_gpt.env import sanitize_category
+
+logger = logging.getLogger(__name__)
+
+class RuleEngine:
+    def __init__(self, rules):
+        """
+        Initializes a RuleEngine object.
+
+        Every pattern and keyword of every rule is compiled into one case-insensitive regular expression, so a
+        submission is scanned once whatever the number of rules. Each rule is a named group of the combined
+        expression; the leftmost match wins, and rules listed first win matches starting at the same position.
+
+        :param rules: List of rules, each a dictionary with a 'name', a 'category', the 'reasoning' stored with
+            the classification, and 'patterns' (regular expressions) and/or 'keywords' (literal text).
+        """
+        self._rules = {}
+        alternatives = []
+        for index, rule in enumerate(rules):
+            patterns = list(rule.get('patterns', [])) + [re.escape(keyword) for keyword in rule.get('keywords', [])]
+            for pattern in patterns:
+                try:
+                    re.compile(pattern)
+                except re.error as error:
+                    raise ValueError(f"Invalid pattern {pattern!r} in rule '{rule['name']}': {error}") from error
+
+            group_name = f"rule_{index}"
+            alternatives.append(f"(?P<{group_name}>{'|'.join(f'(?:{pattern})' for pattern in patterns)})")
+            self._rules[group_name] = (rule['name'], sanitize_category(rule['category']), rule['reasoning'])
+
+        self._pattern = re.compile('|'.join(alternatives), re.IGNORECASE) if alternatives else None
+        self.matches = Counter()
+
+    @property
+    def reasonings(self):
+        """
+        Reasonings stored with the classifications made by the rules.
+        """
+        return [reasoning for _, _, reasoning in self._rules.values()]
+
+    def classify(self, submission_content):
+        """
+        Classifies the submission content if it matches a rule.
+
+        :param submission_content: The content of the submission to be classified.
+        :return: A tuple containing the rule's category and reasoning, or None if no rule matches.
+        """
+        if self._pattern is None:
+            return None
+        match = self._pattern.search(submission_content or '')
+        if match is None:
+            return None
+
+        name, category, reasoning = self._rules[match.lastgroup]
+        self.matches[name] += 1
+        logger.info(f"Submission content matched rule '{name}', classifying it as {category}.")
+        return category, reasoning
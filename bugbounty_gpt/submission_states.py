@@ -0,0 +1,91 @@
+import time
+import logging
+from bugbounty_gpt.ttl_map import TTLMap
+
+logger = logging.getLogger(__name__)
+
+class SubmissionStateCache:
+    def __init__(self, max_size, max_age_seconds, clock=time.monotonic):
+        """
+        Initializes a SubmissionStateCache object.
+
+        Remembers which submissions BugCrowd recently listed as new, so the in-scope loop can act on them
+        without fetching each submission again to check its state. A state is only trusted for
+        `max_age_seconds` after it was observed; older or unknown states are checked with BugCrowd again.
+
+        :param max_size: Maximum number of submission states to remember.
+        :param max_age_seconds: Number of seconds an observed state is trusted for.
+        :param clock: Monotonic clock function used to expire states.
+        """
+        self._entries = TTLMap(max_size, max_age_seconds, clock)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, submission_id):
+        """
+        Looks up the state of a submission if it was observed recently enough.
+
+        :param submission_id: ID of the submission.
+        :return: True if the submission is new, False if it is not, or None if its state is unknown or stale.
+        """
+        return self._entries.get(submission_id)
+
+    def is_new(self, submission_id):
+        """
+        Returns whether a submission is new, as last observed on BugCrowd.
+
+        :param submission_id: ID of the submission.
+        :return: True if the submission is new, False if it is not, or None if it has to be checked with BugCrowd.
+        """
+        is_new = self._lookup(submission_id)
+        if is_new is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return is_new
+
+    def record(self, submission_id, is_new):
+        """
+        Records the state of a submission, evicting the oldest state if the cache is full.
+
+        :param submission_id: ID of the submission.
+        :param is_new: Whether the submission is new.
+        """
+        self._entries.set(submission_id, is_new)
+
+    def record_listing(self, submissions):
+        """
+        Records the states of listed submissions.
+
+        :param submissions: Submissions as returned by the BugCrowd API.
+        """
+        for submission in submissions:
+            state = (submission.get('attributes') or {}).get('state')
+            if state:
+                self.record(submission['id'], state.lower() == 'new')
+
+    async def refresh(self, bugcrowd_api, params, submission_ids):
+        """
+        Checks the states of several submissions with as few requests as possible.
+
+        The submissions whose state is unknown or stale are looked up in the listing of new submissions, which
+        is only walked past its first page when that takes fewer requests than fetching them one by one.
+        Submissions missing from the listing are left unknown, since a listing can shift while it is paged
+        through, and are checked one by one when acted on.
+
+        :param bugcrowd_api: Shared BugCrowdAPI client.
+        :param params: Parameters selecting the listing of new submissions.
+        :param submission_ids: IDs of the submissions about to be acted on.
+        """
+        stale_ids = [submission_id for submission_id in submission_ids if self._lookup(submission_id) is None]
+        # A single submission is checked as cheaply with its own request
+        if len(stale_ids) < 2:
+            return
+
+        submissions = await bugcrowd_api.fetch_submissions_within(params, max_pages=len(stale_ids))
+        self.record_listing(submissions)
+        confirmed = sum(1 for submission_id in stale_ids if self._lookup(submission_id) is not None)
+        logger.info(f"Checked the states of {confirmed} of {len(stale_ids)} submissions with the listing of new submissions.")
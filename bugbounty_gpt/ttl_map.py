@@ -0,0 +1,75 @@
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+class TTLMap:
+    def __init__(self, max_size, ttl_seconds=None, clock=time.monotonic):
+        """
+        Initializes a TTLMap object.
+
+        A mapping holding at most `max_size` entries, evicting the least recently stored first, whose entries
+        expire `ttl_seconds` after they were stored. Expired entries are dropped when they are next looked up.
+
+        :param max_size: Maximum number of entries.
+        :param ttl_seconds: Number of seconds an entry is kept for, or None to only evict by size.
+        :param clock: Monotonic clock function used to expire entries.
+        """
+        if max_size < 1:
+            raise ValueError("The maximum size must be at least 1.")
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None, touch=False):
+        """
+        Returns the value stored for a key, unless it expired.
+
+        :param key: Key of the entry.
+        :param default: Value returned if there is no entry or it expired.
+        :param touch: True to mark the entry as recently used, so it is evicted last. Its expiry is unchanged.
+        :return: The stored value, or `default`.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        value, stored_at = entry
+        if self.ttl_seconds is not None and self._clock() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return default
+        if touch:
+            self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        """
+        Stores a value, evicting the least recently stored entries if the map is full.
+
+        :param key: Key of the entry.
+        :param value: Value to store.
+        """
+        self._entries[key] = (value, self._clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """
+        Removes an entry and returns its value, unless it expired.
+
+        :param key: Key of the entry.
+        :param default: Value returned if there is no entry or it expired.
+        :return: The stored value, or `default`.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        del self._entries[key]
+        return value
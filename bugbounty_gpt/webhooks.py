@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT_SECONDS = 10
+REASONS = {202: "Accepted", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}
+
+def sign(secret, body):
+    """
+    Computes the signature of a webhook body.
+
+    :param secret: Shared webhook secret.
+    :param body: Raw request body.
+    :return: Hex HMAC-SHA256 digest of the body.
+    """
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+def verify_signature(secret, body, signature):
+    """
+    Checks the signature of a webhook body in constant time.
+
+    :param secret: Shared webhook secret.
+    :param body: Raw request body.
+    :param signature: Signature header value, a hex HMAC-SHA256 digest optionally prefixed with 'sha256='.
+    :return: True if the signature matches the body.
+    """
+    if not signature:
+        return False
+    signature = signature.strip()
+    if signature.startswith("sha256="):
+        signature = signature[len("sha256="):]
+    return hmac.compare_digest(sign(secret, body), signature.lower())
+
+def submission_id_from_payload(payload):
+    """
+    Extracts the submission ID from a webhook payload.
+
+    Submission events carry the submission itself, while events about a submission's activity reference it
+    through their relationships.
+
+    :param payload: Decoded webhook payload.
+    :return: ID of the submission, or None if the payload is not about a submission.
+    """
+    data = payload.get('data') if isinstance(payload, dict) else None
+    if not isinstance(data, dict):
+        return None
+    if data.get('type') == 'submission':
+        return data.get('id')
+    submission = ((data.get('relationships') or {}).get('submission') or {}).get('data') or {}
+    return submission.get('id') if submission.get('type') == 'submission' else None
+
+class WebhookReceiver:
+    def __init__(self, secret, queue, host, port, path, signature_header, max_body_bytes):
+        """
+        Initializes a WebhookReceiver object.
+
+        Serves a single webhook endpoint over plain HTTP/1.1, one request per connection. Requests whose body
+        matches its HMAC-SHA256 signature are acknowledged with 202 and the submission ID they refer to is put
+        on the queue; processing happens elsewhere, so BugCrowd never waits on a classification.
+
+        :param secret: Shared webhook secret used to verify signatures.
+        :param queue: asyncio.Queue receiving the IDs of the submissions to process.
+        :param host: Interface to listen on.
+        :param port: Port to listen on, 0 to pick a free port.
+        :param path: Path of the webhook endpoint.
+        :param signature_header: Name of the header carrying the signature.
+        :param max_body_bytes: Largest request body accepted.
+        """
+        if not secret:
+            raise ValueError("A webhook secret is required to verify webhook signatures.")
+        self.secret = secret
+        self.queue = queue
+        self.host = host
+        self.port = port
+        self.path = path
+        self.signature_header = signature_header.lower()
+        self.max_body_bytes = max_body_bytes
+        self._server = None
+        self.accepted = 0
+        self.rejected = 0
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    @property
+    def url(self):
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}{self.path}"
+
+    async def start(self):
+        """
+        Starts listening for webhooks.
+        """
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        logger.info(f"Listening for BugCrowd webhooks on {self.url}.")
+
+    async def aclose(self):
+        """
+        Stops listening for webhooks.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _read_request(self, reader):
+        """
+        Reads an HTTP request from a connection.
+
+        :param reader: Stream reader of the connection.
+        :return: Tuple of (status code, method, path, headers, body). The status code is None for a well-formed request.
+        """
+        method, path, _ = (await reader.readline()).decode('latin-1').split(' ', 2)
+        headers = {}
+        while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+            name, value = line.decode('latin-1').split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+
+        content_length = int(headers.get('content-length', 0))
+        if content_length > self.max_body_bytes:
+            return 413, method, path, headers, b''
+        return None, method, path, headers, await reader.readexactly(content_length)
+
+    def _handle(self, method, path, headers, body):
+        """
+        Verifies a webhook request and enqueues the submission it refers to.
+
+        :param method: HTTP method of the request.
+        :param path: Path of the request.
+        :param headers: Request headers, with lower-cased names.
+        :param body: Raw request body.
+        :return: HTTP status code of the response.
+        """
+        if path.split('?', 1)[0] != self.path:
+            return 404
+        if method != 'POST':
+            return 405
+        if not verify_signature(self.secret, body, headers.get(self.signature_header)):
+            return 401
+        try:
+            submission_id = submission_id_from_payload(json.loads(body))
+        except ValueError:
+            return 400
+        if submission_id is None:
+            return 400
+
+        self.queue.put_nowait(submission_id)
+        logger.info(f"Received webhook for submission {submission_id}.")
+        return 202
+
+    async def _serve(self, reader, writer):
+        """
+        Serves one request on a new connection.
+
+        :param reader: Stream reader of the connection.
+        :param writer: Stream writer of the connection.
+        """
+        try:
+            status_code, method, path, headers, body = await asyncio.wait_for(self._read_request(reader), REQUEST_TIMEOUT_SECONDS)
+            if status_code is None:
+                status_code = self._handle(method, path, headers, body)
+        except (ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            status_code = 400
+        except ConnectionError:
+            writer.close()
+            return
+
+        if status_code == 202:
+            self.accepted += 1
+        else:
+            self.rejected += 1
+            logger.warning(f"Rejected webhook request with status {status_code}.")
+        writer.write(f"HTTP/1.1 {status_code} {REASONS[status_code]}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode())
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+class FakeClock:
+    """
+    Clock function for the components taking a `clock` argument, returning `now` until the test moves it.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class StubHTTPServer:
+    """
+    Minimal HTTP/1.1 server on localhost for exercising the async HTTP clients in tests.
+
+    Each request is passed to `handler(request)`, where `request` is a dict with 'method', 'path', 'headers'
+    and 'body' keys, and which returns a `(status_code, json_body, headers)` tuple. Connections are kept alive
+    between requests so connection reuse can be observed through `connections`.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self.connections = 0
+        self._server = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._serve, '127.0.0.1', 0)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, path, _ = request_line.decode().split(' ', 2)
+        headers = {}
+        while (line := await reader.readline()) not in (b'\r\n', b''):
+            name, value = line.decode().split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get('content-length', 0)))
+        return {'method': method, 'path': path, 'headers': headers, 'body': body}
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        try:
+            while (request := await self._read_request(reader)) is not None:
+                self.requests.append(request)
+                status_code, json_body, headers = await self.handler(request)
+                payload = json.dumps(json_body).encode()
+                response_headers = {'Content-Type': 'application/json', 'Content-Length': str(len(payload)), **(headers or {})}
+                head = f"HTTP/1.1 {status_code} Stub\r\n" + ''.join(f"{name}: {value}\r\n" for name, value in response_headers.items())
+                writer.write(head.encode() + b'\r\n' + payload)
+                await writer.drain()
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+def chat_completion(content):
+    """
+    Builds a chat completion response body with a single choice.
+
+    :param content: Message content of the choice.
+    :return: Dictionary shaped like an OpenAI chat completion response.
+    """
+    return {
+        'object': 'chat.completion',
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+    }
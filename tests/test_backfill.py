@@ -0,0 +1,94 @@
+from bugbounty_gpt import backfill
+from bugbounty_gpt.db.models import SubmissionState
+from bugbounty_gpt.env import OPENAI_PROMPT
+from bugbounty_gpt.preprocessing import DescriptionPreprocessor
+from bugbounty_gpt.rule_engine import RuleEngine
+from tests.stub_servers import chat_completion
+from unittest.mock import patch, AsyncMock
+import pytest, json
+
+PREPROCESSOR = DescriptionPreprocessor(max_tokens=1000, min_blob_characters=64)
+RULE_ENGINE = RuleEngine([{"name": "Support", "category": "Customer Support Issues", "reasoning": "Support.", "keywords": ["reset my password"]}])
+
+def _submission(submission_id, description):
+    return {
+        "id": submission_id,
+        "attributes": {"description": description},
+        "relationships": {"researcher": {"data": {"id": f"researcher-{submission_id}"}}}
+    }
+
+class FakeBugCrowdAPI:
+    def __init__(self, pages):
+        self.pages = pages
+
+    async def iter_submission_pages(self, params):
+        for page in self.pages:
+            yield page
+
+def _result(request, content, status_code=200):
+    return {
+        "id": f"batch_req_{request['custom_id']}",
+        "custom_id": request["custom_id"],
+        "response": {"status_code": status_code, "request_id": "request", "body": chat_completion(content)},
+        "error": None
+    }
+
+@pytest.mark.asyncio
+async def test_export_batch_file_skips_stored_submissions(tmp_path):
+    api = FakeBugCrowdAPI([[_submission("s1", "First"), _submission("s2", "Second")], [_submission("s3", "Third")]])
+    path = tmp_path / "batch.jsonl"
+    with patch("bugbounty_gpt.backfill.db_handler.find_existing_submission_ids", new_callable=AsyncMock) as mock_existing:
+        mock_existing.side_effect = [{"s2"}, set()]
+        assert await backfill.export_batch_file(api, None, path, {}, RULE_ENGINE, PREPROCESSOR, SubmissionState.UPDATED_OUT_OF_BAND) == (2, 0)
+
+    requests = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [request["custom_id"] for request in requests] == ["s1:researcher-s1", "s3:researcher-s3"]
+    assert requests[0]["method"] == "POST"
+    assert requests[0]["url"] == "/v1/chat/completions"
+    assert requests[0]["body"]["messages"] == [
+        {"role": "system", "content": OPENAI_PROMPT},
+        {"role": "user", "content": "First"}
+    ]
+
+@pytest.mark.asyncio
+async def test_export_batch_file_applies_rules_and_preprocessing(tmp_path):
+    blob = "A" * 200
+    api = FakeBugCrowdAPI([[_submission("s1", f"Payload:\n{blob}"), _submission("s2", "Please reset my password")]])
+    path = tmp_path / "batch.jsonl"
+    with patch("bugbounty_gpt.backfill.db_handler.find_existing_submission_ids", new_callable=AsyncMock, return_value=set()), \
+         patch("bugbounty_gpt.db.submission_writer.db_handler.insert_submissions", new_callable=AsyncMock, return_value=1) as mock_insert:
+        assert await backfill.export_batch_file(api, None, path, {}, RULE_ENGINE, PREPROCESSOR, SubmissionState.NEW) == (1, 1)
+
+    [request] = [json.loads(line) for line in path.read_text().splitlines()]
+    assert request["custom_id"] == "s1:researcher-s1"
+    assert request["body"]["messages"][1]["content"] == PREPROCESSOR.preprocess(f"Payload:\n{blob}")
+    assert blob not in request["body"]["messages"][1]["content"]
+
+    [row] = mock_insert.await_args.args[1]
+    assert (row["submission_id"], row["classification"], row["reasoning"], row["submission_state"]) == (
+        "s2", "CUSTOMER_SUPPORT_ISSUES", "Support.", SubmissionState.NEW
+    )
+
+@pytest.mark.asyncio
+async def test_import_result_file_bulk_writes_classifications(tmp_path):
+    requests = [backfill.build_batch_request(_submission(f"s{i}", f"Report {i}"), PREPROCESSOR) for i in range(4)]
+    results = [
+        _result(requests[0], "Out of Scope\nExplanation"),
+        _result(requests[1], "Security Report\nExplanation"),
+        _result(requests[2], "Out of Scope\nExplanation", status_code=500),
+        _result(requests[3], "no explanation line"),
+    ]
+    path = tmp_path / "results.jsonl"
+    path.write_text("\n".join(json.dumps(result) for result in results) + "\n\n")
+
+    with patch("bugbounty_gpt.db.submission_writer.db_handler.insert_submissions", new_callable=AsyncMock) as mock_insert:
+        mock_insert.return_value = 2
+        assert await backfill.import_result_file(None, path, SubmissionState.UPDATED_OUT_OF_BAND) == (2, 2)
+
+    mock_insert.assert_awaited_once()
+    rows = mock_insert.await_args.args[1]
+    assert [(row["submission_id"], row["user_id"], row["classification"]) for row in rows] == [
+        ("s0", "researcher-s0", "OUT_OF_SCOPE"),
+        ("s1", "researcher-s1", "SECURITY_REPORT"),
+    ]
+    assert all(row["submission_state"] == SubmissionState.UPDATED_OUT_OF_BAND for row in rows)
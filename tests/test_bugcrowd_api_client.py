@@ -1,9 +1,11 @@
 from unittest.mock import patch, AsyncMock, MagicMock
 import httpx
 import pytest, asyncio
+from datetime import datetime, timezone
 
 from bugbounty_gpt.env import BUGCROWD_API_KEY, API_BASE_URL
 from bugbounty_gpt.handlers.bugcrowd_api import BugCrowdAPI
+from bugbounty_gpt.handlers.http_client import build_async_client
 
 def test_get_headers():
     headers = BugCrowdAPI._get_headers()
@@ -21,16 +23,66 @@ async def test_fetch_page():
     mock_response.json = MagicMock(return_value={"data": ["submission1", "submission2"]})  # Use MagicMock for the synchronous json method
 
     with patch.object(httpx.AsyncClient, 'get', return_value=mock_response) as mock_get:
-        submissions = await BugCrowdAPI._fetch_page(url, params, page_limit, page_offset) # await the async function
+        submissions = await BugCrowdAPI()._fetch_page(url, params, page_limit, page_offset) # await the async function
         assert submissions == ["submission1", "submission2"]  # No await here
 
 @pytest.mark.asyncio
 async def test_fetch_submissions():
     params = {"param": "value"}
-    with patch("bugbounty_gpt.handlers.bugcrowd_api.BugCrowdAPI._fetch_page", new_callable=AsyncMock) as mock_fetch_page:
-        mock_fetch_page.side_effect = [["submission1", "submission2"], []]
-        submissions = await BugCrowdAPI.fetch_submissions(params)
+    with patch("bugbounty_gpt.handlers.bugcrowd_api.BugCrowdAPI._fetch_page_document", new_callable=AsyncMock) as mock_fetch_page_document:
+        mock_fetch_page_document.return_value = {"data": ["submission1", "submission2"]}
+        submissions = await BugCrowdAPI().fetch_submissions(params)
         assert submissions == ["submission1", "submission2"]
+    mock_fetch_page_document.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_fetch_submissions_empty():
+    with patch("bugbounty_gpt.handlers.bugcrowd_api.BugCrowdAPI._fetch_page_document", new_callable=AsyncMock) as mock_fetch_page_document:
+        mock_fetch_page_document.return_value = {"data": [], "meta": {"count": 0, "total_hits": 0}}
+        assert await BugCrowdAPI().fetch_submissions({}) is None
+
+@pytest.mark.asyncio
+async def test_fetch_submissions_uses_total_hits():
+    first_page = {"data": list(range(100)), "meta": {"count": 100, "total_hits": 250}}
+    remaining_pages = {100: list(range(100, 200)), 200: list(range(200, 250))}
+
+    async def fetch_page(url, params, page_limit, page_offset):
+        # Finish out of order to check the pages are reassembled by offset
+        await asyncio.sleep(0.01 if page_offset == 100 else 0)
+        return remaining_pages[page_offset]
+
+    with patch("bugbounty_gpt.handlers.bugcrowd_api.BugCrowdAPI._fetch_page_document", new_callable=AsyncMock, return_value=first_page), \
+         patch("bugbounty_gpt.handlers.bugcrowd_api.BugCrowdAPI._fetch_page", side_effect=fetch_page) as mock_fetch_page:
+        submissions = await BugCrowdAPI().fetch_submissions({})
+
+    assert submissions == list(range(250))
+    assert sorted(call.args[3] for call in mock_fetch_page.call_args_list) == [100, 200]
+
+@pytest.mark.asyncio
+async def test_fetch_submissions_without_total_hits_stops_on_short_page():
+    with patch("bugbounty_gpt.handlers.bugcrowd_api.BugCrowdAPI._fetch_page_document", new_callable=AsyncMock, return_value={"data": list(range(100))}), \
+         patch("bugbounty_gpt.handlers.bugcrowd_api.BugCrowdAPI._fetch_page", new_callable=AsyncMock) as mock_fetch_page:
+        mock_fetch_page.side_effect = [list(range(100, 200)), list(range(200, 230))]
+        submissions = await BugCrowdAPI().fetch_submissions({})
+
+    assert submissions == list(range(230))
+    assert mock_fetch_page.call_count == 2
+
+@pytest.mark.asyncio
+async def test_fetch_submissions_within():
+    first_page = {"data": list(range(100)), "meta": {"count": 100, "total_hits": 250}}
+
+    async def fetch_page(url, params, page_limit, page_offset):
+        return list(range(page_offset, min(page_offset + page_limit, 250)))
+
+    with patch("bugbounty_gpt.handlers.bugcrowd_api.BugCrowdAPI._fetch_page_document", new_callable=AsyncMock, return_value=first_page), \
+         patch("bugbounty_gpt.handlers.bugcrowd_api.BugCrowdAPI._fetch_page", side_effect=fetch_page) as mock_fetch_page:
+        assert sorted(await BugCrowdAPI().fetch_submissions_within({}, max_pages=3)) == list(range(250))
+        assert mock_fetch_page.call_count == 2
+
+        # Too many pages: only the first one is used
+        assert await BugCrowdAPI().fetch_submissions_within({}, max_pages=2) == list(range(100))
+        assert mock_fetch_page.call_count == 2
 
 @pytest.mark.asyncio
 async def test_fetch_submission():
@@ -40,7 +92,7 @@ async def test_fetch_submission():
     mock_response.json = MagicMock(return_value={"data": "submission_data"})  # Use MagicMock for the synchronous json method
 
     with patch.object(httpx.AsyncClient, 'get', return_value=mock_response) as mock_get:
-        submission = await BugCrowdAPI.fetch_submission(submission_id)
+        submission = await BugCrowdAPI().fetch_submission(submission_id)
         assert submission == {"data": "submission_data"}  # No await here
 
 @pytest.mark.asyncio
@@ -50,7 +102,7 @@ async def test_create_comment():
     mock_response.status_code = 201
 
     with patch.object(httpx.AsyncClient, 'post', return_value=mock_response) as mock_post:
-        response = await BugCrowdAPI.create_comment(comment_data)
+        response = await BugCrowdAPI().create_comment(comment_data)
         assert response.status_code == 201
 
     mock_post.assert_called_once()
@@ -64,7 +116,96 @@ async def test_patch_submission():
     mock_response = AsyncMock(status_code=200, json=mock_json)
 
     with patch.object(httpx.AsyncClient, 'patch', return_value=mock_response) as mock_patch:
-        response = await BugCrowdAPI.patch_submission(submission_id, data)
+        response = await BugCrowdAPI().patch_submission(submission_id, data)
         assert await response.json() == {"data": "patched_submission_data"}
 
     mock_patch.assert_called_once()
+
+def test_build_async_client_uses_pool_settings():
+    http_settings = {
+        "http2": False,
+        "max_connections": 7,
+        "max_keepalive_connections": 3,
+        "keepalive_expiry": 15,
+        "timeout": 20,
+        "connect_timeout": 4,
+    }
+    client = build_async_client(http_settings)
+    assert client.timeout == httpx.Timeout(20, connect=4)
+    pool = client._transport._pool
+    assert pool._max_connections == 7
+    assert pool._max_keepalive_connections == 3
+    assert pool._keepalive_expiry == 15
+    asyncio.run(client.aclose())
+
+@pytest.mark.asyncio
+async def test_client_is_shared_across_requests():
+    mock_response = AsyncMock(status_code=200)
+    mock_response.json = MagicMock(return_value={"data": "submission_data"})
+
+    async with BugCrowdAPI() as api:
+        client = api._get_client()
+        with patch.object(httpx.AsyncClient, 'get', return_value=mock_response):
+            await api.fetch_submission("first")
+            await api.fetch_submission("second")
+        assert api._get_client() is client
+
+    assert client.is_closed
+
+@pytest.mark.asyncio
+async def test_iter_submissions_streams_pages_as_they_arrive():
+    first_page = {"data": ["submission1", "submission2"], "meta": {"count": 2, "total_hits": 102}}
+    api = BugCrowdAPI()
+    fetched_offsets = []
+
+    async def fetch_page(url, params, page_limit, page_offset):
+        fetched_offsets.append(page_offset)
+        return ["submission3"]
+
+    with patch.object(BugCrowdAPI, "_fetch_page_document", new_callable=AsyncMock, return_value=first_page), \
+         patch.object(BugCrowdAPI, "_fetch_page", side_effect=fetch_page):
+        stream = api.iter_submissions({})
+        assert await stream.__anext__() == "submission1"
+        assert fetched_offsets == []
+        assert [submission async for submission in stream] == ["submission2", "submission3"]
+        assert fetched_offsets == [100]
+
+@pytest.mark.asyncio
+async def test_iter_submission_pages_skips_empty_pages():
+    with patch.object(BugCrowdAPI, "_fetch_page_document", new_callable=AsyncMock, return_value={"data": []}):
+        pages = [page async for page in BugCrowdAPI().iter_submission_pages({})]
+    assert pages == []
+
+@pytest.mark.asyncio
+async def test_iter_submission_pages_since_stops_at_older_submissions():
+    def page(*hours):
+        return [{"id": f"s{hour}", "attributes": {"submitted_at": f"2026-10-17T{hour:02d}:00:00Z"}} for hour in hours]
+
+    since = datetime(2026, 10, 17, 10, 0, tzinfo=timezone.utc)
+    with patch.object(BugCrowdAPI, "_fetch_page", new_callable=AsyncMock, side_effect=[page(14, 13), page(10, 9)]) as mock_fetch_page:
+        pages = [submissions async for submissions in BugCrowdAPI().iter_submission_pages_since({"filter[state]": "new"}, since, page_limit=2)]
+
+    assert [[submission["id"] for submission in submissions] for submissions in pages] == [["s14", "s13"], ["s10"]]
+    assert mock_fetch_page.await_count == 2
+    assert mock_fetch_page.await_args_list[0].args[1] == {"filter[state]": "new", "sort": "submitted-desc"}
+
+def test_submitted_at():
+    assert BugCrowdAPI.submitted_at({"attributes": {"submitted_at": "2026-10-17T10:00:00Z"}}) == datetime(2026, 10, 17, 10, 0, tzinfo=timezone.utc)
+    assert BugCrowdAPI.submitted_at({"attributes": {"submitted_at": "2026-10-17T10:00:00"}}).tzinfo == timezone.utc
+    assert BugCrowdAPI.submitted_at({"attributes": {"submitted_at": None}}) is None
+    assert BugCrowdAPI.submitted_at({"attributes": {}}) is None
+
+@pytest.mark.asyncio
+async def test_request_records_retry_after():
+    client = MagicMock(is_closed=False)
+    client.get = AsyncMock(side_effect=[
+        httpx.Response(429, headers={"Retry-After": "120"}),
+        httpx.Response(429, headers={"Retry-After": "30"}),
+        httpx.Response(200),
+    ])
+    api = BugCrowdAPI(client=client)
+    assert api.pop_retry_after() is None
+    for _ in range(3):
+        await api._request('get', API_BASE_URL)
+    assert api.pop_retry_after() == 120
+    assert api.pop_retry_after() is None
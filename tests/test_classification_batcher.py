@@ -0,0 +1,75 @@
+from bugbounty_gpt.handlers.classification_batcher import ClassificationBatcher
+from bugbounty_gpt.handlers.openai_handler import OpenAIHandler, ClassificationError
+from unittest.mock import patch, AsyncMock
+import pytest, asyncio
+
+def _classify_submissions():
+    return AsyncMock(side_effect=lambda contents: [("OUT_OF_SCOPE", content) for content in contents])
+
+@pytest.mark.asyncio
+async def test_batcher_sends_full_batches_together():
+    batcher = ClassificationBatcher(batch_size=3, max_report_characters=100, max_wait_seconds=60, max_context_tokens=8192)
+    with patch("bugbounty_gpt.handlers.classification_batcher.OpenAIHandler.classify_submissions", _classify_submissions()) as mock_batch:
+        results = await asyncio.gather(*(batcher.classify(f"Report {i}") for i in range(3)))
+
+    mock_batch.assert_awaited_once_with(["Report 0", "Report 1", "Report 2"])
+    assert results == [("OUT_OF_SCOPE", f"Report {i}") for i in range(3)]
+    assert batcher.requests == 1
+
+@pytest.mark.asyncio
+async def test_batcher_sends_partial_batch_after_wait():
+    batcher = ClassificationBatcher(batch_size=3, max_report_characters=100, max_wait_seconds=0.01, max_context_tokens=8192)
+    with patch("bugbounty_gpt.handlers.classification_batcher.OpenAIHandler.classify_submissions", _classify_submissions()) as mock_batch:
+        results = await asyncio.wait_for(asyncio.gather(batcher.classify("Report 0"), batcher.classify("Report 1")), 1)
+
+    mock_batch.assert_awaited_once_with(["Report 0", "Report 1"])
+    assert results == [("OUT_OF_SCOPE", "Report 0"), ("OUT_OF_SCOPE", "Report 1")]
+
+@pytest.mark.asyncio
+async def test_batcher_classifies_long_reports_alone():
+    batcher = ClassificationBatcher(batch_size=3, max_report_characters=5, max_wait_seconds=60, max_context_tokens=8192)
+    with patch("bugbounty_gpt.handlers.classification_batcher.OpenAIHandler.classify_submission", new_callable=AsyncMock) as mock_single:
+        mock_single.return_value = ("SECURITY_REPORT", "Explanation")
+        assert await batcher.classify("A long report") == ("SECURITY_REPORT", "Explanation")
+        mock_single.assert_awaited_once_with("A long report")
+
+@pytest.mark.asyncio
+async def test_batcher_propagates_errors():
+    batcher = ClassificationBatcher(batch_size=2, max_report_characters=100, max_wait_seconds=60, max_context_tokens=8192)
+    with patch("bugbounty_gpt.handlers.classification_batcher.OpenAIHandler.classify_submissions", AsyncMock(side_effect=RuntimeError("boom"))):
+        results = await asyncio.gather(batcher.classify("Report 0"), batcher.classify("Report 1"), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+@pytest.mark.asyncio
+async def test_batcher_falls_back_to_single_requests_when_batch_request_fails():
+    batcher = ClassificationBatcher(batch_size=3, max_report_characters=100, max_wait_seconds=60, max_context_tokens=8192)
+    single = AsyncMock(side_effect=[("OUT_OF_SCOPE", "Report 0"), ClassificationError("rejected"), ("OUT_OF_SCOPE", "Report 2")])
+    with patch("bugbounty_gpt.handlers.classification_batcher.OpenAIHandler.classify_submissions", AsyncMock(side_effect=ClassificationError("context length exceeded"))), \
+         patch("bugbounty_gpt.handlers.classification_batcher.OpenAIHandler.classify_submission", single):
+        results = await asyncio.gather(*(batcher.classify(f"Report {i}") for i in range(3)), return_exceptions=True)
+
+    # Only the report that also fails on its own is left unclassified
+    assert results[0] == ("OUT_OF_SCOPE", "Report 0")
+    assert isinstance(results[1], ClassificationError)
+    assert results[2] == ("OUT_OF_SCOPE", "Report 2")
+    assert batcher.requests == 4
+
+@pytest.mark.asyncio
+async def test_batcher_keeps_batches_within_the_context_window():
+    # Eight reports just under the character limit, as configured for gpt-4
+    reports = [f"Report {i} " + "lorem ipsum dolor " * 215 for i in range(8)]
+    assert OpenAIHandler.estimate_batch_tokens(reports) > 8192
+
+    batcher = ClassificationBatcher(batch_size=8, max_report_characters=4000, max_wait_seconds=0.01, max_context_tokens=8192)
+    with patch("bugbounty_gpt.handlers.classification_batcher.OpenAIHandler.classify_submissions", _classify_submissions()) as mock_batch:
+        results = await asyncio.wait_for(asyncio.gather(*(batcher.classify(report) for report in reports)), 1)
+
+    batches = [call.args[0] for call in mock_batch.await_args_list]
+    assert sorted(report for batch in batches for report in batch) == sorted(reports)
+    assert len(batches) > 1
+    assert all(OpenAIHandler.estimate_batch_tokens(batch) <= 8192 for batch in batches)
+    assert results == [("OUT_OF_SCOPE", report) for report in reports]
+
+def test_batcher_rejects_invalid_batch_size():
+    with pytest.raises(ValueError):
+        ClassificationBatcher(batch_size=0, max_report_characters=100, max_wait_seconds=1, max_context_tokens=8192)
@@ -0,0 +1,99 @@
+from bugbounty_gpt.classification_cache import ClassificationCache, cache_key, normalize_content
+from bugbounty_gpt.handlers.openai_handler import CLASSIFICATION_ERROR_MESSAGE
+from tests.stub_servers import FakeClock
+from unittest.mock import patch, AsyncMock
+import asyncio
+import pytest
+
+def test_normalize_content():
+    assert normalize_content("  XSS in\n\tSearch  ") == "xss in search"
+    assert normalize_content(None) == ""
+
+def test_cache_key_ignores_trivial_differences():
+    assert cache_key("XSS in search") == cache_key("  xss   in\nsearch ")
+    assert cache_key("XSS in search") != cache_key("XSS in login")
+
+def test_cache_key_depends_on_model_and_prompt_version():
+    assert cache_key("XSS", model="gpt-4") != cache_key("XSS", model="gpt-3.5-turbo")
+    assert cache_key("XSS", prompt_version="a") != cache_key("XSS", prompt_version="b")
+
+@pytest.mark.asyncio
+async def test_classify_calls_model_once_per_content():
+    cache = ClassificationCache(max_entries=10, ttl_seconds=60)
+    classify = AsyncMock(return_value=("OUT_OF_SCOPE", "Explanation"))
+
+    assert await cache.classify("Report", classify) == ("OUT_OF_SCOPE", "Explanation")
+    assert await cache.classify(" report ", classify) == ("OUT_OF_SCOPE", "Explanation")
+    classify.assert_awaited_once_with("Report")
+    assert (cache.hits, cache.misses) == (1, 1)
+
+@pytest.mark.asyncio
+async def test_classify_shares_in_flight_classifications():
+    cache = ClassificationCache(max_entries=10, ttl_seconds=60)
+    calls = 0
+
+    async def classify(content):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "OUT_OF_SCOPE", "Explanation"
+
+    results = await asyncio.gather(*(cache.classify("Report", classify) for _ in range(5)))
+    assert results == [("OUT_OF_SCOPE", "Explanation")] * 5
+    assert calls == 1
+
+@pytest.mark.asyncio
+async def test_classify_propagates_errors_to_waiters():
+    cache = ClassificationCache(max_entries=10, ttl_seconds=60)
+
+    async def classify(content):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(*(cache.classify("Report", classify) for _ in range(2)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert cache._get(cache_key("Report")) is None
+
+@pytest.mark.asyncio
+async def test_classify_does_not_cache_errors():
+    cache = ClassificationCache(max_entries=10, ttl_seconds=60)
+    classify = AsyncMock(return_value=("SECURITY_REPORT", CLASSIFICATION_ERROR_MESSAGE))
+    await cache.classify("Report", classify)
+    await cache.classify("Report", classify)
+    assert classify.await_count == 2
+    assert cache._pending == {}
+
+@pytest.mark.asyncio
+async def test_classify_expires_and_evicts_entries():
+    clock = FakeClock()
+    cache = ClassificationCache(max_entries=1, ttl_seconds=60, clock=clock)
+    classify = AsyncMock(return_value=("OUT_OF_SCOPE", "Explanation"))
+
+    await cache.classify("Report", classify)
+    clock.now = 61
+    await cache.classify("Report", classify)
+    await cache.classify("Other report", classify)
+    await cache.classify("Report", classify)
+    assert classify.await_count == 4
+
+@pytest.mark.asyncio
+async def test_prefetch_loads_database_entries():
+    cache = ClassificationCache(max_entries=10, ttl_seconds=60)
+    key = cache_key("Report")
+    with patch("bugbounty_gpt.classification_cache.db_handler.fetch_cached_classifications", new_callable=AsyncMock) as mock_fetch:
+        mock_fetch.return_value = {key: ("OUT_OF_SCOPE", "Cached")}
+        await cache.prefetch(None, ["Report", "Other report"])
+        assert mock_fetch.await_args.args[1] == {key, cache_key("Other report")}
+
+    classify = AsyncMock()
+    assert await cache.classify("Report", classify) == ("OUT_OF_SCOPE", "Cached")
+    classify.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_flush_writes_pending_entries_once():
+    cache = ClassificationCache(max_entries=10, ttl_seconds=60)
+    await cache.classify("Report", AsyncMock(return_value=("OUT_OF_SCOPE", "Explanation")))
+    with patch("bugbounty_gpt.classification_cache.db_handler.insert_cached_classifications", new_callable=AsyncMock) as mock_insert:
+        await cache.flush(None)
+        await cache.flush(None)
+        mock_insert.assert_awaited_once_with(None, [{"cache_key": cache_key("Report"), "classification": "OUT_OF_SCOPE", "reasoning": "Explanation"}])
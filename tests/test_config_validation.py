@@ -1,5 +1,6 @@
 import pytest
 import bugbounty_gpt.env as env
+from unittest.mock import patch
 
 def test_sanitize_category():
     assert env.sanitize_category("Functional Bugs or Glitches") == "FUNCTIONAL_BUGS_OR_GLITCHES"
@@ -37,3 +38,39 @@ def test_validate_response_pairs():
     invalid_config_response_missing = {"categories": {"response": [{"name": "Functional Bugs"}]}}
     with pytest.raises(ValueError):
         env.validate_response_pairs(invalid_config_response_missing)
+
+def test_validate_rules():
+    rule = {"name": "Empty", "category": "Out of Scope", "reasoning": "Empty.", "patterns": ["\\A\\s*\\Z"]}
+    env.validate_rules({"categories": {"valid": ["Out of Scope"]}, "rules": [rule]})  # Should not raise an exception
+
+    with pytest.raises(ValueError):
+        env.validate_rules({"categories": {"valid": ["Security Report"]}, "rules": [rule]})
+    with pytest.raises(ValueError):
+        env.validate_rules({"categories": {"valid": ["Out of Scope"]}, "rules": [{**rule, "patterns": []}]})
+    with pytest.raises(ValueError):
+        env.validate_rules({"categories": {"valid": ["Out of Scope"]}, "rules": [{"name": "Incomplete", "patterns": ["x"]}]})
+
+def test_has_nested_quantifiers():
+    assert env.has_nested_quantifiers(r"\A\s*(?:https?://\S*(?:support|help)\S*\s*)+\Z")
+    assert env.has_nested_quantifiers(r"(?:x(?:a+))+")
+    assert env.has_nested_quantifiers(r"(?:a*b){2,}")
+    assert not env.has_nested_quantifiers(r"\A\s*+(?:https?://(?=\S*?(?:support|help))\S++\s*+)++\Z")
+    assert not env.has_nested_quantifiers(r"(?>a+)+")
+    assert not env.has_nested_quantifiers(r"(?:\w+\W+){0,15}?")
+    assert not env.has_nested_quantifiers(r"[(a+)]+")
+    assert not env.has_nested_quantifiers(r"\(a+\)+")
+
+def test_validate_rules_warns_about_nested_quantifiers(caplog):
+    rule = {"name": "Slow", "category": "Out of Scope", "reasoning": "Slow.", "patterns": ["(?:a+)+b"]}
+    env.validate_rules({"categories": {"valid": ["Out of Scope"]}, "rules": [rule]})
+    assert "rule 'Slow'" in caplog.text
+
+def test_validate_http_settings():
+    config = {"http": {"bugcrowd": {"http2": False}, "openai": {"http2": True}}}
+    with patch("bugbounty_gpt.env.importlib.util.find_spec", return_value=object()):
+        env.validate_http_settings(config)  # Should not raise an exception
+
+    with patch("bugbounty_gpt.env.importlib.util.find_spec", return_value=None):
+        with pytest.raises(ValueError, match="'openai'"):
+            env.validate_http_settings(config)
+        env.validate_http_settings({"http": {"bugcrowd": {"http2": False}}})
@@ -0,0 +1,248 @@
+from bugbounty_gpt.db import db_handler
+from bugbounty_gpt.db.models import OutboxActionType, SubmissionState
+from sqlalchemy.dialects import postgresql
+from unittest.mock import AsyncMock, MagicMock
+from datetime import timedelta
+import pytest
+
+def _mock_session(rows=()):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = list(rows)
+    session = AsyncMock()
+    session.execute.return_value = result
+    return session
+
+def _compiled_sql(session, call_index=0):
+    stmt = session.execute.await_args_list[call_index].args[0]
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+@pytest.mark.asyncio
+async def test_find_existing_submission_ids_uses_single_query():
+    session = _mock_session(rows=["submission1"])
+    existing_ids = await db_handler.find_existing_submission_ids(session, ["submission1", "submission2", "submission3"])
+
+    assert existing_ids == {"submission1"}
+    session.execute.assert_awaited_once()
+    assert "submission.submission_id IN" in _compiled_sql(session)
+
+@pytest.mark.asyncio
+async def test_find_existing_submission_ids_empty_input():
+    session = _mock_session()
+    assert await db_handler.find_existing_submission_ids(session, []) == set()
+    session.execute.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_fetch_recent_submission_ids():
+    session = _mock_session(rows=["submission2", "submission1"])
+    assert await db_handler.fetch_recent_submission_ids(session, 10) == ["submission2", "submission1"]
+
+    sql = _compiled_sql(session)
+    assert "ORDER BY submission.created_at DESC" in sql
+    assert "LIMIT" in sql
+
+@pytest.mark.asyncio
+async def test_insert_submissions_single_statement_on_conflict_do_nothing():
+    session = _mock_session(rows=["submission1"])
+    submissions_data = [
+        {"submission_id": "submission1", "user_id": "user", "classification": "OUT_OF_SCOPE", "submission_state": SubmissionState.NEW, "reasoning": "reason"},
+        {"submission_id": "submission2", "user_id": "user", "classification": "OUT_OF_SCOPE", "submission_state": SubmissionState.NEW, "reasoning": "reason"},
+    ]
+    inserted = await db_handler.insert_submissions(session, submissions_data)
+
+    assert inserted == 1
+    session.execute.assert_awaited_once()
+    session.commit.assert_awaited_once()
+    sql = _compiled_sql(session)
+    assert sql.startswith("INSERT INTO submission")
+    assert "ON CONFLICT (submission_id) DO NOTHING" in sql
+    assert "RETURNING submission.submission_id" in sql
+
+@pytest.mark.asyncio
+async def test_insert_submissions_empty_input():
+    session = _mock_session()
+    assert await db_handler.insert_submissions(session, []) == 0
+    session.execute.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_insert_submission_reports_whether_inserted():
+    submission_data = {"submission_id": "submission1", "user_id": "user", "classification": "OUT_OF_SCOPE", "submission_state": SubmissionState.NEW, "reasoning": "reason"}
+    assert await db_handler.insert_submission(_mock_session(rows=["submission1"]), submission_data) is True
+    assert await db_handler.insert_submission(_mock_session(rows=[]), submission_data) is False
+
+@pytest.mark.asyncio
+async def test_update_submission_states_single_statement():
+    session = _mock_session()
+    session.execute.return_value.rowcount = 3
+    updated = await db_handler.update_submission_states(session, ["submission1", "submission2", "submission3"], SubmissionState.UPDATED)
+
+    assert updated == 3
+    session.execute.assert_awaited_once()
+    session.commit.assert_awaited_once()
+    sql = _compiled_sql(session)
+    assert sql.startswith("UPDATE submission SET submission_state=")
+    assert "WHERE submission.submission_id = ANY (%(submission_ids)s::VARCHAR[])" in sql
+    assert "updated_at=now()" in sql
+
+@pytest.mark.asyncio
+async def test_update_submission_states_empty_input():
+    session = _mock_session()
+    assert await db_handler.update_submission_states(session, [], SubmissionState.UPDATED) == 0
+    session.execute.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_update_submission_state_reports_whether_updated():
+    session = _mock_session()
+    session.execute.return_value.rowcount = 1
+    assert await db_handler.update_submission_state(session, "submission1", SubmissionState.UPDATED) is True
+    session.execute.return_value.rowcount = 0
+    assert await db_handler.update_submission_state(session, "submission1", SubmissionState.UPDATED) is False
+
+@pytest.mark.asyncio
+async def test_fetch_cached_classifications_ignores_expired_entries():
+    session = _mock_session()
+    await db_handler.fetch_cached_classifications(session, ["key"], timedelta(days=30))
+
+    sql = _compiled_sql(session)
+    assert "classification_cache.cache_key IN" in sql
+    assert "classification_cache.created_at > now() -" in sql
+
+@pytest.mark.asyncio
+async def test_insert_cached_classifications_upserts():
+    session = _mock_session()
+    await db_handler.insert_cached_classifications(session, [{"cache_key": "key", "classification": "OUT_OF_SCOPE", "reasoning": "reason"}])
+
+    sql = _compiled_sql(session)
+    assert "ON CONFLICT (cache_key) DO UPDATE" in sql
+    session.commit.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_delete_expired_cached_classifications():
+    session = _mock_session()
+    session.execute.return_value.rowcount = 2
+    assert await db_handler.delete_expired_cached_classifications(session, timedelta(days=30)) == 2
+    assert "DELETE FROM classification_cache WHERE classification_cache.created_at <= now() -" in _compiled_sql(session)
+
+@pytest.mark.asyncio
+async def test_fetch_submission_signatures_most_recent_first():
+    session = _mock_session()
+    session.execute.return_value.all.return_value = []
+    assert await db_handler.fetch_submission_signatures(session, 10, ["An error occurred."]) == []
+
+    sql = _compiled_sql(session)
+    assert "submission.content_signature IS NOT NULL" in sql
+    assert "submission.reasoning IS NULL OR (submission.reasoning NOT IN (__[POSTCOMPILE_reasoning_1]))" in sql
+    assert "ORDER BY submission.created_at DESC" in sql
+
+@pytest.mark.asyncio
+async def test_save_poll_cursor_upserts():
+    session = _mock_session()
+    await db_handler.save_poll_cursor(session, "new_submissions", None, None, None)
+
+    sql = _compiled_sql(session)
+    assert sql.startswith("INSERT INTO poll_cursor")
+    assert "ON CONFLICT (name) DO UPDATE" in sql
+    session.commit.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_enqueue_outbox_actions_skips_queued_keys():
+    session = _mock_session(rows=[1])
+    actions = [
+        {'idempotency_key': "comment:s1", 'submission_id': "s1", 'action': OutboxActionType.COMMENT, 'payload': {'body': "Hello!"}},
+        {'idempotency_key': "close:s1", 'submission_id': "s1", 'action': OutboxActionType.CLOSE, 'payload': {}},
+    ]
+    assert await db_handler.enqueue_outbox_actions(session, actions) == 1
+
+    sql = _compiled_sql(session)
+    assert sql.startswith("INSERT INTO outbox_action")
+    assert "ON CONFLICT (idempotency_key) DO NOTHING" in sql
+    session.commit.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_fetch_pending_outbox_actions_skips_blocked_submissions():
+    session = _mock_session()
+    await db_handler.fetch_pending_outbox_actions(session, ["s1", "s2"])
+
+    sql = _compiled_sql(session)
+    assert "outbox_action.submission_id IN" in sql
+    assert "NOT (EXISTS" in sql
+    assert "ORDER BY outbox_action.id" in sql
+
+@pytest.mark.asyncio
+async def test_fetch_pending_outbox_actions_empty_input():
+    session = _mock_session()
+    assert await db_handler.fetch_pending_outbox_actions(session, []) == []
+    session.execute.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_lease_submissions_skips_locked_and_leased_rows():
+    session = _mock_session()
+    await db_handler.lease_submissions(session, [SubmissionState.NEW], ["VALID"], "worker-1", 300, 50)
+
+    sql = _compiled_sql(session)
+    assert sql.startswith("UPDATE submission SET leased_by=")
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "submission.lease_expires_at IS NULL OR submission.lease_expires_at < now()" in sql
+    assert "LIMIT" in sql
+    assert "RETURNING" in sql
+    session.commit.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_lease_submissions_with_pending_actions():
+    session = _mock_session()
+    await db_handler.lease_submissions_with_pending_actions(session, "worker-1", 300, 50)
+
+    sql = _compiled_sql(session)
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "outbox_action.next_attempt_at <= now()" in sql
+
+@pytest.mark.asyncio
+async def test_release_submission_leases_only_releases_own_leases():
+    session = _mock_session()
+    await db_handler.release_submission_leases(session, "worker-1", ["s1"])
+
+    sql = _compiled_sql(session)
+    assert "submission.leased_by = %(leased_by_1)s" in sql
+    session.commit.assert_awaited_once()
+
+    session = _mock_session()
+    await db_handler.release_submission_leases(session, "worker-1", [])
+    session.execute.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_renew_submission_leases_returns_leases_still_held():
+    session = _mock_session(rows=["s1"])
+    assert await db_handler.renew_submission_leases(session, "worker-1", ["s1", "s2"], 300) == {"s1"}
+
+    sql = _compiled_sql(session)
+    assert sql.startswith("UPDATE submission SET lease_expires_at=")
+    assert "submission.leased_by = %(leased_by_1)s" in sql
+    assert "RETURNING submission.submission_id" in sql
+
+    session = _mock_session()
+    assert await db_handler.renew_submission_leases(session, "worker-1", [], 300) == set()
+    session.execute.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_claim_outbox_action_checks_lease_and_status():
+    session = _mock_session()
+    session.execute.return_value.scalar_one_or_none.return_value = None
+    assert not await db_handler.claim_outbox_action(session, 7, "s1", "worker-1", 300)
+
+    sql = _compiled_sql(session)
+    assert "submission.leased_by = %(leased_by_1)s" in sql
+    assert "submission.lease_expires_at > now()" in sql
+    assert "outbox_action.status = %(status_1)s" in sql
+    session.commit.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_lease_poll_cursor():
+    session = _mock_session()
+    session.execute.return_value.scalar_one_or_none.return_value = None
+    assert not await db_handler.lease_poll_cursor(session, "new_submissions", "worker-1", 300)
+
+    sql = _compiled_sql(session)
+    assert "ON CONFLICT (name) DO UPDATE" in sql
+    assert "WHERE poll_cursor.lease_expires_at IS NULL OR poll_cursor.lease_expires_at < now() OR poll_cursor.leased_by =" in sql
+
+    session.execute.return_value.scalar_one_or_none.return_value = "new_submissions"
+    assert await db_handler.lease_poll_cursor(session, "new_submissions", "worker-1", 300)
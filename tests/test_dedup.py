@@ -0,0 +1,47 @@
+from bugbounty_gpt.dedup import SeenSubmissionIndex
+from tests.stub_servers import FakeClock
+from unittest.mock import patch, AsyncMock
+import pytest
+
+def test_seen_submission_index_membership():
+    index = SeenSubmissionIndex(10)
+    assert "submission1" not in index
+    index.add("submission1")
+    assert "submission1" in index
+    assert len(index) == 1
+
+def test_seen_submission_index_evicts_least_recently_seen():
+    index = SeenSubmissionIndex(2)
+    index.update(["submission1", "submission2"])
+    index.add("submission1")
+    index.add("submission3")
+    assert "submission1" in index
+    assert "submission2" not in index
+    assert "submission3" in index
+    assert len(index) == 2
+
+def test_seen_submission_index_expires_entries():
+    clock = FakeClock()
+    index = SeenSubmissionIndex(10, ttl_seconds=60, clock=clock)
+    index.add("submission1")
+    clock.now = 60
+    assert "submission1" in index
+    clock.now = 61
+    assert "submission1" not in index
+    assert len(index) == 0
+
+def test_seen_submission_index_rejects_invalid_size():
+    with pytest.raises(ValueError):
+        SeenSubmissionIndex(0)
+
+@pytest.mark.asyncio
+async def test_seen_submission_index_warm_keeps_most_recent():
+    index = SeenSubmissionIndex(2)
+    with patch("bugbounty_gpt.dedup.db_handler.fetch_recent_submission_ids", new_callable=AsyncMock) as mock_fetch:
+        mock_fetch.return_value = ["newest", "older"]
+        await index.warm(session=None)
+        mock_fetch.assert_awaited_once_with(None, 2)
+
+    index.add("latest")
+    assert "newest" in index
+    assert "older" not in index
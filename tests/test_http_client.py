@@ -0,0 +1,146 @@
+from bugbounty_gpt.handlers.http_client import RetryTransport, CircuitBreaker, CircuitOpenError, build_async_client, parse_retry_after
+from tests.stub_servers import FakeClock
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import AsyncMock
+import asyncio
+import httpx
+import pytest
+
+def _client(responses, circuit_breaker=None, retry_all_methods=False, max_retries=3):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    sleep = AsyncMock()
+    transport = RetryTransport(httpx.MockTransport(handler), max_retries, 1, 60, circuit_breaker, retry_all_methods, sleep=sleep)
+    return httpx.AsyncClient(transport=transport), requests, sleep
+
+def test_parse_retry_after():
+    assert parse_retry_after("30") == 30
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert 3500 < parse_retry_after(format_datetime(datetime.now(timezone.utc) + timedelta(hours=1), usegmt=True)) <= 3600
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+@pytest.mark.asyncio
+async def test_retry_transport_retries_throttled_requests():
+    client, requests, sleep = _client([
+        httpx.Response(429, headers={"Retry-After": "7"}),
+        httpx.Response(503),
+        httpx.Response(201),
+    ])
+    async with client:
+        response = await client.post("https://api.example.com/comments", json={"body": "Hello!"})
+
+    assert response.status_code == 201
+    assert len(requests) == 3
+    assert requests[2].content == requests[0].content
+    # Retry-After replaces the backoff delay, which is otherwise jittered below the exponential bound
+    assert sleep.await_args_list[0].args[0] == 7
+    assert 0 <= sleep.await_args_list[1].args[0] <= 2
+
+@pytest.mark.asyncio
+async def test_retry_transport_only_retries_server_errors_for_idempotent_methods():
+    client, requests, _ = _client([httpx.Response(500), httpx.Response(500), httpx.Response(200)])
+    async with client:
+        assert (await client.patch("https://api.example.com/submissions/s1")).status_code == 500
+        assert (await client.get("https://api.example.com/submissions/s1")).status_code == 200
+    assert [request.method for request in requests] == ['PATCH', 'GET', 'GET']
+
+    client, requests, _ = _client([httpx.ReadTimeout("timed out"), httpx.Response(200)], retry_all_methods=True)
+    async with client:
+        assert (await client.post("https://api.openai.com/v1/chat/completions")).status_code == 200
+    assert len(requests) == 2
+
+@pytest.mark.asyncio
+async def test_retry_transport_gives_up():
+    client, requests, sleep = _client([httpx.Response(429)] * 4 + [httpx.Response(429, headers={"Retry-After": "3600"})], max_retries=3)
+    async with client:
+        assert (await client.get("https://api.example.com/submissions")).status_code == 429
+        # Waiting longer than the maximum delay is left to the caller
+        assert (await client.get("https://api.example.com/submissions")).status_code == 429
+    assert len(requests) == 5
+    assert sleep.await_count == 3
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast_then_recovers():
+    clock = FakeClock()
+    circuit_breaker = CircuitBreaker("Example", 2, 60, clock=clock)
+    client, requests, _ = _client([httpx.ConnectError("refused"), httpx.ConnectError("refused"), httpx.Response(200)], circuit_breaker, max_retries=5)
+    async with client:
+        with pytest.raises(CircuitOpenError):
+            await client.get("https://api.example.com/submissions")
+        assert len(requests) == 2
+
+        clock.now = 61
+        assert (await client.get("https://api.example.com/submissions")).status_code == 200
+    assert not circuit_breaker.is_open
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_recovers_from_a_cancelled_trial_request():
+    clock = FakeClock()
+    circuit_breaker = CircuitBreaker("Example", 1, 60, clock=clock)
+    circuit_breaker.record_failure()
+    started = asyncio.Event()
+
+    async def handler(request):
+        if request.url.path == "/slow":
+            started.set()
+            await asyncio.sleep(60)
+        return httpx.Response(200)
+
+    transport = RetryTransport(httpx.MockTransport(handler), 3, 1, 60, circuit_breaker, sleep=AsyncMock())
+    async with httpx.AsyncClient(transport=transport) as client:
+        clock.now = 60
+        trial = asyncio.create_task(client.get("https://api.example.com/slow"))
+        await started.wait()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        # The cancelled trial neither closes nor re-opens the circuit, and the next request may be the trial
+        assert circuit_breaker.is_open
+        assert (await client.get("https://api.example.com/submissions")).status_code == 200
+    assert not circuit_breaker.is_open
+
+def test_circuit_breaker_lets_a_single_trial_request_through():
+    clock = FakeClock()
+    circuit_breaker = CircuitBreaker("Example", 1, 60, clock=clock)
+    circuit_breaker.record_failure()
+    assert not circuit_breaker.allow_request()
+
+    clock.now = 60
+    assert circuit_breaker.allow_request()
+    assert not circuit_breaker.allow_request()
+    circuit_breaker.record_failure()
+    assert circuit_breaker.is_open and not circuit_breaker.allow_request()
+
+def test_build_async_client_wraps_transport_with_retries():
+    http_settings = {
+        "http2": False,
+        "max_connections": 7,
+        "max_keepalive_connections": 3,
+        "keepalive_expiry": 15,
+        "timeout": 20,
+        "connect_timeout": 4,
+        "retry": {
+            "max_retries": 2,
+            "base_delay_seconds": 1,
+            "max_delay_seconds": 30,
+            "retry_all_methods": False,
+            "failure_threshold": 5,
+            "reset_timeout_seconds": 60,
+        },
+    }
+    client = build_async_client(http_settings, 'Example')
+    transport = client._transport
+    assert isinstance(transport, RetryTransport)
+    assert transport.max_retries == 2
+    assert transport.circuit_breaker.name == 'Example'
+    assert transport._transport._pool._max_connections == 7
@@ -0,0 +1,73 @@
+from bugbounty_gpt.in_scope import InScopeExecutor
+from bugbounty_gpt.submission_states import SubmissionStateCache
+from bugbounty_gpt.db.models import SubmissionState, ReportCategory, OutboxActionType
+from bugbounty_gpt.env import RESPONSE_CATEGORIES, DEFAULT_CATEGORY
+from unittest.mock import AsyncMock, MagicMock
+from types import SimpleNamespace
+import pytest, asyncio
+
+def _submission(submission_id, classification=RESPONSE_CATEGORIES[0]):
+    return SimpleNamespace(submission_id=submission_id, classification=ReportCategory[classification], reasoning="reasoning")
+
+def _api(states):
+    api = MagicMock()
+    api.in_flight = 0
+    api.max_in_flight = 0
+
+    async def fetch_submission(submission_id):
+        api.in_flight += 1
+        api.max_in_flight = max(api.max_in_flight, api.in_flight)
+        await asyncio.sleep(0.01)
+        api.in_flight -= 1
+        if states[submission_id] is None:
+            raise KeyError('data')
+        return {'data': {'attributes': {'state': states[submission_id]}}}
+
+    api.fetch_submission = AsyncMock(side_effect=fetch_submission)
+    return api
+
+@pytest.mark.asyncio
+async def test_executor_collects_state_updates_and_actions():
+    api = _api({'s1': 'new', 's2': 'triaged', 's3': 'new'})
+    executor = InScopeExecutor(api, 4)
+    await executor.run([_submission('s1'), _submission('s2'), _submission('s3', DEFAULT_CATEGORY)])
+
+    assert executor.state_updates[SubmissionState.UPDATED] == ['s1']
+    assert executor.state_updates[SubmissionState.UPDATED_OUT_OF_BAND] == ['s2']
+    # The comment is queued before the closure, with one idempotency key per action
+    assert [(action['action'], action['idempotency_key']) for action in executor.actions] == [
+        (OutboxActionType.COMMENT, 'comment:s1'),
+        (OutboxActionType.CLOSE, 'close:s1'),
+    ]
+    assert executor.failed == []
+
+@pytest.mark.asyncio
+async def test_executor_checks_submissions_concurrently():
+    submission_ids = [f"s{index}" for index in range(20)]
+    api = _api({submission_id: 'new' for submission_id in submission_ids})
+    executor = InScopeExecutor(api, 10)
+    await executor.run([_submission(submission_id) for submission_id in submission_ids])
+
+    assert sorted(executor.state_updates[SubmissionState.UPDATED]) == sorted(submission_ids)
+    assert api.max_in_flight == 10
+
+@pytest.mark.asyncio
+async def test_executor_isolates_failures():
+    api = _api({'s1': 'new', 'broken': None, 's2': 'new'})
+    executor = InScopeExecutor(api, 2)
+    await executor.run([_submission('s1'), _submission('broken'), _submission('s2')])
+
+    assert sorted(executor.state_updates[SubmissionState.UPDATED]) == ['s1', 's2']
+    assert executor.failed == ['broken']
+    assert {action['submission_id'] for action in executor.actions} == {'s1', 's2'}
+
+@pytest.mark.asyncio
+async def test_executor_reuses_cached_states():
+    api = _api({'s1': 'new', 's2': 'new'})
+    state_cache = SubmissionStateCache(10, 60)
+    state_cache.record('s1', True)
+    executor = InScopeExecutor(api, 2, state_cache)
+    await executor.run([_submission('s1'), _submission('s2')])
+
+    assert sorted(executor.state_updates[SubmissionState.UPDATED]) == ['s1', 's2']
+    api.fetch_submission.assert_awaited_once_with('s2')
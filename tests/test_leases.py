@@ -0,0 +1,32 @@
+from bugbounty_gpt.leases import LeaseHeartbeat
+from unittest.mock import AsyncMock
+import pytest, asyncio
+
+async def _pages(count):
+    for index in range(count):
+        await asyncio.sleep(0.02)
+        yield index
+
+@pytest.mark.asyncio
+async def test_heartbeat_renews_while_work_is_in_flight():
+    renew = AsyncMock(return_value=True)
+    async with LeaseHeartbeat("work", renew, 0.01) as heartbeat:
+        await asyncio.sleep(0.05)
+    renewals = renew.await_count
+
+    await asyncio.sleep(0.03)
+    assert renewals >= 2
+    # Renewals stop with the work
+    assert renew.await_count == renewals
+    assert heartbeat.renewals == renewals and not heartbeat.lost
+
+@pytest.mark.asyncio
+async def test_heartbeat_stops_the_work_once_the_lease_is_lost():
+    renew = AsyncMock(side_effect=[RuntimeError("database unavailable"), False])
+    async with LeaseHeartbeat("work", renew, 0.015) as heartbeat:
+        items = [item async for item in heartbeat.guard(_pages(10))]
+
+    # A failed renewal is retried; the lease is only lost when the renewal says so
+    assert heartbeat.lost
+    assert renew.await_count == 2
+    assert 0 < len(items) < 10
@@ -0,0 +1,168 @@
+from bugbounty_gpt.db import db_handler
+from bugbounty_gpt.db.models import Base, Submission, SubmissionState, ReportCategory, OutboxStatus
+from bugbounty_gpt.outbox import comment_action
+from bugbounty_gpt.env import RESPONSE_CATEGORIES
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import multiprocessing
+import asyncio
+import os
+import uuid
+import pytest
+
+# These tests need a disposable Postgres database, e.g. postgresql+asyncpg://postgres@localhost:5432/bugbounty_test
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+SUBMISSIONS = 200
+WORKERS = 4
+
+def _engine(schema):
+    return create_async_engine(TEST_DATABASE_URL, connect_args={'server_settings': {'search_path': schema}})
+
+async def _create_schema(schema):
+    engine = create_async_engine(TEST_DATABASE_URL)
+    async with engine.begin() as connection:
+        await connection.execute(text(f'CREATE SCHEMA "{schema}"'))
+    await engine.dispose()
+
+    engine = _engine(schema)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    created_at = datetime(2026, 1, 1)
+    async with sessionmaker(bind=engine, class_=AsyncSession)() as session:
+        session.add_all([
+            Submission(
+                submission_id=f"s{index:04d}",
+                classification=ReportCategory[RESPONSE_CATEGORIES[0]],
+                submission_state=SubmissionState.NEW,
+                created_at=created_at + timedelta(seconds=index),
+            )
+            for index in range(SUBMISSIONS)
+        ])
+        await session.commit()
+    await engine.dispose()
+
+async def _drop_schema(schema):
+    engine = create_async_engine(TEST_DATABASE_URL)
+    async with engine.begin() as connection:
+        await connection.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+    await engine.dispose()
+
+async def _work(schema, worker_id):
+    """
+    Leases and processes submissions the way process_in_scope_submissions does, until none is left.
+
+    :return: IDs of the submissions this worker processed.
+    """
+    engine = _engine(schema)
+    processed = []
+    async with sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        while True:
+            submissions = await db_handler.lease_submissions(session, [SubmissionState.NEW], RESPONSE_CATEGORIES, worker_id, 60, 7)
+            if not submissions:
+                break
+            submission_ids = [submission.submission_id for submission in submissions]
+            # Give the other workers time to lease while this batch is held
+            await asyncio.sleep(0.01)
+            await db_handler.update_submission_states(session, submission_ids, SubmissionState.UPDATED)
+            await db_handler.release_submission_leases(session, worker_id, submission_ids)
+            processed.extend(submission_ids)
+    await engine.dispose()
+    return processed
+
+def _run_worker(schema, worker_id):
+    return asyncio.run(_work(schema, worker_id))
+
+async def _lease_poll_cursor(schema, worker_id):
+    engine = _engine(schema)
+    async with sessionmaker(bind=engine, class_=AsyncSession)() as session:
+        leased = await db_handler.lease_poll_cursor(session, "new_submissions", worker_id, 60)
+    await engine.dispose()
+    return leased
+
+def _run_poll_cursor_lease(schema, worker_id):
+    return asyncio.run(_lease_poll_cursor(schema, worker_id))
+
+@pytest.fixture
+def schema():
+    schema = f"test_leasing_{uuid.uuid4().hex[:12]}"
+    asyncio.run(_create_schema(schema))
+    try:
+        yield schema
+    finally:
+        asyncio.run(_drop_schema(schema))
+
+def _in_processes(function, schema):
+    with ProcessPoolExecutor(WORKERS, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(function, schema, f"worker-{index}") for index in range(WORKERS)]
+        return [future.result() for future in futures]
+
+def test_workers_in_separate_processes_split_submissions(schema):
+    processed = _in_processes(_run_worker, schema)
+
+    claimed = [submission_id for submission_ids in processed for submission_id in submission_ids]
+    # Every submission is processed exactly once, and the work is actually shared
+    assert len(claimed) == SUBMISSIONS
+    assert set(claimed) == {f"s{index:04d}" for index in range(SUBMISSIONS)}
+    assert sum(1 for submission_ids in processed if submission_ids) > 1
+
+def test_single_worker_leases_the_poll_cursor(schema):
+    assert sorted(_in_processes(_run_poll_cursor_lease, schema)) == [False] * (WORKERS - 1) + [True]
+
+@pytest.mark.asyncio
+async def test_lapsed_leases_are_taken_over(schema):
+    engine = _engine(schema)
+    async with sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        leased = await db_handler.lease_submissions(session, [SubmissionState.NEW], RESPONSE_CATEGORIES, "crashed", 1, 10)
+        assert [submission.submission_id for submission in leased] == [f"s{index:04d}" for index in range(10)]
+        assert all(submission.leased_by == "crashed" for submission in leased)
+
+        # The oldest submissions are held, so the next worker gets the following ones
+        leased = await db_handler.lease_submissions(session, [SubmissionState.NEW], RESPONSE_CATEGORIES, "worker", 60, 10)
+        assert leased[0].submission_id == "s0010"
+
+        await asyncio.sleep(1.1)
+        leased = await db_handler.lease_submissions(session, [SubmissionState.NEW], RESPONSE_CATEGORIES, "worker", 60, 10)
+        assert [submission.submission_id for submission in leased] == [f"s{index:04d}" for index in range(10)]
+
+        # Releasing another worker's lease is a no-op
+        await db_handler.release_submission_leases(session, "crashed", ["s0000"])
+        leased = await db_handler.lease_submissions(session, [SubmissionState.NEW], RESPONSE_CATEGORIES, "other", 60, 1)
+        assert leased[0].submission_id == "s0020"
+
+        assert await db_handler.lease_poll_cursor(session, "new_submissions", "worker", 60)
+        assert await db_handler.lease_poll_cursor(session, "new_submissions", "worker", 60)
+        assert not await db_handler.lease_poll_cursor(session, "new_submissions", "other", 60)
+        await db_handler.release_poll_cursor_lease(session, "new_submissions", "worker")
+        assert await db_handler.lease_poll_cursor(session, "new_submissions", "other", 60)
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_lease_lapsing_mid_drain_hands_actions_over(schema):
+    engine = _engine(schema)
+    async with sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        await db_handler.enqueue_outbox_actions(session, [comment_action("s0000", "Hello!")])
+        [action] = await db_handler.fetch_pending_outbox_actions(session, ["s0000"])
+
+        [leased] = await db_handler.lease_submissions_with_pending_actions(session, "slow", 1, 10)
+        assert leased.submission_id == "s0000"
+        assert await db_handler.claim_outbox_action(session, action.id, "s0000", "slow", 1)
+
+        # The slow worker neither finished nor renewed in time, so another worker takes the submission over
+        await asyncio.sleep(1.1)
+        [leased] = await db_handler.lease_submissions_with_pending_actions(session, "other", 60, 10)
+        assert leased.submission_id == "s0000"
+        assert not await db_handler.claim_outbox_action(session, action.id, "s0000", "slow", 60)
+        assert await db_handler.renew_submission_leases(session, "slow", ["s0000"], 60) == set()
+        assert await db_handler.claim_outbox_action(session, action.id, "s0000", "other", 60)
+
+        # Once the action is done, nobody may perform it again
+        await db_handler.record_outbox_attempt(session, action.id, OutboxStatus.DONE, 1)
+        assert not await db_handler.claim_outbox_action(session, action.id, "s0000", "other", 60)
+        assert await db_handler.renew_submission_leases(session, "other", ["s0000"], 60) == {"s0000"}
+    await engine.dispose()
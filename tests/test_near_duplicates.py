@@ -0,0 +1,59 @@
+from bugbounty_gpt.near_duplicates import NearDuplicateIndex, minhash_signature, signature_similarity
+from unittest.mock import patch, AsyncMock
+import pytest
+
+REPORT = (
+    "The password reset endpoint at /api/v2/reset does not expire tokens after use. An attacker who obtains "
+    "an old reset link from browser history or a proxy log can reuse it to take over the account, even after "
+    "the victim has already changed their password. Steps to reproduce: request a reset, use the link, then "
+    "open the same link again and set a new password."
+)
+
+def test_minhash_signature_is_deterministic_and_normalized():
+    assert minhash_signature(REPORT, 64) == minhash_signature("  " + REPORT.upper() + "\n", 64)
+    assert len(minhash_signature(REPORT, 64)) == 64
+
+def test_signature_similarity_tracks_content_overlap():
+    signature = minhash_signature(REPORT, 64)
+    edited = minhash_signature(REPORT.replace("Steps to reproduce", "To reproduce"), 64)
+    unrelated = minhash_signature("Stored XSS in the profile bio field executes script for every visitor.", 64)
+
+    assert signature_similarity(signature, signature) == 1.0
+    assert signature_similarity(signature, edited) > 0.8
+    assert signature_similarity(signature, unrelated) < 0.2
+
+def test_index_finds_near_duplicate():
+    index = NearDuplicateIndex(threshold=0.8, num_perm=64, bands=16, max_entries=10)
+    index.add("submission1", index.signature(REPORT), "OUT_OF_SCOPE", "reason")
+
+    match = index.query(index.signature(REPORT + " Thanks!"))
+    assert match[:3] == ("submission1", "OUT_OF_SCOPE", "reason")
+    assert match[3] >= 0.8
+    assert index.query(index.signature("A completely different report about clickjacking on the login page.")) is None
+
+def test_index_evicts_oldest_entries():
+    index = NearDuplicateIndex(threshold=0.8, num_perm=64, bands=16, max_entries=1)
+    index.add("submission1", index.signature(REPORT), "OUT_OF_SCOPE", "reason")
+    index.add("submission2", index.signature("Stored XSS in the profile bio field."), "OUT_OF_SCOPE", "reason")
+
+    assert len(index) == 1
+    assert index.query(index.signature(REPORT)) is None
+
+def test_index_rejects_uneven_bands():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(threshold=0.8, num_perm=64, bands=7, max_entries=10)
+
+@pytest.mark.asyncio
+async def test_index_warm_loads_stored_signatures():
+    index = NearDuplicateIndex(threshold=0.8, num_perm=64, bands=16, max_entries=10)
+    rows = [
+        ("submission2", index.signature(REPORT).tobytes(), "OUT_OF_SCOPE", "reason"),
+        ("legacy", minhash_signature(REPORT, 32).tobytes(), "OUT_OF_SCOPE", "reason"),
+    ]
+    with patch("bugbounty_gpt.near_duplicates.db_handler.fetch_submission_signatures", new_callable=AsyncMock) as mock_fetch:
+        mock_fetch.return_value = rows
+        await index.warm(session=None, excluded_reasonings=["error"])
+        mock_fetch.assert_awaited_once_with(None, 10, ["error"])
+
+    assert len(index) == 1
+    assert index.query(index.signature(REPORT))[0] == "submission2"
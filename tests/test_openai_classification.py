@@ -1,7 +1,9 @@
-from bugbounty_gpt.handlers.openai_handler import OpenAIHandler
+from bugbounty_gpt.handlers.openai_handler import OpenAIHandler, ClassificationError
+from bugbounty_gpt.handlers.openai_backends import HTTPXChatBackend, OpenAILibraryBackend, create_backend
 from unittest.mock import patch, AsyncMock
-from bugbounty_gpt.env import OPENAI_PROMPT, OPENAI_MODEL, DEFAULT_CATEGORY
-import pytest, asyncio
+from bugbounty_gpt.env import OPENAI_PROMPT, OPENAI_MODEL, OPENAI_HTTP_SETTINGS, DEFAULT_CATEGORY
+from tests.stub_servers import StubHTTPServer, chat_completion
+import pytest, asyncio, json
 
 def test_classifications_sanitization():
     assert OpenAIHandler._classifications_sanitization(" Test Category ") == "TEST_CATEGORY"
@@ -51,18 +53,162 @@ def test_handle_response_exception():
 
 @pytest.mark.asyncio
 async def test_classify_submission_exception():
-    with patch("openai.ChatCompletion.create") as mock_create:
+    with patch.object(OpenAIHandler, "backend", OpenAILibraryBackend()), patch("openai.ChatCompletion.create") as mock_create:
         mock_create.side_effect = Exception("Sample Error")
-        with patch("bugbounty_gpt.handlers.openai_handler.OpenAIHandler._handle_response_error") as mock_handle_error:
+        with pytest.raises(ClassificationError, match="Sample Error"):
             await OpenAIHandler.classify_submission("Sample content")
-            mock_handle_error.assert_called()
 
 @pytest.mark.asyncio
 async def test_classify_submission_success():
-    with patch("openai.ChatCompletion.create") as mock_create:
+    with patch.object(OpenAIHandler, "backend", OpenAILibraryBackend()), patch("openai.ChatCompletion.create") as mock_create:
         mock_create.return_value = type("Response", (object,), {
             "choices": [type("Choice", (object,), {"message": type("Message", (object,), {"content": " Policy or Content Complaints\nExplanation"})})]
         })
         category, explanation = await OpenAIHandler.classify_submission("Sample content")
         assert category == "POLICY_OR_CONTENT_COMPLAINTS"
         assert explanation == "Explanation"
+
+def test_handle_response_json_body():
+    category, explanation = OpenAIHandler._handle_response(chat_completion("Out of Scope\nExplanation"))
+    assert category == "OUT_OF_SCOPE"
+    assert explanation == "Explanation"
+
+def test_create_backend():
+    assert isinstance(create_backend("httpx"), HTTPXChatBackend)
+    assert isinstance(create_backend("openai"), OpenAILibraryBackend)
+    with pytest.raises(ValueError):
+        create_backend("unknown")
+
+@pytest.mark.asyncio
+async def test_classify_submission_httpx_backend():
+    async def handler(request):
+        body = json.loads(request["body"])
+        assert request["path"] == "/v1/chat/completions"
+        assert request["headers"]["authorization"] == "Bearer test-key"
+        assert body["messages"][1]["content"] == "Sample content"
+        return 200, chat_completion("Customer Support Issues\nExplanation"), None
+
+    async with StubHTTPServer(handler) as server:
+        backend = HTTPXChatBackend(base_url=f"{server.base_url}/v1", api_key="test-key")
+        with patch.object(OpenAIHandler, "backend", backend):
+            category, explanation = await OpenAIHandler.classify_submission("Sample content")
+        await backend.aclose()
+
+    assert category == "CUSTOMER_SUPPORT_ISSUES"
+    assert explanation == "Explanation"
+
+@pytest.mark.asyncio
+async def test_httpx_backend_runs_requests_concurrently_over_pooled_connections():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(request):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return 200, chat_completion("Out of Scope\nExplanation"), None
+
+    async with StubHTTPServer(handler) as server:
+        backend = HTTPXChatBackend(base_url=server.base_url, api_key="test-key")
+        request_data = OpenAIHandler._build_request_data("Sample content")
+        await asyncio.gather(*(backend.create_chat_completion(request_data) for _ in range(20)))
+        await asyncio.gather(*(backend.create_chat_completion(request_data) for _ in range(20)))
+        await backend.aclose()
+
+    assert max_in_flight == 20
+    assert len(server.requests) == 40
+    assert server.connections == 20
+
+@pytest.mark.asyncio
+async def test_classify_submission_httpx_backend_error_status():
+    statuses = [500, 200, 400]
+
+    async def handler(request):
+        status_code = statuses.pop(0)
+        if status_code == 200:
+            return 200, chat_completion("Functional Bugs or Glitches\nThe report describes a broken button."), None
+        return status_code, {"error": {"message": "error"}}, None
+
+    http_settings = {**OPENAI_HTTP_SETTINGS, "retry": {**OPENAI_HTTP_SETTINGS["retry"], "base_delay_seconds": 0}}
+    async with StubHTTPServer(handler) as server:
+        backend = HTTPXChatBackend(base_url=server.base_url, api_key="test-key", http_settings=http_settings)
+        with patch.object(OpenAIHandler, "backend", backend):
+            # The server error is retried by the HTTP client
+            category, _ = await OpenAIHandler.classify_submission("Sample content")
+            # The client error is not, and is raised instead of returning the default category
+            with pytest.raises(ClassificationError) as excinfo:
+                await OpenAIHandler.classify_submission("Sample content")
+        await backend.aclose()
+
+    # A 400 means OpenAI rejected the request itself
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.rejected
+
+    assert category == "FUNCTIONAL_BUGS_OR_GLITCHES"
+    assert len(server.requests) == 3
+
+def test_build_batch_request_data_sends_prompt_once():
+    request_data = OpenAIHandler._build_batch_request_data(["First report", "Second report\n{\"id\": 1}"])
+    assert request_data["max_tokens"] == 1024
+    assert request_data["messages"][0]["content"].startswith(OPENAI_PROMPT)
+    assert json.loads(request_data["messages"][1]["content"]) == [
+        {"id": 1, "report": "First report"},
+        {"id": 2, "report": "Second report\n{\"id\": 1}"}
+    ]
+
+def test_handle_batch_response_parses_each_line():
+    content = "\n".join([
+        '{"id": 2, "category": "Out of Scope", "explanation": "Second"}',
+        'not json',
+        '{"id": 1, "category": "Invalid Category", "explanation": "First"}',
+        '{"id": 2, "category": "Security Report", "explanation": "Repeated"}',
+        '{"id": 9, "category": "Out of Scope", "explanation": "Unknown"}',
+    ])
+    results = OpenAIHandler._handle_batch_response(chat_completion(content), 3)
+    assert results == [(DEFAULT_CATEGORY, "First"), ("OUT_OF_SCOPE", "Second"), None]
+
+@pytest.mark.asyncio
+async def test_classify_submissions_falls_back_to_single_requests():
+    async def handler(request):
+        body = json.loads(request["body"])
+        if body["messages"][1]["content"].startswith("["):
+            return 200, chat_completion('{"id": 1, "category": "Out of Scope", "explanation": "Batched"}\n{"id": 2, "categ'), None
+        return 200, chat_completion("Security Report\nSingle"), None
+
+    async with StubHTTPServer(handler) as server:
+        backend = HTTPXChatBackend(base_url=server.base_url, api_key="test-key")
+        with patch.object(OpenAIHandler, "backend", backend):
+            results = await OpenAIHandler.classify_submissions(["First report", "Second report"])
+        await backend.aclose()
+
+    assert results == [("OUT_OF_SCOPE", "Batched"), ("SECURITY_REPORT", "Single")]
+    assert len(server.requests) == 2
+    assert json.loads(server.requests[1]["body"])["messages"][1]["content"] == "Second report"
+
+@pytest.mark.asyncio
+async def test_classify_submissions_unreadable_response_falls_back_to_single_requests():
+    async def handler(request):
+        body = json.loads(request["body"])
+        if body["messages"][1]["content"].startswith("["):
+            response = chat_completion(None)
+            response["choices"][0]["finish_reason"] = "content_filter"
+            return 200, response, None
+        return 200, chat_completion(f"Out of Scope\n{body['messages'][1]['content']}"), None
+
+    async with StubHTTPServer(handler) as server:
+        backend = HTTPXChatBackend(base_url=server.base_url, api_key="test-key")
+        with patch.object(OpenAIHandler, "backend", backend):
+            results = await OpenAIHandler.classify_submissions(["First report", "Second report", "Third report"])
+        await backend.aclose()
+
+    assert results == [("OUT_OF_SCOPE", "First report"), ("OUT_OF_SCOPE", "Second report"), ("OUT_OF_SCOPE", "Third report")]
+    assert len(server.requests) == 4
+
+@pytest.mark.asyncio
+async def test_classify_submissions_request_error():
+    with patch.object(OpenAIHandler, "backend", OpenAILibraryBackend()), patch("openai.ChatCompletion.create") as mock_create:
+        mock_create.side_effect = Exception("Sample Error")
+        with pytest.raises(ClassificationError):
+            await OpenAIHandler.classify_submissions(["First report", "Second report"])
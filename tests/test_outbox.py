@@ -0,0 +1,169 @@
+from bugbounty_gpt.outbox import OutboxWorker, comment_action, close_action, assign_action, is_retryable
+from bugbounty_gpt.handlers.submission_handler import SubmissionActionError
+from bugbounty_gpt.submission_states import SubmissionStateCache
+from bugbounty_gpt.db.models import OutboxActionType, OutboxStatus
+from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import asyncio
+import httpx
+import pytest
+
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+def _action(action_id, data, attempts=0, next_attempt_at=NOW):
+    return SimpleNamespace(id=action_id, attempts=attempts, next_attempt_at=next_attempt_at, **{key: value for key, value in data.items() if key != 'idempotency_key'})
+
+def _api(comment_status=201, close_status=200, state='new'):
+    api = MagicMock()
+    api.fetch_submission = AsyncMock(return_value={'data': {'attributes': {'state': state}}})
+    api.create_comment = AsyncMock(return_value=httpx.Response(comment_status))
+    api.patch_submission = AsyncMock(return_value=httpx.Response(close_status))
+    return api
+
+def _worker(state_cache=None):
+    return OutboxWorker(4, 3, 30, 3600, 100, "worker-1", 300, 60, state_cache, clock=lambda: NOW)
+
+async def _drain(worker, api, actions, lost_submission_ids=()):
+    recorded = []
+
+    async def claim_outbox_action(session, action_id, submission_id, worker_id, lease_seconds):
+        return submission_id not in lost_submission_ids
+
+    async def record_outbox_attempt(session, action_id, status, attempts, next_attempt_at=None, last_error=None):
+        recorded.append((action_id, status, attempts, next_attempt_at))
+
+    submissions = [SimpleNamespace(submission_id=submission_id) for submission_id in dict.fromkeys(action.submission_id for action in actions)]
+    with patch("bugbounty_gpt.outbox.db_handler.lease_submissions_with_pending_actions", new_callable=AsyncMock, return_value=submissions), \
+         patch("bugbounty_gpt.outbox.db_handler.fetch_pending_outbox_actions", new_callable=AsyncMock, return_value=actions) as fetch, \
+         patch("bugbounty_gpt.outbox.db_handler.release_submission_leases", new_callable=AsyncMock) as release, \
+         patch("bugbounty_gpt.outbox.db_handler.claim_outbox_action", side_effect=claim_outbox_action), \
+         patch("bugbounty_gpt.outbox.db_handler.record_outbox_attempt", side_effect=record_outbox_attempt):
+        await worker.drain(AsyncMock(), api)
+    # Only the actions of the leased submissions are performed, and the leases are released afterwards
+    leased_ids = [submission.submission_id for submission in submissions]
+    assert fetch.await_args.args[1] == leased_ids
+    assert release.await_args.args[1:] == ("worker-1", leased_ids)
+    return sorted(recorded, key=lambda entry: entry[0])
+
+def test_actions_have_idempotency_keys():
+    assert comment_action("s1", "Hello!")['idempotency_key'] == "comment:s1"
+    assert close_action("s1")['action'] == OutboxActionType.CLOSE
+    assert assign_action("s1", "u1")['payload'] == {'user_id': "u1"}
+
+def test_is_retryable():
+    assert is_retryable(httpx.ConnectError("unreachable"))
+    assert is_retryable(SubmissionActionError("throttled", 429))
+    assert is_retryable(SubmissionActionError("unavailable", 503))
+    assert not is_retryable(SubmissionActionError("invalid", 422))
+
+@pytest.mark.asyncio
+async def test_drain_performs_actions_in_order():
+    api = _api()
+    recorded = await _drain(_worker(), api, [_action(1, comment_action("s1", "Hello!")), _action(2, close_action("s1"))])
+
+    assert recorded == [(1, OutboxStatus.DONE, 1, None), (2, OutboxStatus.DONE, 1, None)]
+    assert api.create_comment.await_args.args[0]['data']['attributes']['body'] == "Hello!"
+    assert api.patch_submission.await_args.args[1]['data']['attributes']['state'] == 'not_applicable'
+
+@pytest.mark.asyncio
+async def test_drain_retries_with_backoff_and_stops_the_submission():
+    api = _api(comment_status=503)
+    worker = _worker()
+    actions = [
+        _action(1, comment_action("s1", "Hello!"), attempts=1),
+        _action(2, close_action("s1")),
+        _action(3, comment_action("s2", "Hello!")),
+    ]
+    with patch.object(api, 'create_comment', AsyncMock(side_effect=[httpx.Response(503), httpx.Response(201)])):
+        recorded = await _drain(worker, api, actions)
+
+    # The second failure of s1 waits twice the base delay, and its closure waits for the comment
+    assert recorded[0] == (1, OutboxStatus.PENDING, 2, NOW + timedelta(seconds=60))
+    assert recorded[1:] == [(3, OutboxStatus.DONE, 1, None)]
+    assert (worker.done, worker.retried, worker.dead) == (1, 1, 0)
+
+@pytest.mark.asyncio
+async def test_drain_dead_letters_rejected_and_exhausted_actions():
+    worker = _worker()
+    actions = [
+        _action(1, close_action("s1")),
+        _action(2, close_action("s2"), attempts=2),
+        _action(3, close_action("s3"), next_attempt_at=NOW + timedelta(minutes=1)),
+    ]
+    api = _api()
+    api.patch_submission = AsyncMock(side_effect=[httpx.Response(422), httpx.Response(500)])
+    recorded = await _drain(worker, api, actions)
+
+    assert [entry[:3] for entry in recorded] == [(1, OutboxStatus.DEAD, 1), (2, OutboxStatus.DEAD, 3)]
+    assert worker.dead == 2
+    assert api.patch_submission.await_count == 2
+
+@pytest.mark.asyncio
+async def test_drain_drops_retried_actions_of_triaged_submissions():
+    api = _api(state='triaged')
+    worker = _worker()
+    actions = [
+        _action(1, comment_action("s1", "Hello!"), attempts=1),
+        _action(2, close_action("s1")),
+        _action(3, comment_action("s2", "Hello!")),
+    ]
+    recorded = await _drain(worker, api, actions)
+
+    # s1 was triaged while its comment waited for a retry; the first attempt of s2 is not checked again
+    assert recorded == [(1, OutboxStatus.DEAD, 2, None), (3, OutboxStatus.DONE, 1, None)]
+    api.fetch_submission.assert_awaited_once_with("s1")
+    api.create_comment.assert_awaited_once()
+    api.patch_submission.assert_not_awaited()
+    assert (worker.done, worker.dead, worker.superseded) == (1, 0, 1)
+
+@pytest.mark.asyncio
+async def test_drain_checks_retried_actions_against_cached_states():
+    state_cache = SubmissionStateCache(10, 60)
+    state_cache.record("s1", True)
+    api = _api()
+    worker = _worker(state_cache)
+    recorded = await _drain(worker, api, [_action(1, close_action("s1"), attempts=1), _action(2, close_action("s2"), attempts=1)])
+
+    assert [entry[:2] for entry in recorded] == [(1, OutboxStatus.DONE), (2, OutboxStatus.DONE)]
+    # Only the submission missing from the cache is fetched, and its state is cached
+    api.fetch_submission.assert_awaited_once_with("s2")
+    assert state_cache.is_new("s2") is True
+
+@pytest.mark.asyncio
+async def test_drain_stops_a_submission_whose_lease_lapsed():
+    api = _api()
+    worker = _worker()
+    actions = [
+        _action(1, comment_action("s1", "Hello!")),
+        _action(2, close_action("s1")),
+        _action(3, comment_action("s2", "Hello!")),
+    ]
+    # Another worker took s1 over after its lease lapsed mid-drain
+    recorded = await _drain(worker, api, actions, lost_submission_ids={"s1"})
+
+    assert recorded == [(3, OutboxStatus.DONE, 1, None)]
+    api.create_comment.assert_awaited_once()
+    api.patch_submission.assert_not_awaited()
+    assert worker.lost_leases == 1
+
+@pytest.mark.asyncio
+async def test_drain_renews_leases_while_actions_are_performed():
+    worker = OutboxWorker(4, 3, 30, 3600, 100, "worker-1", 0.03, 60, clock=lambda: NOW)
+    api = _api()
+
+    async def slow_comment(data):
+        await asyncio.sleep(0.05)
+        return httpx.Response(201)
+
+    api.create_comment = AsyncMock(side_effect=slow_comment)
+    with patch("bugbounty_gpt.outbox.db_handler.renew_submission_leases", new_callable=AsyncMock, return_value={"s1"}) as renew:
+        await _drain(worker, api, [_action(1, comment_action("s1", "Hello!"))])
+    assert renew.await_count >= 1
+    assert renew.await_args.args[1:] == ("worker-1", ["s1"], 0.03)
+
+def test_batch_fits_in_the_lease():
+    # 300 seconds at 60 requests per minute leave time for 50 submissions in half the lease
+    assert _worker().batch_size == 50
+    assert OutboxWorker(4, 3, 30, 3600, 20, "worker-1", 300, 60).batch_size == 20
+    assert OutboxWorker(4, 3, 30, 3600, 20, "worker-1", 1, 1).batch_size == 1
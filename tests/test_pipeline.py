@@ -0,0 +1,77 @@
+from bugbounty_gpt.pipeline import bounded_map
+import asyncio
+import pytest
+
+async def _collect(async_iterator):
+    return [item async for item in async_iterator]
+
+@pytest.mark.asyncio
+async def test_bounded_map_returns_all_results():
+    async def double(item):
+        await asyncio.sleep(0)
+        return item * 2
+
+    results = await _collect(bounded_map(double, range(20), 4))
+    assert sorted(results) == [item * 2 for item in range(20)]
+
+@pytest.mark.asyncio
+async def test_bounded_map_limits_concurrency():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def worker(item):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return item
+
+    await _collect(bounded_map(worker, range(30), 5))
+    assert max_in_flight == 5
+
+@pytest.mark.asyncio
+async def test_bounded_map_yields_in_completion_order():
+    async def worker(delay):
+        await asyncio.sleep(delay)
+        return delay
+
+    results = await _collect(bounded_map(worker, [0.05, 0.01, 0.03], 3))
+    assert results == [0.01, 0.03, 0.05]
+
+@pytest.mark.asyncio
+async def test_bounded_map_accepts_async_iterables():
+    async def items():
+        for item in range(5):
+            yield item
+
+    async def identity(item):
+        return item
+
+    results = await _collect(bounded_map(identity, items(), 2))
+    assert sorted(results) == list(range(5))
+
+@pytest.mark.asyncio
+async def test_bounded_map_propagates_errors_and_cancels_pending():
+    cancelled = []
+
+    async def worker(item):
+        if item == 0:
+            raise RuntimeError("boom")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+
+    with pytest.raises(RuntimeError):
+        await _collect(bounded_map(worker, range(3), 3))
+    assert sorted(cancelled) == [1, 2]
+
+@pytest.mark.asyncio
+async def test_bounded_map_rejects_invalid_concurrency():
+    async def identity(item):
+        return item
+
+    with pytest.raises(ValueError):
+        await _collect(bounded_map(identity, [1], 0))
@@ -0,0 +1,112 @@
+from bugbounty_gpt.polling import AdaptivePollScheduler, IncrementalPoller
+from unittest.mock import patch, AsyncMock, MagicMock
+from datetime import datetime, timedelta, timezone
+import pytest
+
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+def _submission(submission_id, submitted_at):
+    return {"id": submission_id, "attributes": {"submitted_at": submitted_at}}
+
+def _cursor(submitted_at, last_full_sweep_at):
+    return MagicMock(submitted_at=submitted_at, submission_id="s1", last_full_sweep_at=last_full_sweep_at)
+
+class FakeBugCrowdAPI:
+    def __init__(self, pages):
+        self.pages = pages
+        self.since = None
+        self.full_listings = 0
+
+    async def iter_submission_pages(self, params):
+        self.full_listings += 1
+        for page in self.pages:
+            yield page
+
+    async def iter_submission_pages_since(self, params, submitted_since):
+        self.since = submitted_since
+        for page in self.pages:
+            yield page
+
+async def _poll(poller, api, cursor, advance=True):
+    with patch("bugbounty_gpt.polling.db_handler.fetch_poll_cursor", new_callable=AsyncMock, return_value=cursor), \
+         patch("bugbounty_gpt.polling.db_handler.save_poll_cursor", new_callable=AsyncMock) as mock_save:
+        pages = [page async for page in poller.pages(None, api, {})]
+        await poller.save(None, advance)
+    return pages, mock_save
+
+@pytest.mark.asyncio
+async def test_poller_full_sweep_without_cursor():
+    api = FakeBugCrowdAPI([[_submission("s1", "2026-10-17T10:00:00Z"), _submission("s2", "2026-10-17T11:00:00Z")]])
+    poller = IncrementalPoller("new_submissions", 3600, clock=lambda: NOW)
+    pages, mock_save = await _poll(poller, api, None)
+
+    assert poller.full_sweep
+    assert api.full_listings == 1
+    assert len(pages[0]) == 2
+    mock_save.assert_awaited_once_with(None, "new_submissions", datetime(2026, 10, 17, 11, 0, tzinfo=timezone.utc), "s2", NOW)
+
+@pytest.mark.asyncio
+async def test_poller_lists_only_since_cursor():
+    cursor_at = datetime(2026, 10, 17, 10, 0, tzinfo=timezone.utc)
+    last_sweep_at = NOW - timedelta(minutes=10)
+    api = FakeBugCrowdAPI([[_submission("s3", "2026-10-17T11:30:00+00:00"), _submission("s4", None)]])
+    poller = IncrementalPoller("new_submissions", 3600, clock=lambda: NOW)
+    _, mock_save = await _poll(poller, api, _cursor(cursor_at, last_sweep_at))
+
+    assert not poller.full_sweep
+    assert api.full_listings == 0
+    assert api.since == cursor_at
+    mock_save.assert_awaited_once_with(None, "new_submissions", datetime(2026, 10, 17, 11, 30, tzinfo=timezone.utc), "s3", last_sweep_at)
+
+@pytest.mark.asyncio
+async def test_poller_keeps_cursor_when_nothing_is_newer():
+    cursor_at = datetime(2026, 10, 17, 10, 0, tzinfo=timezone.utc)
+    poller = IncrementalPoller("new_submissions", 3600, clock=lambda: NOW)
+    _, mock_save = await _poll(poller, FakeBugCrowdAPI([]), _cursor(cursor_at, NOW - timedelta(minutes=10)))
+    assert mock_save.await_args.args[2:4] == (cursor_at, "s1")
+
+@pytest.mark.asyncio
+async def test_poller_periodic_full_sweep():
+    api = FakeBugCrowdAPI([])
+    poller = IncrementalPoller("new_submissions", 3600, clock=lambda: NOW)
+    _, mock_save = await _poll(poller, api, _cursor(NOW - timedelta(days=1), NOW - timedelta(hours=1)))
+
+    assert poller.full_sweep
+    assert api.full_listings == 1
+    assert mock_save.await_args.args[4] == NOW
+
+@pytest.mark.asyncio
+async def test_poller_records_full_sweep_without_advancing_past_failures():
+    cursor_at = datetime(2026, 10, 17, 10, 0, tzinfo=timezone.utc)
+    api = FakeBugCrowdAPI([[_submission("s3", "2026-10-17T11:30:00+00:00")]])
+    poller = IncrementalPoller("new_submissions", 3600, clock=lambda: NOW)
+    _, mock_save = await _poll(poller, api, _cursor(cursor_at, NOW - timedelta(hours=2)), advance=False)
+
+    # The failed submissions are listed again by the next poll, which is not a full sweep
+    assert poller.full_sweep
+    mock_save.assert_awaited_once_with(None, "new_submissions", cursor_at, "s1", NOW)
+
+def test_scheduler_backs_off_when_idle_and_resets_on_arrivals():
+    scheduler = AdaptivePollScheduler(15, 100, 2)
+    assert [scheduler.next_interval(0) for _ in range(4)] == [30, 60, 100, 100]
+    assert scheduler.next_interval(3) == 15
+    assert scheduler.next_interval(0) == 30
+
+def test_scheduler_honors_retry_after():
+    scheduler = AdaptivePollScheduler(15, 100, 2)
+    assert scheduler.next_interval(5, retry_after=0) == 30
+    assert scheduler.next_interval(5, retry_after=300) == 300
+    assert scheduler.next_interval(5) == 15
+
+def test_scheduler_summary():
+    scheduler = AdaptivePollScheduler(10, 40, 2)
+    assert scheduler.summary() == "no polls yet"
+    scheduler.next_interval(0)
+    scheduler.next_interval(0)
+    assert scheduler.summary() == "min 20s, avg 30s, max 40s over the last 2 polls"
+
+def test_scheduler_rejects_invalid_bounds():
+    with pytest.raises(ValueError):
+        AdaptivePollScheduler(60, 30, 2)
+    with pytest.raises(ValueError):
+        AdaptivePollScheduler(10, 30, 0.5)
@@ -0,0 +1,46 @@
+from bugbounty_gpt.preprocessing import DescriptionPreprocessor, count_tokens
+import base64
+
+def test_count_tokens():
+    assert count_tokens("") == 0
+    assert count_tokens("The cookie is not HttpOnly.") == 7
+    assert count_tokens("1234567") == 3
+    # Encoded data costs far more than the same number of characters of prose
+    assert count_tokens("aGVsbG8gd29ybGQhIQ==" * 10) > count_tokens("hello world " * 16)
+
+def test_preprocess_replaces_blobs():
+    preprocessor = DescriptionPreprocessor(max_tokens=1000, min_blob_characters=100)
+    encoded = base64.encodebytes(bytes(range(256)) * 4).decode()
+    description = f"Upload this file:\n{encoded}Then open it. Key: {'ab' * 64}."
+
+    assert preprocessor.preprocess(description) == (
+        "Upload this file:\n[base64 data, 1385 characters removed]\n"
+        "Then open it. Key: [hexadecimal data, 128 characters removed]."
+    )
+    assert preprocessor.tokens_saved > 0
+
+def test_preprocess_keeps_short_tokens():
+    preprocessor = DescriptionPreprocessor(max_tokens=1000, min_blob_characters=100)
+    description = "Session token abc123DEF456 is reused, see /api/v1/session/refresh."
+    assert preprocessor.preprocess(description) == description
+    assert preprocessor.tokens_saved == 0
+
+def test_preprocess_collapses_repeated_lines():
+    preprocessor = DescriptionPreprocessor(max_tokens=1000, min_blob_characters=100)
+    description = "Log:\n" + "ERROR timeout\n" * 50 + "done"
+    assert preprocessor.preprocess(description) == "Log:\nERROR timeout\n[previous line repeated 49 more times]\ndone"
+
+def test_preprocess_truncates_to_budget():
+    preprocessor = DescriptionPreprocessor(max_tokens=200, min_blob_characters=100)
+    description = "Summary: SSRF in the importer.\n" + "filler text " * 1000 + "\nImpact: internal network access."
+
+    condensed = preprocessor.preprocess(description)
+    assert count_tokens(condensed) <= 200
+    assert condensed.startswith("Summary: SSRF in the importer.")
+    assert condensed.endswith("Impact: internal network access.")
+    assert "characters truncated" in condensed
+    assert preprocessor.truncated == 1
+    assert preprocessor.tokens_out == count_tokens(condensed)
+
+def test_preprocess_empty_description():
+    assert DescriptionPreprocessor(max_tokens=10, min_blob_characters=100).preprocess(None) == ""
@@ -0,0 +1,63 @@
+from bugbounty_gpt.handlers.rate_limiter import TokenBucket, RateLimiter, get_rate_limiter
+from tests.stub_servers import FakeClock
+from unittest.mock import patch, AsyncMock
+import pytest
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+def test_token_bucket_reserve_within_capacity():
+    bucket = TokenBucket(60, clock=FakeClock())
+    for _ in range(60):
+        assert bucket.reserve() == 0
+
+def test_token_bucket_reserve_deficit_queues_callers():
+    bucket = TokenBucket(60, capacity=1, clock=FakeClock())
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(1.0)
+    assert bucket.reserve() == pytest.approx(2.0)
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(60, capacity=2, clock=clock)
+    bucket.reserve(2)
+    clock.now = 1.0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(1.0)
+
+def test_token_bucket_caps_oversized_requests():
+    bucket = TokenBucket(600, capacity=10, clock=FakeClock())
+    assert bucket.reserve(1000) == 0
+    assert bucket.reserve(10) == pytest.approx(1.0)
+
+@pytest.mark.asyncio
+async def test_token_bucket_acquire_sleeps_without_blocking():
+    bucket = TokenBucket(60, capacity=1, clock=FakeClock())
+    with patch("bugbounty_gpt.handlers.rate_limiter.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        await bucket.acquire()
+        mock_sleep.assert_not_called()
+        await bucket.acquire()
+        mock_sleep.assert_awaited_once_with(pytest.approx(1.0))
+
+@pytest.mark.asyncio
+async def test_rate_limiter_waits_for_slowest_bucket():
+    limiter = RateLimiter("test", requests_per_minute=60, tokens_per_minute=600)
+    with patch("bugbounty_gpt.handlers.rate_limiter.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        await limiter.acquire(tokens=600)
+        mock_sleep.assert_not_called()
+        await limiter.acquire(tokens=300)
+        mock_sleep.assert_awaited_once()
+        assert mock_sleep.await_args.args[0] == pytest.approx(30.0, abs=0.1)
+
+@pytest.mark.asyncio
+async def test_rate_limiter_without_limits_never_waits():
+    limiter = RateLimiter("test")
+    with patch("bugbounty_gpt.handlers.rate_limiter.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        for _ in range(100):
+            await limiter.acquire(tokens=10000)
+        mock_sleep.assert_not_called()
+
+def test_get_rate_limiter_is_shared():
+    assert get_rate_limiter("openai") is get_rate_limiter("openai")
+    assert get_rate_limiter("openai") is not get_rate_limiter("bugcrowd")
@@ -0,0 +1,46 @@
+from bugbounty_gpt.rejections import RejectionTracker
+from bugbounty_gpt.handlers.openai_handler import OpenAIHandler, ClassificationError
+from unittest.mock import AsyncMock, patch
+import httpx
+import pytest
+
+def _rejected_backend():
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(400, request=request, json={"error": {"message": "This model's maximum context length is 8192 tokens."}})
+    return AsyncMock(create_chat_completion=AsyncMock(side_effect=httpx.HTTPStatusError("Bad Request", request=request, response=response)))
+
+@pytest.mark.asyncio
+async def test_submission_rejected_on_two_cycles_is_given_up():
+    tracker = RejectionTracker(2)
+    with patch.object(OpenAIHandler, "backend", _rejected_backend()):
+        outcomes = []
+        for _ in range(2):
+            with pytest.raises(ClassificationError) as excinfo:
+                await OpenAIHandler.classify_submission("A report the model rejects")
+            assert excinfo.value.rejected
+            outcomes.append(tracker.record("s1"))
+
+    # Left for the next cycle the first time, given up on the second
+    assert outcomes == [False, True]
+    assert tracker.given_up == 1
+    assert len(tracker) == 0
+
+def test_transient_failures_are_not_rejections():
+    assert not ClassificationError("Service Unavailable", 503).rejected
+    assert not ClassificationError("Too Many Requests", 429).rejected
+    assert not ClassificationError("Unauthorized", 401).rejected
+    assert not ClassificationError("Connection refused").rejected
+
+def test_tracker_is_bounded():
+    tracker = RejectionTracker(3, max_size=2)
+    for submission_id in ("s1", "s2", "s3"):
+        assert not tracker.record(submission_id)
+    assert len(tracker) == 2
+    # s1 was evicted, so its count starts over
+    assert not tracker.record("s1")
+    assert not tracker.record("s3")
+    assert tracker.record("s3")
+
+def test_tracker_rejects_invalid_maximum():
+    with pytest.raises(ValueError):
+        RejectionTracker(0)
@@ -0,0 +1,51 @@
+from bugbounty_gpt.rule_engine import RuleEngine
+from bugbounty_gpt.env import RULES
+import pytest
+import time
+
+RULE_SET = [
+    {"name": "Empty", "category": "Out of Scope", "reasoning": "Empty.", "patterns": ["\\A\\s*\\Z"]},
+    {"name": "Scanner", "category": "Out of Scope", "reasoning": "Scanner.", "keywords": ["Generated by (scanner)"]},
+    {"name": "Support", "category": "Customer Support Issues", "reasoning": "Support.", "patterns": ["reset (?:my|the) password"]},
+]
+
+def test_rule_engine_classifies_matching_content():
+    engine = RuleEngine(RULE_SET)
+    assert engine.classify(None) == ("OUT_OF_SCOPE", "Empty.")
+    assert engine.classify(" \n ") == ("OUT_OF_SCOPE", "Empty.")
+    assert engine.classify("Findings. GENERATED BY (SCANNER) v1") == ("OUT_OF_SCOPE", "Scanner.")
+    assert engine.classify("Please reset my password") == ("CUSTOMER_SUPPORT_ISSUES", "Support.")
+    assert engine.classify("Stored XSS in the profile page") is None
+    assert engine.matches == {"Empty": 2, "Scanner": 1, "Support": 1}
+    assert engine.reasonings == ["Empty.", "Scanner.", "Support."]
+
+def test_rule_engine_leftmost_match_wins():
+    engine = RuleEngine(RULE_SET)
+    assert engine.classify("Reset the password. Generated by (scanner)") == ("CUSTOMER_SUPPORT_ISSUES", "Support.")
+
+def test_rule_engine_without_rules():
+    assert RuleEngine([]).classify("") is None
+
+def test_rule_engine_rejects_invalid_pattern():
+    with pytest.raises(ValueError, match="Broken"):
+        RuleEngine([{"name": "Broken", "category": "Out of Scope", "reasoning": "Broken.", "patterns": ["(unclosed"]}])
+
+def test_configured_rules():
+    engine = RuleEngine(RULES)
+    assert engine.classify("")[0] == "OUT_OF_SCOPE"
+    assert engine.classify("Clickjacking on the pricing page, which has no sensitive actions.")[0] == "OUT_OF_SCOPE"
+    assert engine.classify("The login page is missing security headers.")[0] == "OUT_OF_SCOPE"
+    assert engine.classify("Stored XSS in the profile bio. Missing security headers let the payload run.") is None
+    assert engine.classify("https://help.example.com/a\n https://SUPPORT.example.com/b ")[0] == "CUSTOMER_SUPPORT_ISSUES"
+    assert engine.classify("https://help.example.com/a but the login page is vulnerable") is None
+
+@pytest.mark.parametrize("content", [
+    "https://help" * 25 + " x",
+    "https://helphelp " * 40 + "x",
+    "https://support.example.com/" * 500 + "\n" + "a" * 1000,
+])
+def test_configured_rules_resist_catastrophic_backtracking(content):
+    engine = RuleEngine(RULES)
+    started = time.perf_counter()
+    engine.classify(content)
+    assert time.perf_counter() - started < 0.5
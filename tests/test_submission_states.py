@@ -0,0 +1,50 @@
+from bugbounty_gpt.submission_states import SubmissionStateCache
+from tests.stub_servers import FakeClock
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+
+def _submission(submission_id, state):
+    return {"id": submission_id, "attributes": {"state": state}}
+
+def test_state_cache_expires_states():
+    clock = FakeClock()
+    cache = SubmissionStateCache(10, 60, clock=clock)
+    cache.record_listing([_submission("s1", "new"), _submission("s2", "Triaged")])
+
+    assert cache.is_new("s1") is True
+    assert cache.is_new("s2") is False
+    assert cache.is_new("s3") is None
+    clock.now = 61
+    assert cache.is_new("s1") is None
+    assert (cache.hits, cache.misses) == (2, 2)
+
+def test_state_cache_evicts_oldest_states():
+    cache = SubmissionStateCache(2, 60)
+    for submission_id in ("s1", "s2", "s3"):
+        cache.record(submission_id, True)
+
+    assert len(cache) == 2
+    assert cache.is_new("s1") is None
+
+@pytest.mark.asyncio
+async def test_refresh_checks_stale_states_with_one_listing():
+    cache = SubmissionStateCache(10, 60)
+    cache.record("s1", True)
+    api = MagicMock()
+    api.fetch_submissions_within = AsyncMock(return_value=[_submission("s2", "new"), _submission("s4", "new")])
+
+    await cache.refresh(api, {"filter[state]": "new"}, ["s1", "s2", "s3"])
+
+    api.fetch_submissions_within.assert_awaited_once_with({"filter[state]": "new"}, max_pages=2)
+    assert cache.is_new("s2") is True
+    # Missing from the listing, so still checked on its own
+    assert cache.is_new("s3") is None
+
+@pytest.mark.asyncio
+async def test_refresh_skips_listing_for_a_single_submission():
+    cache = SubmissionStateCache(10, 60)
+    api = MagicMock()
+    api.fetch_submissions_within = AsyncMock()
+
+    await cache.refresh(api, {}, ["s1"])
+    api.fetch_submissions_within.assert_not_awaited()
@@ -0,0 +1,58 @@
+from bugbounty_gpt.db.submission_writer import SubmissionWriter
+from tests.stub_servers import FakeClock
+from unittest.mock import patch, AsyncMock
+import pytest
+
+def _submission(submission_id):
+    return {"submission_id": submission_id}
+
+@pytest.mark.asyncio
+async def test_submission_writer_flushes_when_full():
+    with patch("bugbounty_gpt.db.submission_writer.db_handler.insert_submissions", new_callable=AsyncMock, return_value=2) as mock_insert:
+        writer = SubmissionWriter(session=None, flush_size=2, flush_interval=60, clock=FakeClock())
+        await writer.add(_submission("submission1"))
+        mock_insert.assert_not_awaited()
+        await writer.add(_submission("submission2"))
+        mock_insert.assert_awaited_once_with(None, [_submission("submission1"), _submission("submission2")])
+        assert len(writer) == 0
+        assert writer.inserted == 2
+
+@pytest.mark.asyncio
+async def test_submission_writer_flushes_after_interval():
+    clock = FakeClock()
+    with patch("bugbounty_gpt.db.submission_writer.db_handler.insert_submissions", new_callable=AsyncMock, return_value=2) as mock_insert:
+        writer = SubmissionWriter(session=None, flush_size=100, flush_interval=5, clock=clock)
+        await writer.add(_submission("submission1"))
+        clock.now = 5
+        await writer.add(_submission("submission2"))
+        mock_insert.assert_awaited_once()
+        assert len(mock_insert.await_args.args[1]) == 2
+
+@pytest.mark.asyncio
+async def test_submission_writer_flushes_remaining_on_exit():
+    with patch("bugbounty_gpt.db.submission_writer.db_handler.insert_submissions", new_callable=AsyncMock, return_value=1) as mock_insert:
+        async with SubmissionWriter(session=None, flush_size=100, flush_interval=60, clock=FakeClock()) as writer:
+            await writer.add(_submission("submission1"))
+            mock_insert.assert_not_awaited()
+        mock_insert.assert_awaited_once_with(None, [_submission("submission1")])
+
+@pytest.mark.asyncio
+async def test_submission_writer_flush_with_empty_buffer():
+    with patch("bugbounty_gpt.db.submission_writer.db_handler.insert_submissions", new_callable=AsyncMock) as mock_insert:
+        await SubmissionWriter(session=None, flush_size=1, flush_interval=1).flush()
+        mock_insert.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_submission_writer_calls_on_flush_only_after_successful_write():
+    flushed = []
+    with patch("bugbounty_gpt.db.submission_writer.db_handler.insert_submissions", new_callable=AsyncMock) as mock_insert:
+        writer = SubmissionWriter(session=None, flush_size=1, flush_interval=60, on_flush=flushed.append, clock=FakeClock())
+        mock_insert.side_effect = Exception("Insert failed")
+        with pytest.raises(Exception, match="Insert failed"):
+            await writer.add(_submission("submission1"))
+        assert flushed == []
+
+        mock_insert.side_effect = None
+        mock_insert.return_value = 1
+        await writer.add(_submission("submission2"))
+        assert flushed == [[_submission("submission2")]]
@@ -0,0 +1,56 @@
+from bugbounty_gpt.ttl_map import TTLMap
+from tests.stub_servers import FakeClock
+import pytest
+
+def test_ttl_map_stores_falsy_values():
+    entries = TTLMap(10)
+    entries.set("s1", False)
+    assert "s1" in entries
+    assert entries.get("s1", "missing") is False
+    assert entries.get("s2", "missing") == "missing"
+
+def test_ttl_map_evicts_least_recently_stored():
+    entries = TTLMap(2)
+    entries.set("s1", 1)
+    entries.set("s2", 2)
+    entries.set("s1", 3)
+    entries.set("s3", 4)
+    assert len(entries) == 2
+    assert "s2" not in entries
+    assert entries.get("s1") == 3
+
+def test_ttl_map_touch_protects_from_eviction():
+    entries = TTLMap(2)
+    entries.set("s1", 1)
+    entries.set("s2", 2)
+    entries.get("s2")
+    assert entries.get("s1", touch=True) == 1
+    entries.set("s3", 3)
+    assert "s1" in entries
+    assert "s2" not in entries
+
+def test_ttl_map_expires_entries():
+    clock = FakeClock()
+    entries = TTLMap(10, ttl_seconds=60, clock=clock)
+    entries.set("s1", 1)
+    clock.now = 60
+    assert entries.get("s1", touch=True) == 1
+    clock.now = 61
+    # Touching the entry did not extend its lifetime
+    assert entries.get("s1") is None
+    assert len(entries) == 0
+
+def test_ttl_map_pop():
+    clock = FakeClock()
+    entries = TTLMap(10, ttl_seconds=60, clock=clock)
+    entries.set("s1", 1)
+    entries.set("s2", 2)
+    assert entries.pop("s1", 0) == 1
+    assert entries.pop("s1", 0) == 0
+    clock.now = 61
+    assert entries.pop("s2", 0) == 0
+    assert len(entries) == 0
+
+def test_ttl_map_rejects_invalid_size():
+    with pytest.raises(ValueError):
+        TTLMap(0)
@@ -0,0 +1,57 @@
+from bugbounty_gpt.webhooks import WebhookReceiver, sign, verify_signature, submission_id_from_payload
+import httpx
+import pytest, asyncio, json
+
+SECRET = "webhook-secret"
+
+def _receiver(queue, **kwargs):
+    settings = {"host": "127.0.0.1", "port": 0, "path": "/webhooks/bugcrowd", "signature_header": "X-Bugcrowd-Signature", "max_body_bytes": 1024}
+    return WebhookReceiver(SECRET, queue, **{**settings, **kwargs})
+
+async def _send(url, payload, secret=SECRET, method="POST"):
+    body = json.dumps(payload).encode()
+    headers = {"X-Bugcrowd-Signature": f"sha256={sign(secret, body)}", "Content-Type": "application/json"}
+    async with httpx.AsyncClient() as client:
+        return await client.request(method, url, content=body, headers=headers)
+
+def test_verify_signature():
+    body = b'{"data": {}}'
+    assert verify_signature(SECRET, body, sign(SECRET, body))
+    assert verify_signature(SECRET, body, f"sha256={sign(SECRET, body).upper()}")
+    assert not verify_signature(SECRET, body, sign("other-secret", body))
+    assert not verify_signature(SECRET, body + b" ", sign(SECRET, body))
+    assert not verify_signature(SECRET, body, None)
+
+def test_submission_id_from_payload():
+    assert submission_id_from_payload({"data": {"type": "submission", "id": "s1"}}) == "s1"
+    assert submission_id_from_payload({"data": {"type": "comment", "id": "c1", "relationships": {"submission": {"data": {"type": "submission", "id": "s2"}}}}}) == "s2"
+    assert submission_id_from_payload({"data": {"type": "comment", "id": "c1"}}) is None
+    assert submission_id_from_payload([]) is None
+
+@pytest.mark.asyncio
+async def test_receiver_enqueues_signed_webhooks():
+    queue = asyncio.Queue()
+    async with _receiver(queue) as receiver:
+        response = await _send(receiver.url, {"data": {"type": "submission", "id": "s1"}})
+
+    assert response.status_code == 202
+    assert queue.get_nowait() == "s1"
+    assert receiver.accepted == 1
+
+@pytest.mark.asyncio
+async def test_receiver_rejects_invalid_requests():
+    queue = asyncio.Queue()
+    payload = {"data": {"type": "submission", "id": "s1"}}
+    async with _receiver(queue) as receiver:
+        assert (await _send(receiver.url, payload, secret="wrong-secret")).status_code == 401
+        assert (await _send(receiver.url, {"data": {"type": "program"}})).status_code == 400
+        assert (await _send(receiver.url + "/other", payload)).status_code == 404
+        assert (await _send(receiver.url, payload, method="PUT")).status_code == 405
+        assert (await _send(receiver.url, {"data": {"type": "submission", "id": "s" * 2000}})).status_code == 413
+
+    assert queue.empty()
+    assert receiver.rejected == 5
+
+def test_receiver_requires_secret():
+    with pytest.raises(ValueError):
+        WebhookReceiver("", asyncio.Queue(), "127.0.0.1", 0, "/webhooks/bugcrowd", "X-Bugcrowd-Signature", 1024)